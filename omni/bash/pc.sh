@@ -45,8 +45,9 @@ trap cleanup SIGINT
 # Run the Python scripts in the background
 run_python_script "$SCRIPT_DIR/../src/nodes/controller/xbox360/xbox360_writer.py"
 #run_python_script "$SCRIPT_DIR/../src/nodes/controller/xbox360/xbox360_plotter.py"
-run_python_script "$SCRIPT_DIR/../src/nodes/drive/drive_controller.py"
-run_python_script "$SCRIPT_DIR/../src/nodes/drive/esc_controller.py"
+# The drive and ESC controllers run in the composition on the robot (bash/robot.sh)
+#run_python_script "$SCRIPT_DIR/../src/nodes/drive/drive_controller.py"
+#run_python_script "$SCRIPT_DIR/../src/nodes/drive/esc_controller.py"
 # Add more scripts as needed
 
 # Wait for all background processes to finish
@@ -42,10 +42,13 @@ cleanup() {
 # Trap Ctrl+C (SIGINT) and call the cleanup function
 trap cleanup SIGINT
 
-# Start the motor control scripts in the background
-run_python_script "$SCRIPT_DIR/../src/nodes/drive/esc.py" 0
-run_python_script "$SCRIPT_DIR/../src/nodes/drive/esc.py" 1
-run_python_script "$SCRIPT_DIR/../src/nodes/drive/esc.py" 2
+# Start the drive stack as one process: same-process links use the intra-process bus,
+# only the controller topic from the PC goes through DDS
+python "$SCRIPT_DIR/../src/cyclone/composition.py" \
+    src.nodes.drive.drive_controller:DriveController \
+    src.nodes.drive.esc_controller:ESCController \
+    src.nodes.drive.esc:ElectornicSpeedController &
+PIDS+=($!)
 
 # Wait for all background processes to finish
 for PID in "${PIDS[@]}"; do
@@ -0,0 +1,398 @@
+"""
+Measures what our messages cost on the wire, per setup, QoS profile and message type:
+
+- serialization: serialize()/deserialize() time and encoded size per IDL type;
+- publish: time spent in Writer.publish() per message;
+- round trip: ping-pong latency through an echo peer;
+- throughput: messages per second the peer receives while we publish as fast as possible,
+  and the fraction that was lost.
+
+Setups:
+    intra_process  echo in the same process, over the intra-process bus
+    same_process   echo in the same process, over DDS
+    same_host      echo in another process, default network configuration
+    loopback       echo in another process, both restricted to the loopback interface
+
+Every setup runs in a fresh interpreter. The results are written as JSON, with the host
+and time of the run, so runs can be compared over time.
+
+Usage:
+    python src/benchmarks/dds_benchmark.py
+    python src/benchmarks/dds_benchmark.py --setups same_host --types FloatPOD --count 5000
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import timeit
+from typing import Callable, Dict, List, Sequence
+
+from cyclonedds.core import Policy, Qos
+from cyclonedds.sub import InvalidSample
+from cyclonedds.util import duration
+
+from src.cyclone.defaults import QOS
+from src.cyclone.intra_process import bus
+from src.cyclone.reader import Reader
+from src.cyclone.writer import Writer
+from src.idl.base_types.float_pod import FloatPOD
+from src.idl.base_types.str_pod import StrPOD
+from src.idl.drive_control_pod import DriveControlPOD
+from src.idl.imu_pod import IMUBatchPOD, IMUPOD
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
+from src.idl.xbox360_compact_pod import Xbox360CompactPOD
+from src.idl.xbox360_pod import Xbox360POD
+from src.utils.histogram import LatencyHistogram
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+SETUPS = ["intra_process", "same_process", "same_host", "loopback"]
+
+QOS_PROFILES: Dict[str, Qos] = {
+    "default": QOS,
+    "reliable": Qos(
+        Policy.Reliability.Reliable(duration(milliseconds=100)),
+        Policy.History.KeepLast(1),
+    ),
+    "reliable_keep_all": Qos(
+        Policy.Reliability.Reliable(duration(seconds=1)), Policy.History.KeepAll
+    ),
+}
+
+
+def xbox360_pod(timestamp: float) -> Xbox360POD:
+    return Xbox360POD(timestamp, 0.1, -0.2, 0.3, -0.4, -1.0, -1.0, *[0] * 10, 0, 1)
+
+
+def imu_batch_pod(timestamp: float) -> IMUBatchPOD:
+    return IMUBatchPOD(
+        timestamp, 0, [timestamp] * 10, [1.0, 0.0, 0.0, 0.0] * 10, [0.1, 0.2, 0.3] * 10
+    )
+
+
+# Message type name -> function that builds a sample with the given timestamp
+TYPES: Dict[str, Callable[[float], object]] = {
+    "FloatPOD": lambda t: FloatPOD(t, 1500.0),
+    "StrPOD": lambda t: StrPOD(t, "Er is een onverwachte fout opgetreden."),
+    "DriveControlPOD": lambda t: DriveControlPOD(t, 0.1, 0.2, 0.3),
+    "PulsewidthArrayPOD": lambda t: PulsewidthArrayPOD.from_values(
+        t, [1550.0, 1450.0, 1500.0]
+    ),
+    "Xbox360POD": xbox360_pod,
+    "Xbox360CompactPOD": lambda t: Xbox360CompactPOD.from_pod(xbox360_pod(t)),
+    "IMUPOD": lambda t: IMUPOD(t, 1.0, 0.0, 0.0, 0.0, 0.1, 0.2, 0.3),
+    "IMUBatchPOD": imu_batch_pod,
+}
+
+# Ping timestamps below zero are commands to the echo peer; it acknowledges them on the
+# count topic with the number of pings received since the last RESET.
+RESET = -1.0  # stop echoing, start counting
+REPORT = -2.0  # report the count, echo again
+
+# Loopback only; the element name is that of Cyclone DDS 0.10 and later.
+LOOPBACK_CONFIG = (
+    "<CycloneDDS><Domain><General><Interfaces>"
+    '<NetworkInterface name="lo"/>'
+    "</Interfaces></General></Domain></CycloneDDS>"
+)
+
+
+def topic_names(type_name: str, profile: str) -> Dict[str, str]:
+    return {
+        "ping": f"bench_ping_{type_name}_{profile}",
+        "pong": f"bench_pong_{type_name}_{profile}",
+        "count": f"bench_count_{type_name}_{profile}",
+    }
+
+
+def serialization(type_names: Sequence[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Returns:
+        Dict[str, Dict[str, float]]: Encoded size in bytes and serialize/deserialize time in
+            us per message type.
+    """
+    results = {}
+    for name in type_names:
+        msg = TYPES[name](time.time())
+        data = msg.serialize()
+        timer = timeit.Timer(msg.serialize)
+        number, _ = timer.autorange()
+        serialize_us = min(timer.repeat(5, number)) / number * 1e6
+        timer = timeit.Timer(lambda: type(msg).deserialize(data))
+        number, _ = timer.autorange()
+        deserialize_us = min(timer.repeat(5, number)) / number * 1e6
+        results[name] = {
+            "bytes": len(data),
+            "serialize_us": serialize_us,
+            "deserialize_us": deserialize_us,
+        }
+    return results
+
+
+class EchoPeer:
+    """
+    Echoes every ping back on the pong topic; between RESET and REPORT it only counts them.
+    """
+
+    def __init__(self, type_name: str, profile: str):
+        names = topic_names(type_name, profile)
+        data_type = type(TYPES[type_name](0.0))
+        qos = QOS_PROFILES[profile]
+        self.__count = 0
+        self.__echo = True
+        self.__pong = Writer(names["pong"], data_type, qos)
+        self.__ack = Writer(names["count"], FloatPOD, qos)
+        self.__ping = Reader(names["ping"], data_type, qos, callback=self.__on_ping)
+
+    def __on_ping(self, msg):
+        if isinstance(msg, InvalidSample):
+            return  # the pinger went away
+        if msg.timestamp == RESET:
+            self.__count, self.__echo = 0, False
+            self.__ack.publish(FloatPOD(RESET, 0.0))
+        elif msg.timestamp == REPORT:
+            self.__echo = True
+            self.__ack.publish(FloatPOD(REPORT, float(self.__count)))
+        elif self.__echo:
+            self.__pong.publish(msg)
+        else:
+            self.__count += 1
+
+
+class Pinger:
+    """The measuring side of one (message type, QoS profile) combination."""
+
+    def __init__(self, type_name: str, profile: str):
+        names = topic_names(type_name, profile)
+        self.factory = TYPES[type_name]
+        data_type = type(self.factory(0.0))
+        qos = QOS_PROFILES[profile]
+        self.ping = Writer(names["ping"], data_type, qos)
+        self.pong = Reader(names["pong"], data_type, qos)
+        self.ack = Reader(names["count"], FloatPOD, qos)
+
+    def wait_for_peer(self, timeout: float = 10.0):
+        """Pings until the first pong arrives, i.e. discovery has finished both ways."""
+        t_end = time.monotonic() + timeout
+        while time.monotonic() < t_end:
+            if self.round_trip(0.1) is not None:
+                return
+        raise RuntimeError("No echo peer answered")
+
+    def round_trip(self, timeout: float = 1.0):
+        """
+        Returns:
+            Optional[Tuple[int, int]]: Publish time and round-trip time in ns, None if the
+                pong did not come back in time.
+        """
+        msg = self.factory(time.time())
+        t0 = time.perf_counter_ns()
+        self.ping.publish(msg)
+        t1 = time.perf_counter_ns()
+        t_end = time.monotonic() + timeout
+        while True:
+            for pong in self.pong.take(timeout=max(0.0, t_end - time.monotonic())):
+                if getattr(pong, "timestamp", None) == msg.timestamp:
+                    return t1 - t0, time.perf_counter_ns() - t0
+            if time.monotonic() >= t_end:
+                return None
+
+    def command(self, command: float, timeout: float = 5.0) -> float:
+        """Sends RESET or REPORT until it is acknowledged; returns the acknowledged count."""
+        t_end = time.monotonic() + timeout
+        while time.monotonic() < t_end:
+            self.ping.publish(self.factory(command))
+            for ack in self.ack.take(timeout=0.05):
+                if getattr(ack, "timestamp", None) == command:
+                    return ack.float_
+        raise RuntimeError(f"Echo peer did not acknowledge {command}")
+
+    def measure(self, count: int, throughput_s: float) -> Dict:
+        self.wait_for_peer()
+        publish, rtt, lost = LatencyHistogram(), LatencyHistogram(), 0
+        for _ in range(count):
+            result = self.round_trip()
+            if result is None:
+                lost += 1
+                continue
+            publish.record(result[0] / 1e3)
+            rtt.record(result[1] / 1e3)
+
+        self.command(RESET)
+        sent = 0
+        msg = self.factory(1.0)
+        t_end = time.perf_counter() + throughput_s
+        while time.perf_counter() < t_end:
+            self.ping.publish(msg)
+            sent += 1
+        time.sleep(0.2)  # let the tail arrive
+        received = self.command(REPORT)
+        return {
+            "publish_us": percentiles(publish),
+            "rtt_us": percentiles(rtt),
+            "rtt_lost": lost,
+            "sent_per_s": sent / throughput_s,
+            "received_per_s": received / throughput_s,
+            "loss": 1 - received / sent if sent else 0.0,
+        }
+
+
+def percentiles(histogram: LatencyHistogram) -> Dict[str, float]:
+    if histogram.count == 0:
+        return {}
+    return {
+        "p50": histogram.percentile(50),
+        "p99": histogram.percentile(99),
+        "max": histogram.max,
+    }
+
+
+def child_env(setup: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    if setup == "loopback":
+        env["CYCLONEDDS_URI"] = LOOPBACK_CONFIG
+    return env
+
+
+def run_child(
+    setup: str,
+    type_names: List[str],
+    profiles: List[str],
+    count: int,
+    throughput_s: float,
+):
+    """Runs every combination for one setup and prints the results as JSON on stdout."""
+    peer = None
+    if setup == "intra_process":
+        bus.enable()
+    if setup in ("intra_process", "same_process"):
+        # Kept referenced so the peers (and their Readers) stay alive until we return.
+        _peers = [EchoPeer(t, p) for t in type_names for p in profiles]  # noqa: F841
+    else:
+        peer = subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                "--peer",
+                "--types",
+                *type_names,
+                "--qos",
+                *profiles,
+            ],
+            env=child_env(setup),
+        )
+    try:
+        results = []
+        for type_name in type_names:
+            for profile in profiles:
+                result = Pinger(type_name, profile).measure(count, throughput_s)
+                results.append(
+                    {"setup": setup, "qos": profile, "type": type_name, **result}
+                )
+        print(json.dumps(results))
+    finally:
+        if peer is not None:
+            peer.terminate()
+            peer.wait()
+
+
+def run_peer(type_names: List[str], profiles: List[str]):
+    # Kept referenced so the peers (and their Readers) stay alive until terminated.
+    _peers = [EchoPeer(t, p) for t in type_names for p in profiles]  # noqa: F841
+    threading.Event().wait()  # until terminated
+
+
+def run_parent(args) -> Dict:
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("child", "peer")},
+        "serialization": serialization(args.types),
+        "transport": [],
+    }
+    for setup in args.setups:
+        out = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                setup,
+                "--types",
+                *args.types,
+                "--qos",
+                *args.qos,
+                "--count",
+                str(args.count),
+                "--throughput-s",
+                str(args.throughput_s),
+            ],
+            env=child_env(setup),
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        report["transport"] += json.loads(out.stdout.strip().splitlines()[-1])
+    return report
+
+
+def print_report(report: Dict):
+    print(f"{'type':<20}{'bytes':>7}{'ser [us]':>10}{'deser [us]':>12}")
+    for name, result in report["serialization"].items():
+        print(
+            f"{name:<20}{result['bytes']:>7d}{result['serialize_us']:>10.1f}"
+            f"{result['deserialize_us']:>12.1f}"
+        )
+    print()
+    print(
+        f"{'setup':<15}{'qos':<19}{'type':<19}{'pub p50':>8}{'rtt p50':>9}{'rtt p99':>9}"
+        f"{'sent/s':>9}{'recv/s':>9}{'loss':>7}"
+    )
+    for r in report["transport"]:
+        print(
+            f"{r['setup']:<15}{r['qos']:<19}{r['type']:<19}"
+            f"{r['publish_us'].get('p50', float('nan')):>8.1f}"
+            f"{r['rtt_us'].get('p50', float('nan')):>9.1f}"
+            f"{r['rtt_us'].get('p99', float('nan')):>9.1f}"
+            f"{r['sent_per_s']:>9.0f}{r['received_per_s']:>9.0f}{100 * r['loss']:>6.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DDS transport benchmark.")
+    parser.add_argument("--setups", nargs="+", choices=SETUPS, default=SETUPS)
+    parser.add_argument(
+        "--qos", nargs="+", choices=list(QOS_PROFILES), default=list(QOS_PROFILES)
+    )
+    parser.add_argument("--types", nargs="+", choices=list(TYPES), default=list(TYPES))
+    parser.add_argument(
+        "--count", type=int, default=1000, help="Round trips per combination."
+    )
+    parser.add_argument(
+        "--throughput-s", type=float, default=1.0, help="Publish burst per combination."
+    )
+    parser.add_argument(
+        "--output",
+        default=f"dds_benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json",
+        help="Where to write the results.",
+    )
+    parser.add_argument("--child", choices=SETUPS, help=argparse.SUPPRESS)
+    parser.add_argument("--peer", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.peer:
+        run_peer(args.types, args.qos)
+    elif args.child:
+        run_child(args.child, args.types, args.qos, args.count, args.throughput_s)
+    else:
+        report = run_parent(args)
+        print_report(report)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
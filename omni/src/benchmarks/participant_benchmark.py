@@ -0,0 +1,144 @@
+"""
+Compares node startup cost of one DomainParticipant per Reader/Writer (the old behaviour) against
+the shared, process-wide participant from src.cyclone.participant.
+
+Every measurement runs in a fresh interpreter, so resident memory and thread counts are not
+polluted by the other path. The default endpoint layout mirrors ESCController plus
+DriveController: two readers and two writers.
+
+Usage:
+    python src/benchmarks/participant_benchmark.py --repeats 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+LAYOUT = [
+    ("reader", "drive_controller"),
+    ("writer", "ESC_pulsewidths"),
+    ("reader", "controller"),
+    ("writer", "drive_controller"),
+]
+
+
+def proc_status() -> Dict[str, int]:
+    """
+    Returns:
+        Dict[str, int]: Resident memory (kB) and thread count of the current process.
+    """
+    status = {}
+    with open("/proc/self/status", "r") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            if key == "VmRSS":
+                status["rss_kb"] = int(value.split()[0])
+            elif key == "Threads":
+                status["threads"] = int(value)
+    return status
+
+
+def median(runs: List[dict], key: str):
+    values = sorted(r[key] for r in runs)
+    return values[len(values) // 2]
+
+
+def run_child(mode: str):
+    """
+    Creates the endpoint layout with the requested participant strategy and prints a JSON
+    summary on stdout.
+
+    Args:
+        mode (str): "old" for one participant per endpoint, "shared" for the registry.
+    """
+    from cyclonedds.domain import DomainParticipant
+    from cyclonedds.pub import DataWriter
+    from cyclonedds.sub import DataReader
+    from cyclonedds.topic import Topic
+
+    from src.cyclone.defaults import QOS
+    from src.cyclone.participant import registry
+    from src.cyclone.reader import Reader
+    from src.cyclone.writer import Writer
+    from src.idl.base_types.float_pod import FloatPOD
+
+    before = proc_status()
+    t0 = time.perf_counter()
+    endpoints = []
+    for kind, topic_name in LAYOUT:
+        if mode == "old":
+            participant = DomainParticipant()
+            topic = Topic(participant, topic_name, FloatPOD, qos=QOS)
+            cls = DataReader if kind == "reader" else DataWriter
+            endpoints.append((participant, cls(participant, topic, qos=QOS)))
+        else:
+            cls = Reader if kind == "reader" else Writer
+            endpoints.append(cls(topic_name, FloatPOD))
+    startup_s = time.perf_counter() - t0
+    after = proc_status()
+
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "startup_ms": startup_s * 1e3,
+                "rss_delta_kb": after["rss_kb"] - before["rss_kb"],
+                "threads": after["threads"],
+                "participants": (
+                    len(LAYOUT)
+                    if mode == "old"
+                    else registry.statistics()["participants"]
+                ),
+            }
+        )
+    )
+
+
+def run_parent(repeats: int):
+    """
+    Spawns `repeats` child processes per mode and prints the median of every metric.
+
+    Args:
+        repeats (int): Number of fresh interpreters per mode.
+    """
+    env = dict(os.environ)
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+
+    results: Dict[str, List[dict]] = {"old": [], "shared": []}
+    for _ in range(repeats):
+        for mode in results:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            results[mode].append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(
+        f"{'mode':<8}{'startup [ms]':>14}{'RSS delta [kB]':>16}{'threads':>9}{'participants':>14}"
+    )
+    for mode, runs in results.items():
+        print(
+            f"{mode:<8}{median(runs, 'startup_ms'):>14.1f}"
+            f"{median(runs, 'rss_delta_kb'):>16d}{median(runs, 'threads'):>9d}"
+            f"{median(runs, 'participants'):>14d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Participant sharing benchmark.")
+    parser.add_argument("--repeats", type=int, default=5, help="Interpreters per mode.")
+    parser.add_argument("--child", choices=["old", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+    else:
+        run_parent(args.repeats)
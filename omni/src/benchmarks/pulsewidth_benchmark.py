@@ -0,0 +1,76 @@
+"""
+Compares writing every channel every tick (the old ESC behaviour) with PulsewidthOutput's change
+detection and batching, on the simulated pigpio backend with an emulated daemon round trip.
+
+The command stream holds each stick position for a while and ramps between positions, like a
+driver does, after the ESC slew-rate limiter.
+
+Usage:
+    python src/benchmarks/pulsewidth_benchmark.py --ticks 5000 --round-trip-us 150
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.config import ESC_GPIO, MAX_ESC_PULSEWIDTH_DELTA
+from src.nodes.drive.pulsewidth_output import PulsewidthOutput, connect_pigpio
+
+
+def command_stream(ticks: int, rate_hz: int = 50, seed: int = 0) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: (ticks, nr_of_channels) slew-limited pulse widths.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(ESC_GPIO)
+    targets = np.full(n, 1500.0)
+    current = np.full(n, 1500.0)
+    out = np.empty((ticks, n))
+    max_step = MAX_ESC_PULSEWIDTH_DELTA / rate_hz
+    for ii in range(ticks):
+        if rng.random() < 0.02:  # new stick position roughly every second
+            targets = rng.choice([1500.0, 1500.0, 1250.0, 1750.0, 1999.0], size=n)
+        current += np.clip(targets - current, -max_step, max_step)
+        out[ii] = current
+    return out
+
+
+def naive(pi, stream: np.ndarray):
+    for row in stream:
+        for gpio_nr, pw in zip(ESC_GPIO, np.clip(row, 1001, 1999).tolist()):
+            pi.set_servo_pulsewidth(gpio_nr, pw)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pulse width output benchmark.")
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--round-trip-us", type=float, default=150.0)
+    parser.add_argument("--quantization-us", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stream = command_stream(args.ticks)
+
+    pi = connect_pigpio(simulate=True, round_trip_us=args.round_trip_us)
+    t0 = time.perf_counter()
+    naive(pi, stream)
+    dt = time.perf_counter() - t0
+    print(
+        f"{'naive':<10} {pi.round_trips:>7d} round trips, "
+        f"{dt / args.ticks * 1e6:8.1f} us/tick"
+    )
+
+    for batch in (False, True):
+        pi = connect_pigpio(simulate=True, round_trip_us=args.round_trip_us)
+        output = PulsewidthOutput(pi, ESC_GPIO, args.quantization_us, batch=batch)
+        t0 = time.perf_counter()
+        for row in stream:
+            output.write(row)
+        dt = time.perf_counter() - t0
+        stats = output.statistics()
+        print(
+            f"{'batched' if batch else 'changes':<10} {pi.round_trips:>7d} round trips, "
+            f"{dt / args.ticks * 1e6:8.1f} us/tick, {stats['skipped']} ticks skipped, "
+            f"write p99 {stats.get('write_p99_us', 0):.0f} us"
+        )
@@ -0,0 +1,112 @@
+"""
+Measures how well a 50 Hz loop holds its period under load, comparing the old relative
+time.time()-based sleep with the deadline scheduler in CycloneDDSNode (with and without the
+hybrid sleep-then-spin tail).
+
+Usage:
+    python src/benchmarks/rate_benchmark.py --duration 10 --load 0.5 --stress 4
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+
+from src.cyclone.cycloneddsnode import CycloneDDSNode
+from src.cyclone.rate_statistics import RateStatistics
+
+
+class LegacyRate:
+    """
+    The pre-deadline CycloneDDSNode.sleep(), instrumented with the same statistics. Jitter is
+    measured against the ideal absolute schedule, so accumulated drift shows up as jitter.
+    """
+
+    def __init__(self, rate_hz: int):
+        self.__period = 1.0 / rate_hz
+        self.__last_sleep = time.time()
+        self.__deadline_ns = time.monotonic_ns() + int(1e9 / rate_hz)
+        self.__last_wake_ns = time.monotonic_ns()
+        self.__period_ns = int(1e9 / rate_hz)
+        self.rate_statistics = RateStatistics(rate_hz)
+
+    def sleep(self):
+        now_ns = time.monotonic_ns()
+        tick_ns = now_ns - self.__last_wake_ns
+        elapsed_time = time.time() - self.__last_sleep
+        time.sleep(max(0.0, self.__period - elapsed_time))
+        self.__last_sleep = time.time()
+
+        wake_ns = time.monotonic_ns()
+        self.rate_statistics.record(
+            period_ns=wake_ns - self.__last_wake_ns,
+            jitter_ns=wake_ns - self.__deadline_ns,
+            tick_ns=tick_ns,
+            overrun=tick_ns > self.__period_ns,
+        )
+        self.__deadline_ns += self.__period_ns
+        self.__last_wake_ns = wake_ns
+
+
+def burn(seconds: float):
+    t_end = time.perf_counter() + seconds
+    while time.perf_counter() < t_end:
+        pass
+
+
+def stress():
+    while True:
+        pass
+
+
+def run(node, duration: float, load: float, rate_hz: int):
+    """
+    Runs a loop on `node` for `duration` seconds, doing a random amount of busy work of up to
+    `load` times the period in every tick.
+    """
+    period = 1.0 / rate_hz
+    t_end = time.monotonic() + duration
+    while time.monotonic() < t_end:
+        burn(random.uniform(0.0, load) * period)
+        node.sleep()
+    return node.rate_statistics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Loop rate benchmark.")
+    parser.add_argument("--rate", type=int, default=50, help="Loop rate in Hz.")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per mode."
+    )
+    parser.add_argument(
+        "--load",
+        type=float,
+        default=0.5,
+        help="Max busy work as fraction of the period.",
+    )
+    parser.add_argument("--spin-us", type=int, default=300, help="Spin tail in us.")
+    parser.add_argument(
+        "--stress",
+        type=int,
+        default=0,
+        help="Number of CPU-burning background processes.",
+    )
+    args = parser.parse_args()
+
+    stressors = [
+        multiprocessing.Process(target=stress, daemon=True) for _ in range(args.stress)
+    ]
+    for p in stressors:
+        p.start()
+
+    modes = {
+        "legacy": lambda: LegacyRate(args.rate),
+        "deadline": lambda: CycloneDDSNode(args.rate),
+        "deadline+spin": lambda: CycloneDDSNode(args.rate, spin_us=args.spin_us),
+    }
+    for name, factory in modes.items():
+        stats = run(factory(), args.duration, args.load, args.rate)
+        print(f"{name:<14} {stats}")
+
+    for p in stressors:
+        p.terminate()
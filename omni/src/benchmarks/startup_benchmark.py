@@ -0,0 +1,199 @@
+"""
+Measures how long node entry points take to start:
+
+- import time: `python -X importtime -c "import <module>"`, reported as the total and as self
+  time summed per top-level package (cyclonedds, numpy, yaml, ...), so a heavy dependency
+  that sneaks into a shared module shows up by name;
+- time to first publish: the node script is started as it is from bash/robot.sh, and the
+  time from spawning it until its first sample arrives on its output topic is measured. Nodes
+  that only consume (the ESC) are timed until their reader matches our input writer. Nodes
+  that need input are fed with neutral commands at 50 Hz. Nodes that read hardware run without
+  it: the Xbox360Writer plays the scripted joystick, the IMU publisher a simulated BNO055.
+
+Usage:
+    python src/benchmarks/startup_benchmark.py --runs 3
+    python src/benchmarks/startup_benchmark.py drive_controller --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.cyclone.reader import Reader
+from src.cyclone.writer import Writer
+from src.idl.drive_control_pod import DriveControlPOD
+from src.idl.imu_pod import IMUPOD
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
+from src.idl.xbox360_pod import Xbox360POD
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class EntryPoint:
+    module: str
+    args: List[str] = field(default_factory=list)
+    output: Optional[Tuple[str, type]] = None  # topic and type the node publishes
+    feed: Optional[Tuple[str, type, Callable]] = None  # topic, type and sample factory
+
+    @property
+    def script(self) -> Path:
+        return ROOT / (self.module.replace(".", "/") + ".py")
+
+
+ENTRY_POINTS: Dict[str, EntryPoint] = {
+    "xbox360_writer": EntryPoint(
+        "src.nodes.controller.xbox360.xbox360_writer",
+        args=["--backend", "scripted"],
+        output=("controller", Xbox360POD),
+    ),
+    "drive_controller": EntryPoint(
+        "src.nodes.drive.drive_controller",
+        output=("drive_controller", DriveControlPOD),
+    ),
+    "esc_controller": EntryPoint(
+        "src.nodes.drive.esc_controller",
+        output=("ESC_pulsewidths", PulsewidthArrayPOD),
+        feed=(
+            "drive_controller",
+            DriveControlPOD,
+            lambda: DriveControlPOD(time.time(), 0.0, 0.0, 0.0),
+        ),
+    ),
+    "esc": EntryPoint(
+        "src.nodes.drive.esc",
+        args=["--simulate"],
+        feed=(
+            "ESC_pulsewidths",
+            PulsewidthArrayPOD,
+            lambda: PulsewidthArrayPOD.from_values(time.time(), [1500.0] * 3),
+        ),
+    ),
+    "imu_publisher": EntryPoint(
+        "src.nodes.imu.imu_publisher",
+        args=["--simulate", "--batch-size", "1"],
+        output=("imu", IMUPOD),
+    ),
+}
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Returns:
+        Tuple[float, Dict[str, float]]: Total import time of `module` in ms, and self time in
+            ms per top-level package.
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    per_package: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        per_package[name.split(".")[0]] += int(self_us) / 1e3
+        if name == module:
+            total = int(cumulative_us) / 1e3
+    return total, dict(per_package)
+
+
+def time_to_first_publish(entry_point: EntryPoint, timeout: float = 30.0) -> float:
+    """
+    Returns:
+        float: Seconds from spawning the node until its first sample arrives (or, for nodes
+            without output, until it subscribes to its input). NaN on timeout.
+    """
+    first_sample = []
+    reader = None
+    if entry_point.output is not None:
+        topic_name, data_type = entry_point.output
+        reader = Reader(
+            topic_name,
+            data_type,
+            callback=lambda _: first_sample or first_sample.append(time.monotonic()),
+        )
+    feeder = None
+    if entry_point.feed is not None:
+        feeder = Writer(entry_point.feed[0], entry_point.feed[1])
+
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    t0 = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, str(entry_point.script), *entry_point.args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.monotonic() < t0 + timeout and process.poll() is None:
+            if feeder is not None:
+                feeder.publish(entry_point.feed[2]())
+                if (
+                    reader is None
+                    and feeder.writer.get_publication_matched_status().current_count
+                ):
+                    return time.monotonic() - t0
+            if first_sample:
+                return first_sample[0] - t0
+            time.sleep(0.02)
+        return float("nan")
+    finally:
+        process.terminate()
+        process.wait()
+        if reader is not None:
+            reader.close()
+        if feeder is not None:
+            feeder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Node startup-time benchmark.")
+    parser.add_argument(
+        "nodes", nargs="*", default=list(ENTRY_POINTS), help="Entry points to measure."
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=6, help="Packages to list per node.")
+    parser.add_argument("--json", default=None, help="Also write the results here.")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.nodes:
+        entry_point = ENTRY_POINTS[name]
+        imports = [import_times(entry_point.module) for _ in range(args.runs)]
+        startups = [time_to_first_publish(entry_point) for _ in range(args.runs)]
+        per_package = {
+            package: statistics.median(run[1].get(package, 0.0) for run in imports)
+            for package in imports[0][1]
+        }
+        results[name] = {
+            "import_ms": statistics.median(run[0] for run in imports),
+            "first_publish_s": statistics.median(startups),
+            "packages_ms": dict(
+                sorted(per_package.items(), key=lambda kv: -kv[1])[: args.top]
+            ),
+        }
+        print(
+            f"{name:<18} import {results[name]['import_ms']:7.1f} ms, "
+            f"first publish {results[name]['first_publish_s']:6.2f} s"
+        )
+        for package, ms in results[name]["packages_ms"].items():
+            print(f"    {package:<24} {ms:7.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
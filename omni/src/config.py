@@ -19,3 +19,9 @@ GLOBAL_TIMEOUT = 1  # s
 MAX_LINEAR_VELOCITY = 1  # m/s
 MAX_ANGULAR_VELOCITY = 6  # rad/s
 INVERTED = True
+JOYSTICK_BACKEND = "evdev"  # or "pygame"
+COMPACT_CONTROLLER_MESSAGES = False  # send Xbox360CompactPOD on controller_compact
+
+# IMU
+IMU_RATE_HZ = 100  # BNO055 fusion output rate
+IMU_BATCH_SIZE = 1  # > 1 publishes IMUBatchPOD on imu_batch instead of IMUPOD on imu
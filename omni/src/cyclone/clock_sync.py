@@ -0,0 +1,257 @@
+import math
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, Optional, Union
+
+from cyclonedds.sub import InvalidSample
+
+from src.cyclone.reader import Reader
+from src.cyclone.writer import Writer
+from src.idl.clock_sync_pod import ClockSyncPOD
+from src.utils.clock import clock
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class ClockOffsetEstimator:
+    """
+    Estimates the offset of a remote clock (remote time - local time) from NTP-style
+    exchanges: t1 ping sent and t4 pong received on the local clock, t2 ping received and t3
+    pong sent on the remote clock.
+
+    Each exchange gives offset ((t2 - t1) + (t3 - t4)) / 2, which is exact if the link delay
+    is the same both ways; queueing on one leg shows up as extra round-trip delay. As in NTP,
+    only the exchange with the smallest delay of the last `window` ones is trusted. A line
+    fitted through the trusted offsets over time gives the drift, so offset() can extrapolate
+    between exchanges.
+    """
+
+    MIN_DRIFT_SPAN = 10.0  # s of trusted offsets needed before the drift is estimated
+
+    def __init__(self, window: int = 8, history: int = 16):
+        """
+        Args:
+            window (int): Exchanges among which the one with the smallest delay is trusted.
+            history (int): Trusted offsets used to fit the drift.
+        """
+        self.__window = deque(maxlen=window)  # (delay, offset, local time)
+        self.__trusted = deque(maxlen=history)  # (local time, offset)
+        self.__offset = 0.0  # at __reference
+        self.__reference: Optional[float] = None
+        self.drift = 0.0  # s/s
+        self.delay = math.inf  # round-trip delay of the last trusted exchange, s
+        self.samples = 0
+
+    def add(self, t1: float, t2: float, t3: float, t4: float):
+        """
+        Args:
+            t1 (float): Ping sent, local clock.
+            t2 (float): Ping received, remote clock.
+            t3 (float): Pong sent, remote clock.
+            t4 (float): Pong received, local clock.
+        """
+        self.samples += 1
+        delay = (t4 - t1) - (t3 - t2)
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        self.__window.append((delay, offset, (t1 + t4) / 2))
+        best_delay, best_offset, best_time = min(self.__window)
+        if self.__trusted and self.__trusted[-1][0] == best_time:
+            return  # still the same exchange
+        self.__trusted.append((best_time, best_offset))
+        self.delay = best_delay
+        self.__fit()
+
+    def offset(self, at: Optional[float] = None) -> float:
+        """
+        Args:
+            at (Optional[float]): Local time; now if None.
+
+        Returns:
+            float: Remote time - local time at `at`, 0 before the first exchange.
+        """
+        if self.__reference is None:
+            return 0.0
+        at = clock.time() if at is None else at
+        return self.__offset + self.drift * (at - self.__reference)
+
+    def to_local(self, remote_time: float) -> float:
+        """
+        Args:
+            remote_time (float): A time on the remote clock.
+
+        Returns:
+            float: The same moment on the local clock.
+        """
+        return remote_time - self.offset(remote_time - self.__offset)
+
+    def __fit(self):
+        """Least-squares line through the trusted offsets; just the latest while too short."""
+        reference = self.__trusted[-1][0]
+        self.__reference = reference
+        if reference - self.__trusted[0][0] < self.MIN_DRIFT_SPAN:
+            self.__offset, self.drift = self.__trusted[-1][1], 0.0
+            return
+        n = len(self.__trusted)
+        mean_t = sum(t - reference for t, _ in self.__trusted) / n
+        mean_o = sum(o for _, o in self.__trusted) / n
+        s_tt = sum((t - reference - mean_t) ** 2 for t, _ in self.__trusted)
+        s_to = sum((t - reference - mean_t) * (o - mean_o) for t, o in self.__trusted)
+        self.drift = s_to / s_tt
+        self.__offset = mean_o - self.drift * mean_t
+
+
+class ClockSync:
+    """
+    Estimates the clock offset to every other process on the DDS domain, so that remote
+    timestamps can be compared with local time however the hosts' clocks are set or drift.
+
+    Every process that started the service answers pings on "clock_sync_ping" with a pong on
+    "clock_sync_pong", and pings the others every PING_INTERVAL (a quick burst first). Offsets
+    are kept per remote process, by the GUID of its DomainParticipant. Messages that carry
+    times from several processes (the latency trace, see src.utils.tracing) name the clock of
+    each time by a 32-bit clock id, a hash of that GUID (see clock_id()); to_local() accepts
+    either. Processes on the same host simply measure ~0.
+
+    Nothing is started on simulated time: a simulation is one process on one clock.
+    """
+
+    PING_INTERVAL = 1.0  # s
+    BURST = 8  # pings BURST_INTERVAL apart after start, for a quick first estimate
+    BURST_INTERVAL = 0.05  # s
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__estimators: Dict[str, ClockOffsetEstimator] = {}
+        self.__guids: Dict[int, str] = {}  # clock id -> GUID, of the remote processes
+        self.__started = False
+        self.guid: Optional[str] = None  # of our participant
+        self.clock_id = 0  # of our clock; 0 until started, i.e. unknown
+
+    @staticmethod
+    def clock_id_of(guid: str) -> int:
+        """
+        Args:
+            guid (str): GUID of a participant.
+
+        Returns:
+            int: Its clock id, a non-zero 32-bit hash of the GUID.
+        """
+        return zlib.crc32(guid.encode()) or 1
+
+    def start(self, domain_id: int = 0):
+        """
+        Starts answering and sending pings; does nothing if already started.
+
+        Args:
+            domain_id (int): The DDS domain to synchronize with.
+        """
+        with self.__lock:
+            if self.__started or clock.simulated:
+                return
+            self.__started = True
+        self.__ping_writer = Writer(
+            "clock_sync_ping", ClockSyncPOD, domain_id=domain_id
+        )
+        self.__pong_writer = Writer(
+            "clock_sync_pong", ClockSyncPOD, domain_id=domain_id
+        )
+        self.guid = str(self.__ping_writer.participant.guid)
+        self.clock_id = self.clock_id_of(self.guid)
+        self.__pings = Reader(
+            "clock_sync_ping",
+            ClockSyncPOD,
+            callback=self.__on_ping,
+            domain_id=domain_id,
+        )
+        self.__pongs = Reader(
+            "clock_sync_pong",
+            ClockSyncPOD,
+            callback=self.__on_pong,
+            domain_id=domain_id,
+        )
+        threading.Thread(target=self.__run, name="clock_sync", daemon=True).start()
+
+    def offset(self, participant: Optional[str]) -> float:
+        """
+        Args:
+            participant (Optional[str]): GUID of a remote participant.
+
+        Returns:
+            float: Its clock minus ours, now; 0 for ourselves and unknown participants.
+        """
+        estimator = self.__estimators.get(participant)
+        return 0.0 if estimator is None else estimator.offset()
+
+    def to_local(self, remote_time: float, participant: Union[str, int, None]) -> float:
+        """
+        Args:
+            remote_time (float): A time stamped by `participant`'s clock.
+            participant (Union[str, int, None]): GUID of the participant, or its clock id.
+
+        Returns:
+            float: The same moment on our clock; remote_time for our own clock and unknown
+                participants.
+        """
+        if isinstance(participant, int):
+            participant = self.__guids.get(participant)
+        estimator = self.__estimators.get(participant)
+        return remote_time if estimator is None else estimator.to_local(remote_time)
+
+    def peers(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            Dict[str, Dict[str, float]]: Offset (s), drift (ppm), round-trip delay (s) and
+                number of exchanges per remote participant.
+        """
+        with self.__lock:
+            estimators = dict(self.__estimators)
+        return {
+            guid: {
+                "offset_s": e.offset(),
+                "drift_ppm": e.drift * 1e6,
+                "delay_s": e.delay,
+                "samples": e.samples,
+            }
+            for guid, e in estimators.items()
+        }
+
+    def __run(self):
+        """Pinger thread."""
+        sequence = 0
+        while True:
+            self.__ping_writer.publish(ClockSyncPOD(self.guid, sequence, clock.time()))
+            sequence = (sequence + 1) % 2**32
+            time.sleep(
+                self.BURST_INTERVAL if sequence < self.BURST else self.PING_INTERVAL
+            )
+
+    def __on_ping(self, ping: ClockSyncPOD):
+        t2 = clock.time()
+        if isinstance(ping, InvalidSample) or ping.requester == self.guid:
+            return
+        self.__pong_writer.publish(
+            ClockSyncPOD(
+                ping.requester, ping.sequence, ping.t1, self.guid, t2, clock.time()
+            )
+        )
+
+    def __on_pong(self, pong: ClockSyncPOD):
+        t4 = clock.time()
+        if isinstance(pong, InvalidSample):
+            return
+        if pong.requester != self.guid or pong.responder == self.guid:
+            return
+        with self.__lock:
+            estimator = self.__estimators.get(pong.responder)
+            if estimator is None:
+                estimator = self.__estimators[pong.responder] = ClockOffsetEstimator()
+                self.__guids[self.clock_id_of(pong.responder)] = pong.responder
+                logger.info(f"Kloksynchronisatie met {pong.responder} gestart.")
+        estimator.add(pong.t1, pong.t2, pong.t3, t4)
+
+
+# Process-wide clock synchronization.
+clock_sync = ClockSync()
@@ -0,0 +1,85 @@
+import argparse
+import importlib
+import threading
+import time
+from typing import List, Sequence
+
+from src.cyclone.intra_process import bus
+from src.utils.clock import clock
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class Composition:
+    """
+    Runs several nodes in one process, each on its own thread. Nodes in this repository run
+    their loop inside __init__, so constructing a node on a thread is enough to start it.
+
+    The intra-process bus is enabled before any node is constructed: publishers and
+    subscribers inside the composition exchange message objects directly, and DDS is only
+    used for links to other processes or hosts. Node threads register with src.utils.clock, so
+    a composition can also run on simulated time.
+    """
+
+    def __init__(self, specs: Sequence[str] = ()):
+        """
+        Args:
+            specs (Sequence[str]): Nodes as "module:Class[:arg[:arg...]]", e.g.
+                "src.nodes.drive.esc:ElectornicSpeedController:0". Integer-looking
+                arguments are passed as int.
+        """
+        bus.enable()
+        self.threads: List[threading.Thread] = []
+        for spec in specs:
+            module_name, class_name, *args = spec.split(":")
+            node_class = getattr(importlib.import_module(module_name), class_name)
+            args = [int(a) if a.lstrip("-").isdigit() else a for a in args]
+            self.add(node_class, *args)
+
+    def add(self, node_class: type, *args, **kwargs) -> threading.Thread:
+        """
+        Adds a node, constructed as node_class(*args, **kwargs) on its own thread.
+
+        Returns:
+            threading.Thread: The thread the node will run on.
+        """
+        thread = threading.Thread(
+            target=self.__run_node,
+            args=(node_class, args, kwargs),
+            name=":".join([node_class.__name__] + [str(a) for a in args]),
+            daemon=True,
+        )
+        self.threads.append(thread)
+        return thread
+
+    def start(self):
+        """Starts all nodes."""
+        for thread in self.threads:
+            thread.start()
+
+    def spin(self):
+        """Starts all nodes and blocks until they have all stopped (or Ctrl+C)."""
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self.threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            logger.info("Composition gestopt.")
+
+    @staticmethod
+    def __run_node(node_class, args, kwargs):
+        clock.register()
+        try:
+            node_class(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"{node_class.__name__} is gestopt: {e}")
+        finally:
+            clock.unregister()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several nodes in one process.")
+    parser.add_argument("nodes", nargs="+", help='Nodes as "module:Class[:arg...]".')
+    args = parser.parse_args()
+    Composition(args.nodes).spin()
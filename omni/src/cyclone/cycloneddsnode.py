@@ -1,35 +1,121 @@
-import time
+import logging
+
+from src.cyclone.rate_statistics import RateStatistics
+from src.utils.clock import clock
+
+logger = logging.getLogger(__name__)
 
 
 class CycloneDDSNode:
     """
     A class to manage rate-controlled loops, similar to ROS's Rate, for CycloneDDS applications.
+
+    Wake-ups are scheduled on absolute deadlines on the monotonic clock, so the loop does not
+    drift and is unaffected by wall-clock jumps. Loop timing is recorded in rate_statistics.
+    The schedule starts at the first time_remaining(), wait_for() or sleep() call, so the
+    work done in a constructor before the loop (arming, waiting for peers) is not a tick.
+    Time comes from src.utils.clock, so loops also run on simulated time.
     """
 
-    def __init__(self, rate_hz: int = 50):
+    STATISTICS_LOG_INTERVAL = 10.0  # s
+
+    def __init__(self, rate_hz: int = 50, spin_us: int = 0):
         """
         Initializes the CycloneDDSNode with a specified loop rate.
 
         Args:
             rate_hz (int): The desired loop rate in Hertz.
+            spin_us (int): If non-zero, sleep() yields the CPU only until this many microseconds
+                before the deadline and busy-waits for the remainder, trading CPU for jitter.
         """
-        self.__period = 1.0 / rate_hz  # Time period for each loop iteration in seconds.
-        self.__last_sleep = time.time()  # Timestamp of the last sleep call.
+        self.__period_ns = int(1e9 / rate_hz)  # Time period for each loop iteration.
+        self.__spin_ns = spin_us * 1000
+        self.__started = False
+        self.__next_deadline_ns = 0  # Absolute time of next wake-up.
+        self.__last_wake_ns = 0  # Time the current tick started.
+        self.__idle_ns = 0  # Time spent in wait_for() during the current tick.
+        self.__last_log_ns = 0
+        self.rate_statistics = RateStatistics(rate_hz)
 
-    def sleep(self):
+    def __start(self):
+        """Starts the schedule: the first tick begins now."""
+        now = clock.monotonic_ns()
+        self.__next_deadline_ns = now + self.__period_ns
+        self.__last_wake_ns = now
+        self.__last_log_ns = now
+        self.__started = True
+
+    def time_remaining(self) -> float:
+        """
+        Returns the time left in the current loop period, i.e. how long sleep() would block if
+        it were called now. Event-driven loops use this as the timeout for waiting on a Reader,
+        so they wake on arrival of a sample without overrunning the period.
+
+        Returns:
+            float: Remaining time in seconds, never negative.
+        """
+        if not self.__started:
+            self.__start()
+        return max(0.0, (self.__next_deadline_ns - clock.monotonic_ns()) / 1e9)
+
+    def wait_for(self, reader) -> bool:
         """
-        Sleeps for the necessary duration to maintain the loop rate.
+        Waits until `reader` has data, at most until the end of the current period. The time
+        spent waiting counts as idle, not as work, in rate_statistics.
 
-        This method calculates the time elapsed since the last sleep, determines the remaining
-        time to maintain the desired loop period, and sleeps for that duration. It then updates
-        the timestamp for the next iteration.
+        Args:
+            reader (Reader): The reader to wait on.
 
-        If the processing time exceeds the desired period, it doesn't sleep, ensuring that the loop
-        doesn't run slower than intended.
+        Returns:
+            bool: True if data is available.
+        """
+        t0 = clock.monotonic_ns()
+        data_available = reader.wait_for_data(timeout=self.time_remaining())
+        self.__idle_ns += clock.monotonic_ns() - t0
+        return data_available
+
+    def sleep(self):
         """
-        elapsed_time = (
-            time.time() - self.__last_sleep
-        )  # Time taken since the last sleep.
-        sleep_time = max(0.0, self.__period - elapsed_time)  # Remaining time to sleep.
-        time.sleep(sleep_time)  # Sleep for the calculated duration.
-        self.__last_sleep = time.time()  # Update the timestamp for the next iteration.
+        Sleeps until the next deadline to maintain the loop rate.
+
+        Deadlines are absolute (previous deadline + period), so time spent in the loop body
+        does not accumulate into drift. If the deadline has already passed, sleep() returns
+        immediately and re-aligns to the next deadline in the future instead of running a
+        burst of catch-up iterations. A tick whose work (excluding wait_for) took longer than
+        the period is counted as an overrun.
+        """
+        if not self.__started:
+            self.__start()
+        now = clock.monotonic_ns()
+        tick_ns = now - self.__last_wake_ns - self.__idle_ns
+        self.__idle_ns = 0
+        overrun = tick_ns > self.__period_ns
+
+        deadline = self.__next_deadline_ns
+        if now > deadline:
+            missed = (now - deadline) // self.__period_ns + 1
+            self.__next_deadline_ns += missed * self.__period_ns
+        else:
+            coarse_ns = deadline - now - self.__spin_ns
+            if coarse_ns > 0:
+                clock.sleep(coarse_ns / 1e9)
+            while clock.monotonic_ns() < deadline:  # Only spins if spin_us > 0.
+                pass
+            self.__next_deadline_ns += self.__period_ns
+
+        wake = clock.monotonic_ns()
+        self.rate_statistics.record(
+            period_ns=wake - self.__last_wake_ns,
+            jitter_ns=wake - deadline,
+            tick_ns=tick_ns,
+            overrun=overrun,
+        )
+        if overrun:
+            logger.debug(
+                f"{type(self).__name__}: tick took {tick_ns / 1e6:.1f} ms "
+                f"(period {self.__period_ns / 1e6:.1f} ms)"
+            )
+        if wake - self.__last_log_ns > self.STATISTICS_LOG_INTERVAL * 1e9:
+            logger.debug(f"{type(self).__name__}: {self.rate_statistics}")
+            self.__last_log_ns = wake
+        self.__last_wake_ns = wake
@@ -1,6 +1,7 @@
 from cyclonedds.qos import Qos, Policy
 from cyclonedds.util import duration
 
+# Used for topics without a profile in config/qos.yaml, see src.cyclone.qos_profiles.
 QOS = Qos(
     Policy.Reliability.BestEffort,
     Policy.Deadline(duration(milliseconds=10)),
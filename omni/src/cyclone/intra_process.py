@@ -0,0 +1,67 @@
+import threading
+from typing import AnyStr, Dict, List, Union
+
+from cyclonedds.idl import IdlStruct, IdlUnion
+
+
+class IntraProcessBus:
+    """
+    Connects Writers and Readers that live in the same process by handing over the message
+    object itself, without serialization or a trip through the network stack.
+
+    The bus is disabled by default. The composition runner enables it before any node is
+    constructed; from then on every Reader registers itself here and ignores DDS samples from
+    its own participant (Policy.IgnoreLocal.Participant), and every Writer delivers to local
+    Readers directly and only writes to DDS while a remote reader is matched.
+
+    Messages are shared, not copied: subscribers must treat received samples as read-only.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__readers: Dict[AnyStr, List] = {}
+        self.enabled = False
+
+    def enable(self):
+        """Enables intra-process delivery. Must be called before creating Readers/Writers."""
+        self.enabled = True
+
+    def subscribe(self, topic_name: AnyStr, reader):
+        """
+        Args:
+            topic_name (AnyStr): The topic the reader subscribes to.
+            reader (Reader): A Reader; its deliver() method receives published messages.
+        """
+        with self.__lock:
+            readers = list(self.__readers.get(topic_name, []))
+            readers.append(reader)
+            self.__readers[topic_name] = readers
+
+    def unsubscribe(self, topic_name: AnyStr, reader):
+        with self.__lock:
+            readers = [r for r in self.__readers.get(topic_name, []) if r is not reader]
+            if readers:
+                self.__readers[topic_name] = readers
+            else:
+                self.__readers.pop(topic_name, None)
+
+    def publish(self, topic_name: AnyStr, msg: Union[IdlStruct, IdlUnion]) -> int:
+        """
+        Hands a message to every local reader of the topic.
+
+        Args:
+            topic_name (AnyStr): The topic to publish on.
+            msg (Union[IdlStruct, IdlUnion]): The message; it is delivered by reference.
+
+        Returns:
+            int: The number of local readers the message was delivered to.
+        """
+        # Copy-on-write list: iterating it needs no lock.
+        readers = self.__readers.get(topic_name, ())
+        for reader in readers:
+            reader.deliver(msg)
+        return len(readers)
+
+
+# Process-wide bus shared by all Readers and Writers.
+bus = IntraProcessBus()
@@ -0,0 +1,147 @@
+import math
+from typing import AnyStr, Dict, Optional, Type, Union
+
+from cyclonedds.core import Qos
+from cyclonedds.idl import IdlStruct, IdlUnion
+from cyclonedds.sub import InvalidSample
+
+from src.cyclone.reader import Reader
+from src.utils.clock import clock
+
+
+class LatestValueReader(Reader):
+    """
+    A Reader for state-like topics, where only the newest sample matters. update() takes what
+    has arrived and keeps the newest sample with its receive time; latest(), age() and
+    is_fresh() then answer from that cache in O(1), without allocating or raising.
+
+    It also counts what the consumer never got to see:
+    - overwritten: samples replaced by a newer one before update() was called, either in the
+      same take() or in the intra-process history (KeepLast(1) keeps only the newest);
+    - lost: gaps in the `sequence` field of message types that have one (Xbox360CompactPOD,
+      IMUBatchPOD), i.e. samples dropped on the link or in a remote reader history.
+    """
+
+    def __init__(
+        self,
+        topic_name: AnyStr,
+        data_type: Union[Type[IdlStruct], Type[IdlUnion]],
+        qos: Optional[Qos] = None,
+        rate_hz: int = 50,
+        domain_id: int = 0,
+    ):
+        """
+        Args:
+            topic_name (AnyStr): The DDS topic to subscribe to.
+            data_type (Union[Type[IdlStruct], Type[IdlUnion]]): The IDL type of the topic.
+            qos (Optional[Qos]): Quality of Service for topic and reader; the topic's profile
+                in config/qos.yaml if None.
+            rate_hz (int): The loop rate used by CycloneDDSNode.sleep().
+            domain_id (int): The DDS domain to join.
+        """
+        super().__init__(topic_name, data_type, qos, None, rate_hz, domain_id)
+        self.received = 0  # samples taken by update()
+        self.overwritten = 0
+        self.lost = 0
+        self.sequence_gap = 0  # samples missing before the latest one
+        self.__latest: Optional[Union[IdlStruct, IdlUnion]] = None
+        self.__received_at = -math.inf  # clock.monotonic() of the latest sample
+        self.__delivered = 0  # intra-process samples offered to the history
+        self.__next_sequence: Optional[int] = None
+
+    def deliver(self, msg: Union[IdlStruct, IdlUnion]):
+        self.__delivered += 1
+        super().deliver(msg)
+
+    def update(self) -> int:
+        """
+        Takes the samples that have arrived, without blocking, and keeps the newest.
+
+        Returns:
+            int: The number of samples taken; 0 if the cached sample is still the latest.
+        """
+        samples = self()
+        if not samples:
+            return 0
+        if self.__delivered:
+            # Intra-process samples that the history replaced before they were taken
+            self.overwritten += self.__delivered - len(samples)
+            self.__delivered = 0
+        taken = 0
+        for sample in samples:
+            if isinstance(sample, InvalidSample):
+                continue  # a disposed instance or a writer that went away, not data
+            self.__count_sequence_gap(sample)
+            self.__latest = sample
+            taken += 1
+        if taken:
+            self.__received_at = clock.monotonic()
+            self.received += taken
+            self.overwritten += taken - 1
+        return taken
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a sample (see wait_for_data) and takes it with update().
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait in seconds. None waits forever.
+
+        Returns:
+            bool: True if a new sample arrived.
+        """
+        return self.wait_for_data(timeout) and self.update() > 0
+
+    def latest(self) -> Optional[Union[IdlStruct, IdlUnion]]:
+        """
+        Returns:
+            Optional[Union[IdlStruct, IdlUnion]]: The newest sample taken by update(), None if
+                nothing arrived yet.
+        """
+        return self.__latest
+
+    def age(self) -> float:
+        """
+        Returns:
+            float: Seconds since the latest sample was taken by update(); inf if none was.
+        """
+        return clock.monotonic() - self.__received_at
+
+    def is_fresh(self, timeout: float) -> bool:
+        """
+        Args:
+            timeout (float): Maximum age in seconds.
+
+        Returns:
+            bool: Whether a sample was taken within the last `timeout` seconds.
+        """
+        return self.age() <= timeout
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: The sample counters, plus the samples DDS itself reports lost.
+        """
+        dds_lost = 0
+        if self.reader is not None:
+            dds_lost = self.reader.get_sample_lost_status().total_count
+        return {
+            "received": self.received,
+            "overwritten": self.overwritten,
+            "lost": self.lost,
+            "dds_lost": dds_lost,
+        }
+
+    def __count_sequence_gap(self, sample: Union[IdlStruct, IdlUnion]):
+        sequence = getattr(sample, "sequence", None)
+        if sequence is None:
+            return
+        self.sequence_gap = 0
+        if self.__next_sequence is not None:
+            gap = (sequence - self.__next_sequence) % 2**32
+            if gap < 2**31:  # otherwise the writer restarted or samples were reordered
+                self.sequence_gap = gap
+                self.lost += gap
+        # A batch carries len(sample) consecutive sequence numbers.
+        step = len(sample) if hasattr(sample, "__len__") else 1
+        self.__next_sequence = (sequence + step) % 2**32
@@ -0,0 +1,139 @@
+import threading
+from typing import AnyStr, Dict, List, Optional, Tuple
+
+from cyclonedds.core import Qos
+from cyclonedds.domain import DomainParticipant
+from cyclonedds.topic import Topic
+
+from src.utils.default_types import CYCLONE_MESSAGE_TYPE
+
+
+class ParticipantRegistry:
+    """
+    Hands out one DomainParticipant per domain per process and caches Topic objects per
+    (name, type, QoS), so that every Reader and Writer in a process shares the same discovery,
+    threads and sockets. Both participants and topics are reference counted; the underlying
+    entities are dropped once the last Reader/Writer using them releases them.
+    """
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+        # domain_id -> [participant, reference count]
+        self.__participants: Dict[int, List] = {}
+        # (domain_id, topic_name, data_type, qos) -> [topic, reference count]
+        self.__topics: Dict[Tuple, List] = {}
+
+    def acquire_participant(self, domain_id: int = 0) -> DomainParticipant:
+        """
+        Returns the shared participant for the given domain, creating it on first use.
+
+        Args:
+            domain_id (int): The DDS domain to join.
+
+        Returns:
+            DomainParticipant: The process-wide participant for that domain.
+        """
+        with self.__lock:
+            entry = self.__participants.get(domain_id)
+            if entry is None:
+                entry = [DomainParticipant(domain_id), 0]
+                self.__participants[domain_id] = entry
+            entry[1] += 1
+            return entry[0]
+
+    def release_participant(self, participant: DomainParticipant):
+        """
+        Drops one reference to a participant. The participant (and any topics still cached
+        on it) is deleted when the last reference is released.
+
+        Args:
+            participant (DomainParticipant): A participant obtained from acquire_participant.
+        """
+        with self.__lock:
+            for domain_id, entry in list(self.__participants.items()):
+                if entry[0] is not participant:
+                    continue
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    for key in [k for k in self.__topics if k[0] == domain_id]:
+                        del self.__topics[key]
+                    del self.__participants[domain_id]
+                return
+
+    def acquire_topic(
+        self,
+        participant: DomainParticipant,
+        topic_name: AnyStr,
+        data_type: CYCLONE_MESSAGE_TYPE,
+        qos: Optional[Qos] = None,
+    ) -> Topic:
+        """
+        Returns a cached Topic for (name, type, QoS) on the given participant, creating it on
+        first use.
+
+        Args:
+            participant (DomainParticipant): A participant obtained from acquire_participant.
+            topic_name (AnyStr): The DDS topic name.
+            data_type (CYCLONE_MESSAGE_TYPE): The IDL type carried by the topic.
+            qos (Optional[Qos]): The topic QoS.
+
+        Returns:
+            Topic: The shared topic.
+        """
+        with self.__lock:
+            key = self.__topic_key(participant, topic_name, data_type, qos)
+            entry = self.__topics.get(key)
+            if entry is None:
+                entry = [Topic(participant, topic_name, data_type, qos=qos), 0]
+                self.__topics[key] = entry
+            entry[1] += 1
+            return entry[0]
+
+    def release_topic(self, topic: Topic):
+        """
+        Drops one reference to a topic, deleting it when no Reader/Writer uses it anymore.
+
+        Args:
+            topic (Topic): A topic obtained from acquire_topic.
+        """
+        with self.__lock:
+            for key, entry in list(self.__topics.items()):
+                if entry[0] is not topic:
+                    continue
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self.__topics[key]
+                return
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: The number of live participants and topics, and the total number of
+                references held on them.
+        """
+        with self.__lock:
+            return {
+                "participants": len(self.__participants),
+                "participant_refs": sum(e[1] for e in self.__participants.values()),
+                "topics": len(self.__topics),
+                "topic_refs": sum(e[1] for e in self.__topics.values()),
+            }
+
+    def __topic_key(
+        self,
+        participant: DomainParticipant,
+        topic_name: AnyStr,
+        data_type: CYCLONE_MESSAGE_TYPE,
+        qos: Optional[Qos],
+    ) -> Tuple:
+        domain_id = next(
+            (d for d, e in self.__participants.items() if e[0] is participant), None
+        )
+        if domain_id is None:
+            raise RuntimeError("Participant was not acquired through the registry.")
+        # Qos objects are compared by their policies, repr() gives a stable key for those.
+        return domain_id, topic_name, data_type, None if qos is None else repr(qos)
+
+
+# Process-wide registry shared by all Readers and Writers.
+registry = ParticipantRegistry()
@@ -0,0 +1,156 @@
+import threading
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import AnyStr, Dict, List, Optional, Tuple
+
+from cyclonedds.qos import Policy, Qos
+from cyclonedds.util import duration
+
+from src.cyclone.defaults import QOS
+
+
+def qos_from_config(config: Dict) -> Qos:
+    """
+    Builds a Qos from a profile in config/qos.yaml.
+
+    Args:
+        config (Dict): The profile, see the keys documented in config/qos.yaml.
+
+    Returns:
+        Qos: The policies for the keys that are present.
+    """
+    policies = []
+    reliability = config.get("reliability")
+    if reliability == "reliable":
+        max_blocking = duration(milliseconds=config.get("max_blocking_ms", 100))
+        policies.append(Policy.Reliability.Reliable(max_blocking))
+    elif reliability == "best_effort":
+        policies.append(Policy.Reliability.BestEffort)
+    elif reliability is not None:
+        raise ValueError(f"Unknown reliability {reliability!r}")
+
+    history = config.get("history")
+    if history == "all":
+        policies.append(Policy.History.KeepAll)
+    elif history is not None:
+        policies.append(Policy.History.KeepLast(int(history)))
+
+    if "deadline_ms" in config:
+        policies.append(Policy.Deadline(duration(milliseconds=config["deadline_ms"])))
+    if "latency_budget_ms" in config:
+        policies.append(
+            Policy.LatencyBudget(duration(milliseconds=config["latency_budget_ms"]))
+        )
+    if "transport_priority" in config:
+        policies.append(Policy.TransportPriority(int(config["transport_priority"])))
+    if "resource_limits" in config:
+        policies.append(Policy.ResourceLimits(**config["resource_limits"]))
+    return Qos(*policies)
+
+
+class QosProfiles:
+    """
+    Named QoS profiles and the topics that use them, loaded from config/qos.yaml on first use.
+
+    Topics are matched against fnmatch patterns in file order, the first match wins; topics
+    that match nothing get the default profile, which is defaults.QOS unless the file says
+    otherwise. Readers and Writers created without an explicit qos use for_topic(), so every
+    node in every process picks the same QoS for a topic.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path (Optional[Path]): The profile file; config/qos.yaml if None.
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__loaded = False
+        self.__profiles: Dict[str, Qos] = {}
+        self.__topics: List[Tuple[str, str]] = []  # (pattern, profile name)
+        self.__default: Qos = QOS
+
+    def load(self, path: Optional[Path] = None):
+        """
+        (Re)loads the profiles, replacing those loaded before. A missing file leaves only the
+        default profile.
+
+        Args:
+            path (Optional[Path]): The profile file; self.path if None.
+        """
+        import yaml
+
+        path = Path(path or self.path or self.__default_path())
+        config = {}
+        if path.exists():
+            with open(path, "r") as file:
+                config = yaml.safe_load(file) or {}
+        profiles = {
+            name: qos_from_config(profile or {})
+            for name, profile in (config.get("profiles") or {}).items()
+        }
+        topics = list((config.get("topics") or {}).items())
+        for pattern, name in topics:
+            if name not in profiles:
+                raise ValueError(f"Topic {pattern!r} uses unknown QoS profile {name!r}")
+        default = config.get("default")
+        if default is not None and default not in profiles:
+            raise ValueError(f"Unknown default QoS profile {default!r}")
+
+        with self.__lock:
+            self.path = path
+            self.__profiles = profiles
+            self.__topics = topics
+            self.__default = QOS if default is None else profiles[default]
+            self.__loaded = True
+
+    def profile(self, name: str) -> Qos:
+        """
+        Args:
+            name (str): A profile name from the file.
+
+        Returns:
+            Qos: The profile.
+        """
+        self.__ensure_loaded()
+        return self.__profiles[name]
+
+    def profile_name(self, topic_name: AnyStr) -> Optional[str]:
+        """
+        Args:
+            topic_name (AnyStr): A DDS topic name.
+
+        Returns:
+            Optional[str]: The profile the topic uses, None for the default.
+        """
+        self.__ensure_loaded()
+        for pattern, name in self.__topics:
+            if fnmatchcase(topic_name, pattern):
+                return name
+        return None
+
+    def for_topic(self, topic_name: AnyStr) -> Qos:
+        """
+        Args:
+            topic_name (AnyStr): A DDS topic name.
+
+        Returns:
+            Qos: The QoS of the first matching profile, or the default.
+        """
+        name = self.profile_name(topic_name)
+        return self.__default if name is None else self.__profiles[name]
+
+    def __ensure_loaded(self):
+        if not self.__loaded:
+            self.load()
+
+    @staticmethod
+    def __default_path() -> Path:
+        base_dir = Path(__file__).parent
+        while not base_dir.name == "src":
+            base_dir = base_dir.parent
+        return base_dir.parent / "config" / "qos.yaml"
+
+
+# Process-wide profiles used by Reader and Writer.
+profiles = QosProfiles()
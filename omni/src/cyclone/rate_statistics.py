@@ -0,0 +1,82 @@
+from array import array
+from typing import Dict
+
+
+class RateStatistics:
+    """
+    Keeps loop timing statistics for a rate-controlled node: actual rate, wake-up jitter,
+    overruns and worst-case tick duration. The most recent samples are stored in preallocated
+    ring buffers, so recording a tick does not allocate.
+    """
+
+    def __init__(self, rate_hz: float, window: int = 1000):
+        """
+        Args:
+            rate_hz (float): The desired loop rate in Hertz.
+            window (int): Number of most recent ticks used for rate and jitter percentiles.
+        """
+        self.rate_hz = rate_hz
+        self.window = window
+
+        self.__periods_ns = array("q", bytes(8 * window))
+        self.__jitters_ns = array("q", bytes(8 * window))
+        self.__index = 0
+
+        self.ticks = 0
+        self.overruns = 0
+        self.worst_tick_ns = 0
+
+    def record(self, period_ns: int, jitter_ns: int, tick_ns: int, overrun: bool):
+        """
+        Records a single loop iteration.
+
+        Args:
+            period_ns (int): Time between this wake-up and the previous one.
+            jitter_ns (int): How late this wake-up was relative to its deadline.
+            tick_ns (int): Time spent working in the tick (from wake-up until sleep()).
+            overrun (bool): Whether the work exceeded the deadline.
+        """
+        self.__periods_ns[self.__index] = period_ns
+        self.__jitters_ns[self.__index] = jitter_ns
+        self.__index = (self.__index + 1) % self.window
+
+        self.ticks += 1
+        self.overruns += overrun
+        self.worst_tick_ns = max(self.worst_tick_ns, tick_ns)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: The actual rate (Hz), jitter percentiles and worst tick (us),
+                and tick/overrun counts.
+        """
+        n = min(self.ticks, self.window)
+        if n == 0:
+            return {"ticks": 0, "overruns": 0}
+        periods = self.__periods_ns[:n]
+        jitters = sorted(self.__jitters_ns[:n])
+
+        def percentile(p: float) -> float:
+            return jitters[min(n - 1, int(p / 100 * n))] / 1e3
+
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "rate_hz": 1e9 * n / max(1, sum(periods)),
+            "jitter_p50_us": percentile(50),
+            "jitter_p90_us": percentile(90),
+            "jitter_p99_us": percentile(99),
+            "jitter_max_us": jitters[-1] / 1e3,
+            "worst_tick_us": self.worst_tick_ns / 1e3,
+        }
+
+    def __str__(self) -> str:
+        s = self.summary()
+        if s["ticks"] == 0:
+            return "no ticks recorded"
+        return (
+            f"{s['rate_hz']:.2f}/{self.rate_hz} Hz, jitter p50 {s['jitter_p50_us']:.0f} us "
+            f"p99 {s['jitter_p99_us']:.0f} us max {s['jitter_max_us']:.0f} us, "
+            f"worst tick {s['worst_tick_us']:.0f} us, "
+            f"{s['overruns']}/{s['ticks']} overruns"
+        )
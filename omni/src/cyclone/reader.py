@@ -1,43 +1,223 @@
 import logging
+import threading
 import time
-from typing import Optional, AnyStr, Type, Union, Callable
+from collections import deque
+from typing import Optional, AnyStr, Type, Union, Callable, List
 
-from cyclonedds.domain import DomainParticipant
-from cyclonedds.core import Qos
+from cyclonedds.core import (
+    Qos,
+    Policy,
+    WaitSet,
+    ReadCondition,
+    GuardCondition,
+    SampleState,
+    ViewState,
+    InstanceState,
+)
 from cyclonedds.idl import IdlStruct, IdlUnion
 from cyclonedds.sub import DataReader
-from cyclonedds.topic import Topic
+from cyclonedds.util import duration
 
 from src.cyclone.cycloneddsnode import CycloneDDSNode
-from src.cyclone.defaults import QOS
+from src.cyclone.intra_process import bus
+from src.cyclone.participant import registry
+from src.cyclone.qos_profiles import profiles
 from src.idl.base_types.str_pod import StrPOD
+from src.utils.clock import clock
 
 logger = logging.getLogger(__name__)
 
 
 class Reader(CycloneDDSNode):
+    """
+    Wraps a DDS DataReader. Samples can be polled with __call__, waited for with take(timeout),
+    or pushed to a callback. Waiting blocks on a WaitSet/ReadCondition, so the calling thread
+    sleeps until a sample arrives or the timeout expires instead of spinning on take().
+
+    When the intra-process bus is enabled, samples published in the same process arrive by
+    reference through deliver() and are returned before any DDS samples.
+    """
+
     def __init__(
-            self,
-            topic_name: AnyStr,
-            data_type: Union[Type[IdlStruct], Type[IdlUnion]],
-            qos: Optional[Qos] = QOS,
-            callback: Optional[Callable[[Union[IdlStruct, IdlUnion]], None]] = None,
-            rate_hz: int = 50,
+        self,
+        topic_name: AnyStr,
+        data_type: Union[Type[IdlStruct], Type[IdlUnion]],
+        qos: Optional[Qos] = None,
+        callback: Optional[Callable[[Union[IdlStruct, IdlUnion]], None]] = None,
+        rate_hz: int = 50,
+        domain_id: int = 0,
     ):
+        """
+        Args:
+            topic_name (AnyStr): The DDS topic to subscribe to.
+            data_type (Union[Type[IdlStruct], Type[IdlUnion]]): The IDL type of the topic.
+            qos (Optional[Qos]): Quality of Service for topic and reader; the topic's profile
+                in config/qos.yaml if None.
+            callback (Optional[Callable]): If given, every received sample is passed to this
+                function from a dedicated dispatcher thread as soon as it arrives.
+            rate_hz (int): The loop rate used by CycloneDDSNode.sleep().
+            domain_id (int): The DDS domain to join.
+        """
         super().__init__(rate_hz)
-        self.participant = DomainParticipant()
-        self.topic = Topic(self.participant, topic_name, data_type, qos=qos)
-        self.reader = DataReader(self.participant, self.topic, qos=qos)
+        self.topic_name = topic_name
+        if qos is None:
+            qos = profiles.for_topic(topic_name)
+        self.participant = registry.acquire_participant(domain_id)
+        self.topic = registry.acquire_topic(
+            self.participant, topic_name, data_type, qos
+        )
+        self.intra_process = bus.enabled
+        reader_qos = qos
+        if self.intra_process:
+            # Same-process samples come through the bus, DDS only carries remote ones.
+            reader_qos = qos + Qos(Policy.IgnoreLocal.Participant)
+        self.reader = DataReader(self.participant, self.topic, qos=reader_qos)
         self.callback = callback
 
+        self.__read_condition = ReadCondition(
+            self.reader, SampleState.Any | ViewState.Any | InstanceState.Any
+        )
+        self.__guard = GuardCondition(self.participant)
+        self.__local_guard = GuardCondition(self.participant)
+        self.__local_samples = deque(maxlen=self.__history_depth(qos))
+        self.__waitset = WaitSet(self.participant)
+        self.__waitset.attach(self.__read_condition)
+        self.__waitset.attach(self.__guard)
+        self.__waitset.attach(self.__local_guard)
+        if self.intra_process:
+            bus.subscribe(topic_name, self)
+
+        self.__dispatcher: Optional[threading.Thread] = None
+        if callback is not None:
+            self.__dispatcher = threading.Thread(
+                target=self.__dispatch, name=f"{topic_name}_dispatcher", daemon=True
+            )
+            self.__dispatcher.start()
+
     def __call__(self, *args, **kwargs):
         try:
+            if self.__local_samples:
+                self.__local_guard.take()
+                data_seq = []
+                while self.__local_samples:
+                    data_seq.append(self.__local_samples.popleft())
+                return data_seq
             data_seq = self.reader.take()
             return data_seq
         except Exception as e:
             logger.exception("Exception occurred while reading.")
         return None
 
+    def deliver(self, msg: Union[IdlStruct, IdlUnion]):
+        """
+        Called by the intra-process bus when a Writer in this process publishes on our topic.
+        Keeps as many samples as the History QoS depth and wakes any thread in wait_for_data.
+
+        Args:
+            msg (Union[IdlStruct, IdlUnion]): The published message (shared, not copied).
+        """
+        self.__local_samples.append(msg)
+        self.__local_guard.set(True)
+        clock.notify()
+
+    def wait_for_data(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a sample is available or the timeout expires.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait in seconds. None waits forever.
+
+        Returns:
+            bool: True if data is available, False if the wait timed out.
+        """
+        if clock.simulated:
+            # Only intra-process samples exist in a simulation; wait in simulated time.
+            clock.wait(
+                lambda: bool(self.__local_samples) or self.reader is None, timeout
+            )
+            return bool(self.__local_samples) and self.reader is not None
+        if timeout is None:
+            deadline_ns = None
+            timeout_ns = duration(infinite=True)
+        else:
+            timeout_ns = duration(seconds=max(0.0, timeout))
+            deadline_ns = time.monotonic_ns() + timeout_ns
+        while self.reader is not None:
+            if self.__local_samples:
+                return True
+            if self.__waitset.wait(timeout_ns) <= 0:
+                return False
+            if self.__local_samples or self.__read_condition.triggered:
+                return True
+            # Woken by a stale intra-process notification: clear it and keep waiting.
+            self.__local_guard.take()
+            if deadline_ns is not None:
+                timeout_ns = deadline_ns - time.monotonic_ns()
+                if timeout_ns <= 0:
+                    return False
+        return False
+
+    def take(self, timeout: Optional[float] = None) -> List[Union[IdlStruct, IdlUnion]]:
+        """
+        Waits for data (see wait_for_data) and takes whatever has arrived.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait in seconds. None waits forever.
+
+        Returns:
+            List[Union[IdlStruct, IdlUnion]]: The received samples, empty if the wait timed out.
+        """
+        if not self.wait_for_data(timeout):
+            return []
+        return self() or []
+
+    def __dispatch(self):
+        """
+        Dispatcher thread: hands every sample to the callback the moment it arrives. The
+        callback runs on this thread rather than on a DDS listener thread, so it may safely
+        publish or block without stalling DDS reception.
+        """
+        while self.reader is not None:
+            for sample in self.take(timeout=None):
+                try:
+                    self.callback(sample)
+                except Exception as e:
+                    logger.exception(f"Exception occurred in callback: {e}")
+        clock.unregister()
+
+    def close(self):
+        """
+        Stops the dispatcher, deletes the DataReader and releases the shared topic and
+        participant.
+        """
+        if self.reader is None:
+            return
+        if self.intra_process:
+            bus.unsubscribe(self.topic_name, self)
+        self.reader = None
+        self.__guard.set(True)  # wakes a dispatcher blocked in wait_for_data
+        clock.notify()
+        if (
+            self.__dispatcher is not None
+            and self.__dispatcher is not threading.current_thread()
+        ):
+            self.__dispatcher.join()
+        self.__waitset.detach(self.__read_condition)
+        self.__waitset.detach(self.__guard)
+        self.__waitset.detach(self.__local_guard)
+        registry.release_topic(self.topic)
+        registry.release_participant(self.participant)
+
+    @staticmethod
+    def __history_depth(qos: Optional[Qos]) -> Optional[int]:
+        """Returns the KeepLast depth of a QoS, None for KeepAll, 1 if unspecified."""
+        for policy in qos or ():
+            if isinstance(policy, Policy.History.KeepLast):
+                return policy.depth
+            if policy is Policy.History.KeepAll:
+                return None
+        return 1
+
 
 if __name__ == "__main__":
     reader = Reader(
@@ -45,6 +225,5 @@ if __name__ == "__main__":
         StrPOD,
     )
     for _ in range(10):
-        a = reader()
+        a = reader.take(timeout=0.5)
         print(a)
-        time.sleep(0.5)
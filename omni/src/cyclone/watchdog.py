@@ -0,0 +1,228 @@
+import math
+import threading
+from typing import Callable, Dict, List, Optional
+
+from cyclonedds.core import Listener, Policy
+
+from src.cyclone.latest_value_reader import LatestValueReader
+from src.utils.clock import clock
+from src.utils.histogram import LatencyHistogram
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class Watch:
+    """A stream watched by the Watchdog, see Watchdog.watch()."""
+
+    def __init__(
+        self,
+        reader: LatestValueReader,
+        timeout: float,
+        on_timeout: Callable[[], None],
+        on_recover: Optional[Callable[[], None]],
+    ):
+        self.reader = reader
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.on_recover = on_recover
+        self.started = clock.monotonic()
+        self.expired = False
+        self.timeouts = 0  # times the stop actions fired
+        self.reason: Optional[str] = None  # why they fired last
+        self.__received = 0  # reader.received when they fired
+
+    def silence(self, now: float) -> float:
+        """Seconds without a sample, counting from the start of the watch at most."""
+        return min(self.reader.age(), now - self.started)
+
+    def expire(self, reason: str):
+        self.expired = True
+        self.timeouts += 1
+        self.reason = reason
+        self.__received = self.reader.received
+
+    def recovered(self) -> bool:
+        """Whether a sample was taken since the stop actions fired."""
+        return self.reader.received > self.__received
+
+
+class Watchdog:
+    """
+    Fires stop actions the moment a stream goes silent, instead of every consumer comparing
+    timestamps on its next tick.
+
+    A stream is silent when, on the local monotonic clock, its LatestValueReader has taken no
+    sample for `timeout` seconds; a timer thread sleeps until the earliest such moment, so no
+    stream is polled. DDS status events fire the actions without waiting for the timer:
+    - liveliness changed: the last writer of the topic is gone (exited or lost its lease);
+    - requested deadline missed: only if the topic's Deadline QoS is at least the timeout,
+      so that a missed deadline means the stream is silent for the timeout.
+
+    Actions run on the thread that detected the silence (the timer thread or a DDS listener
+    thread), so they must be short, e.g. zeroing targets. The reaction time, from the moment
+    the stream became silent (or the DDS event) until the actions returned, is recorded in
+    `reaction` (us).
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__watches: List[Watch] = []
+        self.__changed = False
+        self.__thread: Optional[threading.Thread] = None
+        self.reaction = LatencyHistogram()
+
+    def watch(
+        self,
+        reader: LatestValueReader,
+        timeout: float,
+        on_timeout: Callable[[], None],
+        on_recover: Optional[Callable[[], None]] = None,
+    ) -> Watch:
+        """
+        Starts watching a stream. The consumer must keep calling reader.update(): a stream
+        whose consumer stopped taking samples is silent too.
+
+        Args:
+            reader (LatestValueReader): The stream.
+            timeout (float): Seconds without a sample after which the stream is silent.
+            on_timeout (Callable[[], None]): The stop action, called once per silence.
+            on_recover (Optional[Callable[[], None]]): Called when samples arrive again.
+
+        Returns:
+            Watch: Its counters; pass it to unwatch() to stop watching.
+        """
+        watch = Watch(reader, timeout, on_timeout, on_recover)
+        callbacks = {
+            "on_liveliness_changed": lambda _, status: self.__on_liveliness_changed(
+                watch, status
+            )
+        }
+        deadline = self.__deadline(reader)
+        if deadline is not None and deadline >= timeout:
+            callbacks["on_requested_deadline_missed"] = lambda _, status: self.__fire(
+                watch, "deadline", clock.monotonic()
+            )
+        reader.reader.set_listener(Listener(**callbacks))
+
+        with self.__condition:
+            self.__watches.append(watch)
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="watchdog", daemon=True
+                )
+                self.__thread.start()
+        self.__wake()
+        return watch
+
+    def unwatch(self, watch: Watch):
+        """
+        Args:
+            watch (Watch): A watch returned by watch().
+        """
+        with self.__condition:
+            if watch in self.__watches:
+                self.__watches.remove(watch)
+        if watch.reader.reader is not None:
+            watch.reader.reader.set_listener(None)
+        self.__wake()
+
+    def statistics(self) -> Dict:
+        """
+        Returns:
+            Dict: Stop actions fired per topic and the reaction time summary.
+        """
+        with self.__condition:
+            timeouts = {w.reader.topic_name: w.timeouts for w in self.__watches}
+        return {"timeouts": timeouts, "reaction": self.reaction.summary()}
+
+    def __on_liveliness_changed(self, watch: Watch, status):
+        if status.alive_count == 0 and status.alive_count_change < 0:
+            self.__fire(watch, "liveliness", clock.monotonic())
+
+    def __fire(self, watch: Watch, reason: str, silent_since: float):
+        """
+        Runs the stop actions of a stream, unless they already ran for this silence.
+
+        Args:
+            watch (Watch): The stream.
+            reason (str): "timeout", "liveliness" or "deadline".
+            silent_since (float): clock.monotonic() at which the stream counts as silent.
+        """
+        with self.__condition:
+            if watch.expired or watch not in self.__watches:
+                return
+            watch.expire(reason)
+            try:
+                watch.on_timeout()
+            except Exception as e:
+                logger.exception(
+                    f"Fout in stopactie voor {watch.reader.topic_name}: {e}"
+                )
+            self.reaction.record((clock.monotonic() - silent_since) * 1e6)
+        logger.warning(
+            f"Geen data meer op {watch.reader.topic_name} ({reason}), stopactie uitgevoerd."
+        )
+
+    def __check(self) -> float:
+        """
+        Fires the streams that went silent and recovers those that came back.
+
+        Returns:
+            float: Seconds until the next stream can go silent; inf if none is watched.
+        """
+        with self.__condition:
+            watches = list(self.__watches)
+        now = clock.monotonic()
+        next_check = math.inf
+        for watch in watches:
+            if watch.expired:
+                if watch.recovered():
+                    watch.expired = False
+                    logger.info(f"Weer data op {watch.reader.topic_name}.")
+                    if watch.on_recover is not None:
+                        watch.on_recover()
+                else:
+                    # Poll for recovery, no need to be quick about that.
+                    next_check = min(next_check, watch.timeout)
+                    continue
+            silence = watch.silence(now)
+            if silence >= watch.timeout:
+                self.__fire(watch, "timeout", now - silence + watch.timeout)
+                next_check = min(next_check, watch.timeout)
+            else:
+                next_check = min(next_check, watch.timeout - silence)
+        return next_check
+
+    def __run(self):
+        """Timer thread: sleeps until the next stream can go silent."""
+        while True:
+            with self.__condition:
+                self.__changed = False
+            timeout = self.__check()
+            timeout = None if timeout == math.inf else timeout
+            if clock.simulated:
+                clock.wait(lambda: self.__changed, timeout)
+            else:
+                with self.__condition:
+                    if not self.__changed:
+                        self.__condition.wait(timeout)
+
+    def __wake(self):
+        """Makes the timer thread re-evaluate its next wake-up."""
+        with self.__condition:
+            self.__changed = True
+            self.__condition.notify_all()
+        clock.notify()
+
+    @staticmethod
+    def __deadline(reader: LatestValueReader) -> Optional[float]:
+        """Returns the Deadline QoS period of a reader in seconds, None if it has none."""
+        for policy in reader.reader.get_qos():
+            if isinstance(policy, Policy.Deadline):
+                return policy.deadline / 1e9
+        return None
+
+
+# Process-wide watchdog.
+watchdog = Watchdog()
@@ -1,15 +1,15 @@
 import logging
 import time
-from typing import AnyStr, Union
+from typing import AnyStr, Optional, Union
 
-from cyclonedds.domain import DomainParticipant
-from cyclonedds.core import Qos
+from cyclonedds.core import Qos, Listener
 from cyclonedds.idl import IdlStruct, IdlUnion
 from cyclonedds.pub import DataWriter
-from cyclonedds.topic import Topic
 
 from src.cyclone.cycloneddsnode import CycloneDDSNode
-from src.cyclone.defaults import QOS
+from src.cyclone.intra_process import bus
+from src.cyclone.participant import registry
+from src.cyclone.qos_profiles import profiles
 from src.idl.base_types.str_pod import StrPOD
 from src.utils.default_types import CYCLONE_MESSAGE_TYPE
 from src.utils.logger import get_logger
@@ -19,23 +19,56 @@ logger = get_logger()
 
 class Writer(CycloneDDSNode):
     def __init__(
-            self,
-            topic_name: AnyStr,
-            data_type: CYCLONE_MESSAGE_TYPE,
-            qos: Qos = QOS,
-            rate_hz: int = 50,
+        self,
+        topic_name: AnyStr,
+        data_type: CYCLONE_MESSAGE_TYPE,
+        qos: Optional[Qos] = None,
+        rate_hz: int = 50,
+        domain_id: int = 0,
     ):
         super().__init__(rate_hz)
-        self.participant = DomainParticipant()
-        self.topic = Topic(self.participant, topic_name, data_type, qos=qos)
-        self.writer = DataWriter(self.participant, self.topic, qos=qos)
+        self.topic_name = topic_name
+        if qos is None:
+            qos = profiles.for_topic(topic_name)
+        self.participant = registry.acquire_participant(domain_id)
+        self.topic = registry.acquire_topic(
+            self.participant, topic_name, data_type, qos
+        )
+        self.intra_process = bus.enabled
+        # Readers in this process ignore our participant, so this counts remote readers only.
+        self.remote_readers = 0
+        listener = None
+        if self.intra_process:
+            listener = Listener(on_publication_matched=self.__on_publication_matched)
+        self.writer = DataWriter(
+            self.participant, self.topic, qos=qos, listener=listener
+        )
 
     def publish(self, msg: Union[IdlStruct, IdlUnion]):
         try:
+            if self.intra_process:
+                # Local readers get the object itself; only serialize if someone remote
+                # is listening.
+                bus.publish(self.topic_name, msg)
+                if self.remote_readers == 0:
+                    return
             self.writer.write(msg)
         except Exception as e:
             logger.exception(f"Exception occurred while writing {type(msg)}.")
 
+    def __on_publication_matched(self, writer, status):
+        self.remote_readers = status.current_count
+
+    def close(self):
+        """
+        Deletes the DataWriter and releases the shared topic and participant.
+        """
+        if self.writer is None:
+            return
+        self.writer = None
+        registry.release_topic(self.topic)
+        registry.release_participant(self.participant)
+
 
 if __name__ == "__main__":
     writer = Writer("foo", StrPOD)
@@ -1,9 +1,16 @@
 from dataclasses import dataclass, field
 
-from cyclonedds.idl import IdlStruct
+from cyclonedds.idl import IdlStruct, types
+
+from src.idl.base_types.trace_stamp_pod import TraceStampPOD
 
 
 @dataclass
 class FloatPOD(IdlStruct, typename="FloatPOD.Msg"):
     timestamp: float = field(metadata={"id": 0})
     float_: float = field(default=0.0, metadata={"id": 1})
+
+    # Per-hop latency trace, see src.utils.tracing
+    trace: types.sequence[TraceStampPOD] = field(
+        default_factory=list, metadata={"id": 2}
+    )
@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+
+from cyclonedds.idl import IdlStruct, types
+
+
+@dataclass
+class TraceStampPOD(IdlStruct, typename="TraceStampPOD.Msg"):
+    hop: types.uint8 = field(metadata={"id": 0})
+    timestamp: float = field(metadata={"id": 1})
+    # Clock id of the process that took the stamp (ClockSync.clock_id), 0 if unknown
+    clock: types.uint32 = field(default=0, metadata={"id": 2})
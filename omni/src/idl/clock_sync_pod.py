@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+
+from cyclonedds.idl import IdlStruct, types
+
+
+@dataclass
+class ClockSyncPOD(IdlStruct, typename="ClockSyncPOD.Msg"):
+    """
+    One NTP-style exchange, see src.cyclone.clock_sync. A ping carries t1; the pong echoes it
+    and adds t2 and t3. All times are clock.time() of the host that took them. Processes are
+    identified by the GUID of their DomainParticipant; trace stamps name their clock by a hash
+    of it (see TraceStampPOD).
+    """
+
+    requester: str = field(metadata={"id": 0})
+    sequence: types.uint32 = field(metadata={"id": 1})
+    t1: float = field(metadata={"id": 2})  # ping sent, requester clock
+    responder: str = field(default="", metadata={"id": 3})
+    t2: float = field(default=0.0, metadata={"id": 4})  # ping received, responder clock
+    t3: float = field(default=0.0, metadata={"id": 5})  # pong sent, responder clock
@@ -1,6 +1,8 @@
 from dataclasses import field, dataclass
 
-from cyclonedds.idl import IdlStruct
+from cyclonedds.idl import IdlStruct, types
+
+from src.idl.base_types.trace_stamp_pod import TraceStampPOD
 
 
 @dataclass
@@ -10,3 +12,8 @@ class DriveControlPOD(IdlStruct, typename="DriveControlPOD.Msg"):
     esc0: float = field(metadata={"id": 1})
     esc1: float = field(metadata={"id": 2})
     esc2: float = field(metadata={"id": 3})
+
+    # Per-hop latency trace, see src.utils.tracing
+    trace: types.sequence[TraceStampPOD] = field(
+        default_factory=list, metadata={"id": 4}
+    )
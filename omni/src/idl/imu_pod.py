@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+from cyclonedds.idl import IdlStruct, types
+
+# Column order of an IMU sample in arrays, see IMUBatchPOD.from_array and RingBuffer
+FIELDS = (
+    "timestamp",
+    "quat_w",
+    "quat_x",
+    "quat_y",
+    "quat_z",
+    "accel_x",
+    "accel_y",
+    "accel_z",
+)
+
+
+@dataclass
+class IMUPOD(IdlStruct, typename="IMUPOD.Msg"):
+    """
+    One BNO055 sample: the fused orientation as a unit quaternion and the linear acceleration
+    (gravity removed) in m/s^2.
+    """
+
+    timestamp: float = field(metadata={"id": 0})
+    quat_w: float = field(default=0.0, metadata={"id": 1})
+    quat_x: float = field(default=0.0, metadata={"id": 2})
+    quat_y: float = field(default=0.0, metadata={"id": 3})
+    quat_z: float = field(default=0.0, metadata={"id": 4})
+    accel_x: float = field(default=0.0, metadata={"id": 5})
+    accel_y: float = field(default=0.0, metadata={"id": 6})
+    accel_z: float = field(default=0.0, metadata={"id": 7})
+
+
+@dataclass
+class IMUBatchPOD(IdlStruct, typename="IMUBatchPOD.Msg"):
+    """
+    N consecutive IMU samples in one message, stored per field instead of per sample, so a
+    batch converts to and from a numpy array without a Python loop. Orientation and
+    acceleration are float32: the BNO055 resolves 2^-14 and 0.01 m/s^2, far coarser than that.
+    The sequence number of the first sample lets readers count samples lost on the link.
+    """
+
+    timestamp: float = field(metadata={"id": 0})  # time of the newest sample
+    sequence: types.uint32 = field(metadata={"id": 1})
+
+    timestamps: types.sequence[float] = field(default_factory=list, metadata={"id": 2})
+    # w, x, y, z of every sample
+    quaternions: types.sequence[types.float32] = field(
+        default_factory=list, metadata={"id": 3}
+    )
+    # x, y, z of every sample
+    accelerations: types.sequence[types.float32] = field(
+        default_factory=list, metadata={"id": 4}
+    )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_array(cls, samples: np.ndarray, sequence: int = 0) -> "IMUBatchPOD":
+        """
+        Args:
+            samples (np.ndarray): Samples as rows, columns in FIELDS order.
+            sequence (int): Number of the first sample (wraps at 2^32).
+
+        Returns:
+            IMUBatchPOD: The batch.
+        """
+        return cls(
+            float(samples[-1, 0]),
+            sequence & 0xFFFFFFFF,
+            timestamps=samples[:, 0].tolist(),
+            quaternions=samples[:, 1:5].astype(np.float32).ravel().tolist(),
+            accelerations=samples[:, 5:8].astype(np.float32).ravel().tolist(),
+        )
+
+    def to_array(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The samples as rows, columns in FIELDS order.
+        """
+        n = len(self)
+        return np.column_stack(
+            (
+                np.asarray(self.timestamps, dtype=float),
+                np.asarray(self.quaternions, dtype=float).reshape(n, 4),
+                np.asarray(self.accelerations, dtype=float).reshape(n, 3),
+            )
+        )
+
+    def to_pods(self) -> list:
+        """
+        Returns:
+            list: The samples as IMUPOD.
+        """
+        return [IMUPOD(*row) for row in self.to_array().tolist()]
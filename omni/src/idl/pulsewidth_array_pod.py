@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from cyclonedds.idl import IdlStruct, types
+
+from src.idl.base_types.trace_stamp_pod import TraceStampPOD
+
+
+@dataclass
+class PulsewidthArrayPOD(IdlStruct, typename="PulsewidthArrayPOD.Msg"):
+    """
+    The pulse width of every ESC channel in one message, so that a drive command is serialized,
+    sent and delivered once and all motors receive it in the same tick. Channel ii is motor ii
+    of config.ESC_GPIO. Pulse widths are float32: the ESCs resolve 1 us, far coarser than that.
+    The sequence number lets readers count commands lost on the link.
+    """
+
+    timestamp: float = field(metadata={"id": 0})
+    sequence: types.uint32 = field(metadata={"id": 1})
+
+    # Pulse width per channel in us
+    pulsewidths: types.sequence[types.float32] = field(
+        default_factory=list, metadata={"id": 2}
+    )
+
+    # Per-hop latency trace, see src.utils.tracing
+    trace: types.sequence[TraceStampPOD] = field(
+        default_factory=list, metadata={"id": 3}
+    )
+
+    @classmethod
+    def from_values(
+        cls,
+        timestamp: float,
+        pulsewidths: Sequence[float],
+        sequence: int = 0,
+        trace: Sequence[TraceStampPOD] = (),
+    ) -> "PulsewidthArrayPOD":
+        """
+        Args:
+            timestamp (float): Origin timestamp of the command.
+            pulsewidths (Sequence[float]): Pulse width per channel in us.
+            sequence (int): Sequence number of this message (wraps at 2^32).
+            trace (Sequence[TraceStampPOD]): The latency trace so far.
+
+        Returns:
+            PulsewidthArrayPOD: The message.
+        """
+        return cls(
+            timestamp,
+            sequence & 0xFFFFFFFF,
+            pulsewidths=list(pulsewidths),
+            trace=list(trace),
+        )
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+
+from cyclonedds.idl import IdlStruct, types
+
+from src.idl.base_types.trace_stamp_pod import TraceStampPOD
+from src.idl.xbox360_pod import Xbox360POD
+
+AXIS_SCALE = 32768  # SDL reports axes as int16; pygame divides them by 32768
+
+# Bit positions in Xbox360CompactPOD.buttons
+BUTTONS = (
+    "button_A",
+    "button_B",
+    "button_X",
+    "button_Y",
+    "button_left_bumper",
+    "button_right_bumper",
+    "button_back",
+    "button_start",
+    "button_left_stick",
+    "button_right_stick",
+)
+D_PAD_LEFT = 1 << 10
+D_PAD_RIGHT = 1 << 11
+D_PAD_DOWN = 1 << 12
+D_PAD_UP = 1 << 13
+HEARTBEAT = 1 << 14  # see Xbox360POD.heartbeat
+
+AXES = (
+    "axis_left_stick_x",
+    "axis_left_stick_y",
+    "axis_right_stick_x",
+    "axis_right_stick_y",
+    "axis_left_trigger",
+    "axis_right_trigger",
+)
+
+
+def axis_to_int16(value: float) -> int:
+    return min(max(round(value * AXIS_SCALE), -AXIS_SCALE), AXIS_SCALE - 1)
+
+
+@dataclass
+class Xbox360CompactPOD(IdlStruct, typename="Xbox360CompactPOD.Msg"):
+    """
+    The same controller state as Xbox360POD in about a third of the bytes: axes as int16 fixed
+    point (value * 32768) and the ten buttons and D-pad as bits of one uint16. Conversion is
+    lossless for values read from a gamepad, which are int16 / 32768 to begin with. The
+    sequence number lets readers count packets lost on the link.
+    """
+
+    timestamp: float = field(metadata={"id": 0})
+    sequence: types.uint32 = field(metadata={"id": 1})
+
+    axis_left_stick_x: types.int16 = field(metadata={"id": 2})
+    axis_left_stick_y: types.int16 = field(metadata={"id": 3})
+    axis_right_stick_x: types.int16 = field(metadata={"id": 4})
+    axis_right_stick_y: types.int16 = field(metadata={"id": 5})
+    axis_left_trigger: types.int16 = field(metadata={"id": 6})
+    axis_right_trigger: types.int16 = field(metadata={"id": 7})
+
+    # Bit ii is BUTTONS[ii]; bits 10-13 are the D-pad directions, bit 14 the heartbeat flag.
+    buttons: types.uint16 = field(metadata={"id": 8})
+
+    # Per-hop latency trace, see src.utils.tracing
+    trace: types.sequence[TraceStampPOD] = field(
+        default_factory=list, metadata={"id": 9}
+    )
+
+    @classmethod
+    def from_pod(cls, pod: Xbox360POD, sequence: int = 0) -> "Xbox360CompactPOD":
+        """
+        Args:
+            pod (Xbox360POD): The controller state.
+            sequence (int): Sequence number of this message (wraps at 2^32).
+
+        Returns:
+            Xbox360CompactPOD: The compact equivalent of `pod`.
+        """
+        buttons = 0
+        for bit, name in enumerate(BUTTONS):
+            if getattr(pod, name):
+                buttons |= 1 << bit
+        buttons |= D_PAD_LEFT if pod.hat_D_pad_x < 0 else 0
+        buttons |= D_PAD_RIGHT if pod.hat_D_pad_x > 0 else 0
+        buttons |= D_PAD_DOWN if pod.hat_D_pad_y < 0 else 0
+        buttons |= D_PAD_UP if pod.hat_D_pad_y > 0 else 0
+        buttons |= HEARTBEAT if pod.heartbeat else 0
+        return cls(
+            pod.timestamp,
+            sequence & 0xFFFFFFFF,
+            *(axis_to_int16(getattr(pod, name)) for name in AXES),
+            buttons=buttons,
+            trace=pod.trace,
+        )
+
+    def to_pod(self) -> Xbox360POD:
+        """
+        Returns:
+            Xbox360POD: The controller state in the full format.
+        """
+        return Xbox360POD(
+            self.timestamp,
+            *(getattr(self, name) / AXIS_SCALE for name in AXES),
+            *((self.buttons >> bit) & 1 for bit in range(len(BUTTONS))),
+            hat_D_pad_x=bool(self.buttons & D_PAD_RIGHT)
+            - bool(self.buttons & D_PAD_LEFT),
+            hat_D_pad_y=bool(self.buttons & D_PAD_UP) - bool(self.buttons & D_PAD_DOWN),
+            trace=self.trace,
+            heartbeat=bool(self.buttons & HEARTBEAT),
+        )
@@ -1,7 +1,9 @@
 from dataclasses import dataclass, field
 from typing import Tuple
 
-from cyclonedds.idl import IdlStruct
+from cyclonedds.idl import IdlStruct, types
+
+from src.idl.base_types.trace_stamp_pod import TraceStampPOD
 
 
 @dataclass
@@ -31,3 +33,11 @@ class Xbox360POD(IdlStruct, typename="Xbox360POD.Msg"):
     # Hats
     hat_D_pad_x: int = field(metadata={"id": 17})
     hat_D_pad_y: int = field(metadata={"id": 18})
+
+    # Per-hop latency trace, see src.utils.tracing
+    trace: types.sequence[TraceStampPOD] = field(
+        default_factory=list, metadata={"id": 19}
+    )
+
+    # True if the writer sent this only to show it is alive, not because the state changed
+    heartbeat: bool = field(default=False, metadata={"id": 20})
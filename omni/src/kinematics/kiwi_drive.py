@@ -0,0 +1,153 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import (
+    MOTOR0_ANGLE,
+    MOTOR1_ANGLE,
+    MOTOR2_ANGLE,
+    MOTOR0_ANGLE_INVERTED,
+    MOTOR2_ANGLE_INVERTED,
+    INVERTED,
+    WHEEL_RADIUS,
+    CHASSIS_RADIUS,
+    MAX_RPS,
+)
+
+
+class KiwiDriveKinematics:
+    """
+    Kinematics of a three-wheeled omni-wheel (kiwi) drive.
+
+    The full body-to-wheel mapping (motor angles, wheel radius, chassis radius and MAX_RPS) is
+    collapsed into one 3x3 matrix at construction:
+
+        [esc0, esc1, esc2]^T = K @ [dx, dy, d_omega]^T
+
+    where dx, dy are in m/s, d_omega in rad/s and esc0..2 are wheel speeds as a fraction of
+    MAX_RPS (the values carried by DriveControlPOD). Row i of K is
+
+        [cos(theta_i), sin(theta_i), CHASSIS_RADIUS] / (2 * pi * WHEEL_RADIUS * MAX_RPS)
+
+    Wheel commands are normalized so that no wheel exceeds MAX_RPS: if the largest magnitude
+    exceeds 1, all wheels are scaled down by the same factor, which preserves the direction of
+    motion.
+    """
+
+    def __init__(
+        self,
+        motor_angles: Optional[Sequence[float]] = None,
+        wheel_radius: float = WHEEL_RADIUS,
+        chassis_radius: float = CHASSIS_RADIUS,
+        max_rps: float = MAX_RPS,
+    ):
+        """
+        Args:
+            motor_angles (Optional[Sequence[float]]): Angle of each motor axis w.r.t. the body
+                x-axis in degrees. Defaults to the angles from src.config, honouring INVERTED.
+            wheel_radius (float): Wheel radius in m.
+            chassis_radius (float): Distance from the chassis center to the wheels in m.
+            max_rps (float): Maximum wheel speed in rounds per second.
+        """
+        if motor_angles is None:
+            motor_angles = (
+                MOTOR0_ANGLE if not INVERTED else MOTOR0_ANGLE_INVERTED,
+                MOTOR1_ANGLE,
+                MOTOR2_ANGLE if not INVERTED else MOTOR2_ANGLE_INVERTED,
+            )
+        self.max_rps = max_rps
+
+        theta = np.deg2rad(np.asarray(motor_angles, dtype=float))
+        rps_per_mps = 1.0 / (2 * np.pi * wheel_radius)
+        # body velocity (m/s, m/s, rad/s) -> wheel speed (rounds per second)
+        self.matrix_rps = rps_per_mps * np.stack(
+            [np.cos(theta), np.sin(theta), np.full(3, chassis_radius)], axis=1
+        )
+        # body velocity -> wheel speed as a fraction of MAX_RPS
+        self.matrix = self.matrix_rps / max_rps
+        # wheel speed as a fraction of MAX_RPS -> body velocity
+        self.inverse_matrix = np.linalg.inv(self.matrix)
+
+        # Plain float copies for the scalar paths, which avoid numpy overhead per tick.
+        self.__k = tuple(tuple(float(v) for v in row) for row in self.matrix)
+        self.__k_inv = tuple(
+            tuple(float(v) for v in row) for row in self.inverse_matrix
+        )
+
+    def wheel_speeds(
+        self, dx: float, dy: float, d_omega: float
+    ) -> Tuple[float, float, float]:
+        """
+        Inverse kinematics for a single command. Works on Python floats only, so no arrays
+        are allocated per call.
+
+        Args:
+            dx (float): Desired linear velocity in the x-direction (m/s).
+            dy (float): Desired linear velocity in the y-direction (m/s).
+            d_omega (float): Desired angular velocity (rad/s).
+
+        Returns:
+            Tuple[float, float, float]: Normalized wheel speeds in [-1, 1] (fraction of MAX_RPS).
+        """
+        (a0, a1, a2), (b0, b1, b2), (c0, c1, c2) = self.__k
+        w0 = a0 * dx + a1 * dy + a2 * d_omega
+        w1 = b0 * dx + b1 * dy + b2 * d_omega
+        w2 = c0 * dx + c1 * dy + c2 * d_omega
+
+        max_speed = max(abs(w0), abs(w1), abs(w2))
+        if max_speed > 1.0:
+            w0, w1, w2 = w0 / max_speed, w1 / max_speed, w2 / max_speed
+        return w0, w1, w2
+
+    def wheel_speeds_batch(
+        self, body_velocities: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Vectorized inverse kinematics, including normalization.
+
+        Args:
+            body_velocities (np.ndarray): (N, 3) array of [dx, dy, d_omega].
+            out (Optional[np.ndarray]): Optional (N, 3) float array to write the result into.
+
+        Returns:
+            np.ndarray: (N, 3) normalized wheel speeds.
+        """
+        out = np.matmul(body_velocities, self.matrix.T, out=out)
+        max_speed = np.abs(out).max(axis=1, keepdims=True)
+        np.maximum(max_speed, 1.0, out=max_speed)
+        out /= max_speed
+        return out
+
+    def body_velocity(
+        self, w0: float, w1: float, w2: float
+    ) -> Tuple[float, float, float]:
+        """
+        Forward kinematics for a single set of wheel speeds.
+
+        Args:
+            w0, w1, w2 (float): Wheel speeds as a fraction of MAX_RPS.
+
+        Returns:
+            Tuple[float, float, float]: Body velocity dx (m/s), dy (m/s), d_omega (rad/s).
+        """
+        (a0, a1, a2), (b0, b1, b2), (c0, c1, c2) = self.__k_inv
+        return (
+            a0 * w0 + a1 * w1 + a2 * w2,
+            b0 * w0 + b1 * w1 + b2 * w2,
+            c0 * w0 + c1 * w1 + c2 * w2,
+        )
+
+    def body_velocity_batch(
+        self, wheel_speeds: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Vectorized forward kinematics.
+
+        Args:
+            wheel_speeds (np.ndarray): (N, 3) wheel speeds as a fraction of MAX_RPS.
+            out (Optional[np.ndarray]): Optional (N, 3) float array to write the result into.
+
+        Returns:
+            np.ndarray: (N, 3) body velocities [dx, dy, d_omega].
+        """
+        return np.matmul(wheel_speeds, self.inverse_matrix.T, out=out)
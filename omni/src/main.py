@@ -1,15 +1,12 @@
 import time
 
 from src.cyclone.writer import Writer
-from src.idl.base_types.float_pod import FloatPOD
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
 
-writer0 = Writer("ESC0_pulsewidth", FloatPOD)
-writer1 = Writer("ESC1_pulsewidth", FloatPOD)
-writer2 = Writer("ESC2_pulsewidth", FloatPOD)
+writer = Writer("ESC_pulsewidths", PulsewidthArrayPOD)
 
 t0 = time.time()
 while time.time() < t0 + 2:
-    writer0.publish(FloatPOD(timestamp=time.time(), float_=1400))
-    # writer1.publish(FloatPOD(timestamp=time.time(), float_=1400))
-    # writer2.publish(FloatPOD(timestamp=time.time(), float_=1400))
-    writer0.sleep()
+    # Motor 0 at 1400, motors 1 and 2 stationary
+    writer.publish(PulsewidthArrayPOD.from_values(time.time(), [1400, 1500, 1500]))
+    writer.sleep()
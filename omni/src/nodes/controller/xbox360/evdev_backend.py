@@ -0,0 +1,382 @@
+import argparse
+import errno
+import fcntl
+import glob
+import os
+import re
+import select
+import struct
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from src.idl.xbox360_pod import Xbox360POD
+from src.nodes.controller.xbox360.joystick_backend import JoystickBackend
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# struct input_event from <linux/input.h>: struct timeval, __u16 type, __u16 code, __s32 value
+INPUT_EVENT = struct.Struct("llHHi")
+ABSINFO = struct.Struct("6i")  # value, minimum, maximum, fuzz, flat, resolution
+
+EV_SYN, EV_KEY, EV_ABS = 0x00, 0x01, 0x03
+SYN_REPORT, SYN_DROPPED = 0x00, 0x03
+KEY_MAX = 0x2FF
+BTN_GAMEPAD = 0x130
+
+# Event codes of an Xbox 360 controller (xpad driver) and the Xbox360POD fields they set
+BUTTON_CODES = {
+    0x130: "button_A",  # BTN_A
+    0x131: "button_B",  # BTN_B
+    0x133: "button_X",  # BTN_X
+    0x134: "button_Y",  # BTN_Y
+    0x136: "button_left_bumper",  # BTN_TL
+    0x137: "button_right_bumper",  # BTN_TR
+    0x13A: "button_back",  # BTN_SELECT
+    0x13B: "button_start",  # BTN_START
+    0x13D: "button_left_stick",  # BTN_THUMBL
+    0x13E: "button_right_stick",  # BTN_THUMBR
+}
+AXIS_CODES = {
+    0x00: "axis_left_stick_x",  # ABS_X
+    0x01: "axis_left_stick_y",  # ABS_Y
+    0x02: "axis_left_trigger",  # ABS_Z
+    0x03: "axis_right_stick_x",  # ABS_RX
+    0x04: "axis_right_stick_y",  # ABS_RY
+    0x05: "axis_right_trigger",  # ABS_RZ
+}
+ABS_HAT0X, ABS_HAT0Y = 0x10, 0x11
+# Axis ranges reported by xpad, used for streams, which cannot be queried with ioctl
+DEFAULT_ABS_RANGES = {
+    0x00: (-32768, 32767),
+    0x01: (-32768, 32767),
+    0x02: (0, 255),
+    0x03: (-32768, 32767),
+    0x04: (-32768, 32767),
+    0x05: (0, 255),
+}
+
+
+def _ior(nr: int, size: int) -> int:
+    """The _IOR('E', nr, size) ioctl request number of the evdev interface."""
+    return (2 << 30) | (size << 16) | (ord("E") << 8) | nr
+
+
+def EVIOCGNAME(length: int) -> int:
+    return _ior(0x06, length)
+
+
+def EVIOCGKEY(length: int) -> int:
+    return _ior(0x18, length)
+
+
+def EVIOCGBIT(ev: int, length: int) -> int:
+    return _ior(0x20 + ev, length)
+
+
+def EVIOCGABS(code: int) -> int:
+    return _ior(0x40 + code, ABSINFO.size)
+
+
+def pack_event(
+    type_: int, code: int, value: int, timestamp: Optional[float] = None
+) -> bytes:
+    """Encodes one input_event, e.g. to write a recorded or synthetic event stream."""
+    timestamp = time.time() if timestamp is None else timestamp
+    sec = int(timestamp)
+    return INPUT_EVENT.pack(sec, int((timestamp - sec) * 1e6), type_, code, value)
+
+
+def find_gamepads() -> List[str]:
+    """
+    Returns:
+        List[str]: The /dev/input/event* devices that have gamepad buttons, in device order.
+    """
+    paths = sorted(
+        glob.glob("/dev/input/event*"), key=lambda p: int(re.sub(r"\D", "", p) or 0)
+    )
+    gamepads = []
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            continue  # no permission, or unplugged while scanning
+        try:
+            keys = bytearray(KEY_MAX // 8 + 1)
+            fcntl.ioctl(fd, EVIOCGBIT(EV_KEY, len(keys)), keys)
+            if keys[BTN_GAMEPAD // 8] & (1 << (BTN_GAMEPAD % 8)):
+                gamepads.append(path)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return gamepads
+
+
+class EvdevBackend(JoystickBackend):
+    """
+    Reads the controller directly from its Linux input device (/dev/input/event*), without
+    pygame. The device is waited on with epoll and the controller state is updated event by
+    event; a batch of events is applied when its SYN_REPORT arrives, so a published state is
+    always consistent. After SYN_DROPPED (the kernel buffer overflowed) the state is re-read
+    from the device.
+
+    When the controller is unplugged, reading fails with ENODEV; the backend then reports
+    itself disconnected and looks for the controller again every RECONNECT_INTERVAL.
+
+    Instead of a device, a stream of raw input_event structs can be given (a pipe or a file,
+    e.g. recorded with `cat /dev/input/eventN > buttons.bin`), which makes the backend
+    testable without hardware.
+    """
+
+    RECONNECT_INTERVAL = 0.5  # s
+    READ_SIZE = 64 * INPUT_EVENT.size
+
+    def __init__(
+        self,
+        controller_number: int = 0,
+        device: Optional[str] = None,
+        stream: Union[str, BinaryIO, None] = None,
+    ):
+        """
+        Args:
+            controller_number (int): Which gamepad to use, in /dev/input/event* order.
+            device (Optional[str]): Use this event device instead of searching.
+            stream (Union[str, BinaryIO, None]): Read input_events from this file, pipe or
+                path instead of a device.
+        """
+        self.controller_number = controller_number
+        self.device = device
+        self.name = ""
+        self.connected = False
+        self.__fd: Optional[int] = None
+        self.__stream = stream is not None
+        self.__pollable = True
+        self.__epoll = select.epoll()
+        self.__buffer = b""
+        self.__ranges: Dict[int, Tuple[int, int]] = dict(DEFAULT_ABS_RANGES)
+        self.__values: Dict[str, float] = {}
+        self.__pending: Dict[Tuple[int, int], int] = {}
+        self.__dropped = False
+        self.__next_reconnect = 0.0
+        self.__reset_state()
+
+        if self.__stream:
+            if isinstance(stream, str):
+                stream = open(stream, "rb")
+            self.__open(stream.fileno(), name=getattr(stream, "name", "stream"))
+            self.__stream_file = stream  # keeps the file object (and its fd) alive
+        elif not self.__connect():
+            logger.exception(
+                f"Ik kan controller {controller_number} niet vinden. "
+                f"Er zijn {len(find_gamepads())} controllers aangesloten."
+            )
+            raise RuntimeError(f"Controller {controller_number} is invalid.")
+        else:
+            logger.info(f"Controller {controller_number} ({self.name}) connected.")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.__fd is None:
+                if not self.__stream and time.monotonic() >= self.__next_reconnect:
+                    self.__next_reconnect = time.monotonic() + self.RECONNECT_INTERVAL
+                    if self.__connect():
+                        logger.info(f"Controller {self.name} opnieuw verbonden.")
+                        return True
+                if self.__stream or (
+                    deadline is not None and time.monotonic() >= deadline
+                ):
+                    return False
+                time.sleep(self.__remaining(deadline, self.RECONNECT_INTERVAL))
+                continue
+
+            if self.__pollable:
+                remaining = self.__remaining(deadline)
+                if not self.__epoll.poll(-1 if remaining is None else remaining):
+                    return False
+            if self.__read_available():
+                return True
+            if not self.__pollable or (
+                deadline is not None and time.monotonic() >= deadline
+            ):
+                return False
+
+    def read(self) -> Optional[Xbox360POD]:
+        if not self.connected:
+            return None
+        return Xbox360POD(timestamp=time.time(), **self.__values)
+
+    def close(self):
+        self.__disconnect()
+        self.__epoll.close()
+
+    def __connect(self) -> bool:
+        """Opens the configured device, or the controller_number-th gamepad."""
+        if self.device is not None:
+            paths = [self.device]
+        else:
+            paths = find_gamepads()[self.controller_number : self.controller_number + 1]
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                continue
+            try:
+                name = bytearray(256)
+                fcntl.ioctl(fd, EVIOCGNAME(len(name)), name)
+                for code in AXIS_CODES:
+                    absinfo = bytearray(ABSINFO.size)
+                    fcntl.ioctl(fd, EVIOCGABS(code), absinfo)
+                    _, minimum, maximum, *_ = ABSINFO.unpack(absinfo)
+                    if maximum > minimum:
+                        self.__ranges[code] = (minimum, maximum)
+            except OSError:  # unplugged while connecting
+                os.close(fd)
+                continue
+            self.__open(fd, name=name.split(b"\0", 1)[0].decode(errors="replace"))
+            self.__resync()
+            return True
+        return False
+
+    def __open(self, fd: int, name: str):
+        self.__fd = fd
+        self.name = name
+        self.connected = True
+        self.__buffer = b""
+        os.set_blocking(fd, False)
+        try:
+            self.__epoll.register(fd, select.EPOLLIN)
+            self.__pollable = True
+        except PermissionError:  # regular files cannot be polled; they never block
+            self.__pollable = False
+
+    def __disconnect(self):
+        if self.__fd is None:
+            return
+        if self.__pollable:
+            self.__epoll.unregister(self.__fd)
+        if not self.__stream:
+            os.close(self.__fd)
+        self.__fd = None
+        self.connected = False
+        self.__reset_state()
+
+    def __read_available(self) -> bool:
+        """Reads and applies all pending events. Returns True if a report was applied."""
+        changed = False
+        while self.__fd is not None:
+            try:
+                data = os.read(self.__fd, self.READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.ENODEV:
+                    raise
+                logger.warning("Controller niet verbonden!")
+                self.__disconnect()
+                break
+            if not data:  # end of a stream; apply what was read first
+                if not changed:
+                    self.__disconnect()
+                break
+            self.__buffer += data
+            end = len(self.__buffer) - len(self.__buffer) % INPUT_EVENT.size
+            for _, _, type_, code, value in INPUT_EVENT.iter_unpack(
+                self.__buffer[:end]
+            ):
+                changed |= self.__apply(type_, code, value)
+            self.__buffer = self.__buffer[end:]
+            if not self.__pollable and len(data) < self.READ_SIZE:
+                break
+        return changed
+
+    def __apply(self, type_: int, code: int, value: int) -> bool:
+        """Applies one event. Returns True if it completed a report."""
+        if type_ == EV_SYN:
+            if code == SYN_DROPPED:
+                self.__dropped = True
+                self.__pending.clear()
+            elif code == SYN_REPORT:
+                if self.__dropped:
+                    self.__dropped = False
+                    self.__resync()
+                else:
+                    for (
+                        pending_type,
+                        pending_code,
+                    ), pending_value in self.__pending.items():
+                        self.__set(pending_type, pending_code, pending_value)
+                self.__pending.clear()
+                return True
+        elif not self.__dropped and type_ in (EV_KEY, EV_ABS):
+            self.__pending[(type_, code)] = value
+        return False
+
+    def __set(self, type_: int, code: int, value: int):
+        if type_ == EV_KEY and code in BUTTON_CODES:
+            self.__values[BUTTON_CODES[code]] = 1 if value else 0
+        elif type_ == EV_ABS and code in AXIS_CODES:
+            # Scale to pygame's convention: int16 / 32768, whatever the device range.
+            minimum, maximum = self.__ranges[code]
+            scaled = round((value - minimum) * 65535 / (maximum - minimum)) - 32768
+            self.__values[AXIS_CODES[code]] = min(max(scaled, -32768), 32767) / 32768
+        elif type_ == EV_ABS and code == ABS_HAT0X:
+            self.__values["hat_D_pad_x"] = value
+        elif type_ == EV_ABS and code == ABS_HAT0Y:
+            self.__values["hat_D_pad_y"] = -value  # evdev: up is -1, pygame: up is +1
+
+    def __resync(self):
+        """Reads the full state from the device, after connecting or SYN_DROPPED."""
+        if self.__stream or self.__fd is None:
+            return  # a stream cannot be queried; the next events bring it up to date
+        keys = bytearray(KEY_MAX // 8 + 1)
+        fcntl.ioctl(self.__fd, EVIOCGKEY(len(keys)), keys)
+        for code in BUTTON_CODES:
+            self.__set(EV_KEY, code, keys[code // 8] & (1 << (code % 8)))
+        for code in list(AXIS_CODES) + [ABS_HAT0X, ABS_HAT0Y]:
+            absinfo = bytearray(ABSINFO.size)
+            try:
+                fcntl.ioctl(self.__fd, EVIOCGABS(code), absinfo)
+            except OSError:
+                continue
+            self.__set(EV_ABS, code, ABSINFO.unpack(absinfo)[0])
+
+    def __reset_state(self):
+        """Sets every input to its rest position."""
+        for code in BUTTON_CODES:
+            self.__set(EV_KEY, code, 0)
+        for code in AXIS_CODES:
+            minimum, maximum = self.__ranges[code]
+            rest = 0 if minimum < 0 < maximum else minimum  # triggers rest at minimum
+            self.__set(EV_ABS, code, rest)
+        self.__set(EV_ABS, ABS_HAT0X, 0)
+        self.__set(EV_ABS, ABS_HAT0Y, 0)
+
+    @staticmethod
+    def __remaining(
+        deadline: Optional[float], cap: Optional[float] = None
+    ) -> Optional[float]:
+        if deadline is None:
+            return cap
+        remaining = max(0.0, deadline - time.monotonic())
+        return remaining if cap is None else min(remaining, cap)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print controller states read from an input device or event stream."
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=None,
+        help="A /dev/input/event* device or a file of input_events. Searches if omitted.",
+    )
+    args = parser.parse_args()
+    if args.source is None or args.source.startswith("/dev/input/"):
+        backend = EvdevBackend(device=args.source)
+    else:
+        backend = EvdevBackend(stream=args.source)
+    while backend.wait() or backend.connected:
+        print(backend.read())
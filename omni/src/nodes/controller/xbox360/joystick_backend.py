@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.idl.xbox360_pod import Xbox360POD
+
+
+class JoystickBackend(ABC):
+    """
+    The interface between Xbox360Writer and a source of controller input. A backend keeps the
+    controller state up to date, handles the controller being unplugged and plugged back in,
+    and lets the writer block until input arrives. A backend must implement wait() and
+    read(); one that does not cannot be instantiated.
+    """
+
+    connected: bool = False
+
+    @abstractmethod
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Processes pending input, blocking until input arrives or the timeout expires.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait in seconds; 0 only processes what
+                is pending, None waits forever.
+
+        Returns:
+            bool: True if the controller state changed.
+        """
+
+    @abstractmethod
+    def read(self) -> Optional[Xbox360POD]:
+        """
+        Returns:
+            Optional[Xbox360POD]: The current controller state, or None while disconnected.
+        """
+
+    def close(self):
+        pass
+
+
+def make_backend(name: str, controller_number: int = 0) -> JoystickBackend:
+    """
+    Creates a backend by name. Backends are imported here, so pygame is only loaded when the
+    pygame backend is used.
+
+    Args:
+        name (str): "evdev" (Linux input events), "pygame", or "scripted" (the fixed
+            driving scenario of src.simulation.scripted_joystick, without a controller).
+        controller_number (int): Which of the connected controllers to use.
+
+    Returns:
+        JoystickBackend: The connected backend.
+    """
+    if name == "evdev":
+        from src.nodes.controller.xbox360.evdev_backend import EvdevBackend
+
+        return EvdevBackend(controller_number)
+    if name == "pygame":
+        from src.nodes.controller.xbox360.pygame_backend import PygameBackend
+
+        return PygameBackend(controller_number)
+    if name == "scripted":
+        from src.simulation.scripted_joystick import ScriptedJoystick
+
+        return ScriptedJoystick()
+    raise ValueError(f"Unknown joystick backend {name!r}")
@@ -0,0 +1,124 @@
+import time
+from typing import Optional, Tuple
+
+import pygame
+from pygame.joystick import JoystickType
+
+from src.idl.xbox360_pod import Xbox360POD
+from src.nodes.controller.xbox360.joystick_backend import JoystickBackend
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+INPUT_EVENTS = (
+    pygame.JOYAXISMOTION,
+    pygame.JOYBUTTONDOWN,
+    pygame.JOYBUTTONUP,
+    pygame.JOYHATMOTION,
+)
+
+
+class PygameBackend(JoystickBackend):
+    """
+    Reads the controller through pygame/SDL. Unplugging and replugging is handled with the
+    JOYDEVICEREMOVED/JOYDEVICEADDED events.
+    """
+
+    def __init__(self, controller_number: int = 0):
+        """
+        Args:
+            controller_number (int): The pygame joystick index.
+        """
+        pygame.init()
+        self.controller_number = controller_number
+        self.joystick: Optional[JoystickType] = self.__init_controller(
+            controller_number
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self.joystick is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if timeout == 0:
+            events = pygame.event.get()
+        else:
+            event = pygame.event.wait(
+                0 if timeout is None else max(1, int(timeout * 1000))
+            )
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events += pygame.event.get()
+
+        changed = False
+        for event in events:
+            if event.type == pygame.JOYDEVICEREMOVED:
+                if self.joystick is not None and (
+                    event.instance_id == self.joystick.get_instance_id()
+                ):
+                    self.joystick = None
+            elif event.type == pygame.JOYDEVICEADDED and self.joystick is None:
+                try:
+                    self.joystick = self.__init_controller(
+                        self.controller_number, suppress_log=True
+                    )
+                    changed = True
+                except RuntimeError:
+                    pass
+            elif event.type in INPUT_EVENTS:
+                changed = True
+        return changed
+
+    def read(self) -> Optional[Xbox360POD]:
+        if self.joystick is None:
+            return None
+        D_pad: Tuple[int, int] = self.joystick.get_hat(0)
+        return Xbox360POD(
+            timestamp=time.time(),
+            axis_left_stick_x=self.joystick.get_axis(0),
+            axis_left_stick_y=self.joystick.get_axis(1),
+            axis_right_stick_x=self.joystick.get_axis(3),
+            axis_right_stick_y=self.joystick.get_axis(4),
+            axis_left_trigger=self.joystick.get_axis(2),
+            axis_right_trigger=self.joystick.get_axis(5),
+            button_A=self.joystick.get_button(0),
+            button_B=self.joystick.get_button(1),
+            button_X=self.joystick.get_button(2),
+            button_Y=self.joystick.get_button(3),
+            button_left_bumper=self.joystick.get_button(4),
+            button_right_bumper=self.joystick.get_button(5),
+            button_back=self.joystick.get_button(6),
+            button_start=self.joystick.get_button(7),
+            button_left_stick=self.joystick.get_button(9),
+            button_right_stick=self.joystick.get_button(8),
+            hat_D_pad_x=D_pad[0],
+            hat_D_pad_y=D_pad[1],
+        )
+
+    def close(self):
+        pygame.joystick.quit()
+
+    @staticmethod
+    def __init_controller(
+        controller_number: int, suppress_log: bool = False
+    ) -> JoystickType:
+        pygame.joystick.init()
+
+        # Get count of joysticks
+        joystick_count = pygame.joystick.get_count()
+        if joystick_count <= controller_number:
+            if not suppress_log:
+                logger.exception(
+                    f"Ik kan controller {controller_number} niet vinden. "
+                    f"Er zijn {joystick_count} controllers aangesloten."
+                )
+            raise RuntimeError(
+                f"Controller {controller_number} is invalid. "
+                f"Only {joystick_count} joysticks are detected."
+            )
+        joystick = pygame.joystick.Joystick(controller_number)
+        joystick.init()
+        if not suppress_log:
+            logger.info(
+                f"Controller {controller_number} ({joystick.get_name()}) connected."
+            )
+        return joystick
@@ -1,15 +1,16 @@
-import os
 import time
-from copy import copy
+from typing import Dict, List, Optional, Tuple
 
 from src.cyclone.cycloneddsnode import CycloneDDSNode
 from src.idl.xbox360_pod import Xbox360POD
 from src.nodes.controller.xbox360.xbox360_reader import Xbox360Reader
 from src.utils.logger import get_logger
-from src.utils.tools import pyout, pretty_string
+from src.utils.terminal_renderer import Template, TerminalRenderer
 
 logger = get_logger()
 
+Segments = List[Tuple[str, Optional[str]]]
+
 
 class Xbox360Plotter(CycloneDDSNode):
     ascii_base = """
@@ -58,129 +59,112 @@ class Xbox360Plotter(CycloneDDSNode):
   \________/                                \_________/
      """
 
+    # Placeholders in ascii_base; the D-pad arrows keep their character unless pressed
+    fields = (
+        ["L_trigg", "R_trigg", "Lbump", "Rbump", "but_A", "btB", "btX", "but_Y"]
+        + ["back", "strt", "l_stick", "r_stick", "^", "v", "<", ">"]
+        + [f"{side}_joy_{ii}" for side in "lr" for ii in range(5)]
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__()
         self.controller = Xbox360Reader(suppress_warnings=True)
+        self.template = Template(self.ascii_base, self.fields)
+        self.connection_lines = self.connection.split("\n")
+        self.renderer = TerminalRenderer(self.template.rows, self.template.cols)
 
         self.__run()
 
     def __run(self):
         time.sleep(5)
-        os.system("clear")
+        last_log = time.monotonic()
         while True:
             try:
-                state = self.controller.state
-
-                ascii = copy(self.ascii_base)
-                ascii = self.__buttons(ascii, state)
-                ascii = self.__joysticks(ascii, state)
-                ascii = self.__dpad(ascii, state)
-
-                print(ascii)
-                nr_of_lines = len(ascii.split("\n"))
-                print(f"\033[{nr_of_lines}A", end="\r")
-            except AttributeError:
-                print(pretty_string(self.connection, color="YELLOW"))
-                nr_of_lines = len(self.connection.split("\n"))
-                print(f"\033[{nr_of_lines}A", end="\r")
-
+                self.wait_for(self.controller)
+                state = self.controller.get_state(timeout=0.0)
+                if state is None:
+                    self.renderer.blit(self.connection_lines, color="YELLOW")
+                else:
+                    self.renderer.blit(self.template.lines)
+                    for name, segments in self.__field_values(state).items():
+                        for row, col in self.template.positions[name]:
+                            for text, color in segments:
+                                self.renderer.draw(row, col, text, color)
+                                col += len(text)
+                self.renderer.flush()
             except Exception as e:
                 logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
+            if time.monotonic() - last_log > self.STATISTICS_LOG_INTERVAL:
+                logger.debug(f"Xbox360Plotter: {self.renderer.statistics()}")
+                last_log = time.monotonic()
             self.sleep()
 
-    def __buttons(self, ascii: str, state: Xbox360POD) -> str:
-        button_A = pretty_string("#####", color="GREEN") if state.button_A else "     "
-        ascii = ascii.replace("but_A", button_A)
-
-        button_B = pretty_string("###", color="RED") if state.button_B else "   "
-        ascii = ascii.replace("btB", button_B)
-
-        button_X = pretty_string("###", color="BLUE") if state.button_X else "   "
-        ascii = ascii.replace("btX", button_X)
-
-        button_Y = pretty_string("#####", color="YELLOW") if state.button_Y else "     "
-        ascii = ascii.replace("but_Y", button_Y)
-
-        l_bump = (
-            pretty_string("#####", color="CYAN")
-            if state.button_left_bumper
-            else "====="
-        )
-        ascii = ascii.replace("Lbump", l_bump)
-
-        r_bump = (
-            pretty_string("#####", color="CYAN")
-            if state.button_right_bumper
-            else "====="
-        )
-        ascii = ascii.replace("Rbump", r_bump)
-
-        back = pretty_string("####", color="CYAN") if state.button_back else "    "
-        ascii = ascii.replace("back", back)
-
-        strt = pretty_string("####", color="CYAN") if state.button_start else "    "
-        ascii = ascii.replace("strt", strt)
-
-        l_stick = (
-            pretty_string("VVVVVVV", color="CYAN")
-            if state.button_left_stick
-            else "       "
-        )
-        ascii = ascii.replace("l_stick", l_stick)
-        r_stick = (
-            pretty_string("VVVVVVV", color="CYAN")
-            if state.button_right_stick
-            else "       "
-        )
-        ascii = ascii.replace("r_stick", r_stick)
-
-        return ascii
-
-    def __joysticks(self, ascii: str, state: Xbox360POD) -> str:
-        ly = min(int((state.axis_left_stick_y + 1) / 2 * 5), 4)
-        lx = min(int((state.axis_left_stick_x + 1) / 2 * 7), 6)
-        for ii in range(5):
-            row_str = list("       ")
-            row_str[lx] = "X"
-            row_str = "".join(row_str) if ii == ly else "       "
-            ascii = ascii.replace(f"l_joy_{ii}", pretty_string(row_str, color="CYAN"))
-
-        ry = min(int((state.axis_right_stick_y + 1) / 2 * 5), 4)
-        rx = min(int((state.axis_right_stick_x + 1) / 2 * 7), 6)
-        for ii in range(5):
-            row_str = list("       ")
-            row_str[rx] = "X"
-            row_str = "".join(row_str) if ii == ry else "       "
-            ascii = ascii.replace(f"r_joy_{ii}", pretty_string(row_str, color="CYAN"))
-
-        l_trigger = min(int((state.axis_left_trigger + 1) / 2 * 7 + 0.5), 7)
-        ascii = ascii.replace(
-            f"L_trigg",
-            pretty_string("#" * l_trigger, color="CYAN") + ("=" * (7 - l_trigger)),
-        )
-
-        r_trigger = min(int((state.axis_right_trigger + 1) / 2 * 7 + 0.5), 7)
-        ascii = ascii.replace(
-            f"R_trigg",
-            pretty_string("#" * r_trigger, color="CYAN") + ("=" * (7 - r_trigger)),
-        )
-        return ascii
-
-    def __dpad(self, ascii: str, state: Xbox360POD) -> str:
-        x = state.hat_D_pad_x
-        y = state.hat_D_pad_y
-
-        if y == 1:
-            ascii = ascii.replace("^", pretty_string("#", color="CYAN"))
-        elif y == -1:
-            ascii = ascii.replace("v", pretty_string("#", color="CYAN"))
-
-        if x == 1:
-            ascii = ascii.replace(">", pretty_string("#", color="CYAN"))
-        elif x == -1:
-            ascii = ascii.replace("<", pretty_string("#", color="CYAN"))
-
-        return ascii
+    def __field_values(self, state: Xbox360POD) -> Dict[str, Segments]:
+        """
+        Returns:
+            Dict[str, Segments]: The (text, color name) segments per field.
+                Fields that are not included keep the template text.
+        """
+        values = {}
+        values.update(self.__buttons(state))
+        values.update(self.__joysticks(state))
+        values.update(self.__dpad(state))
+        return values
+
+    @staticmethod
+    def __buttons(state: Xbox360POD) -> Dict[str, Segments]:
+        def button(
+            pressed, width: int, color: str, released: str = " ", char: str = "#"
+        ):
+            return [(char * width, color)] if pressed else [(released * width, None)]
+
+        return {
+            "but_A": button(state.button_A, 5, "GREEN"),
+            "btB": button(state.button_B, 3, "RED"),
+            "btX": button(state.button_X, 3, "BLUE"),
+            "but_Y": button(state.button_Y, 5, "YELLOW"),
+            "Lbump": button(state.button_left_bumper, 5, "CYAN", "="),
+            "Rbump": button(state.button_right_bumper, 5, "CYAN", "="),
+            "back": button(state.button_back, 4, "CYAN"),
+            "strt": button(state.button_start, 4, "CYAN"),
+            "l_stick": button(state.button_left_stick, 7, "CYAN", char="V"),
+            "r_stick": button(state.button_right_stick, 7, "CYAN", char="V"),
+        }
+
+    @staticmethod
+    def __joysticks(state: Xbox360POD) -> Dict[str, Segments]:
+        values = {}
+        for side, x, y in (
+            ("l", state.axis_left_stick_x, state.axis_left_stick_y),
+            ("r", state.axis_right_stick_x, state.axis_right_stick_y),
+        ):
+            row = min(int((y + 1) / 2 * 5), 4)
+            col = min(int((x + 1) / 2 * 7), 6)
+            for ii in range(5):
+                text = " " * col + "X" + " " * (6 - col) if ii == row else "       "
+                values[f"{side}_joy_{ii}"] = [(text, "CYAN")]
+
+        # The pressed part of a trigger bar is colored, the rest is not.
+        for name, value in (
+            ("L_trigg", state.axis_left_trigger),
+            ("R_trigg", state.axis_right_trigger),
+        ):
+            pressed = min(int((value + 1) / 2 * 7 + 0.5), 7)
+            values[name] = [("#" * pressed, "CYAN"), ("=" * (7 - pressed), None)]
+        return values
+
+    @staticmethod
+    def __dpad(state: Xbox360POD) -> Dict[str, Segments]:
+        values = {}
+        if state.hat_D_pad_y == 1:
+            values["^"] = [("#", "CYAN")]
+        elif state.hat_D_pad_y == -1:
+            values["v"] = [("#", "CYAN")]
+        if state.hat_D_pad_x == 1:
+            values[">"] = [("#", "CYAN")]
+        elif state.hat_D_pad_x == -1:
+            values["<"] = [("#", "CYAN")]
+        return values
 
 
 if __name__ == "__main__":
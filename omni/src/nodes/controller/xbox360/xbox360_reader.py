@@ -1,10 +1,10 @@
-import time
-from typing import AnyStr, List
+from typing import AnyStr, Optional
 
 from cyclonedds.qos import Qos
 
-from src.cyclone.defaults import QOS
-from src.cyclone.reader import Reader
+from src.config import COMPACT_CONTROLLER_MESSAGES
+from src.cyclone.latest_value_reader import LatestValueReader
+from src.idl.xbox360_compact_pod import Xbox360CompactPOD
 from src.idl.xbox360_pod import Xbox360POD
 from src.utils.default_types import CYCLONE_MESSAGE_TYPE
 from src.utils.logger import get_logger
@@ -12,46 +12,88 @@ from src.utils.logger import get_logger
 logger = get_logger()
 
 
-class Xbox360Reader(Reader):
+class Xbox360Reader(LatestValueReader):
+    """
+    Reads the controller state. The last received state is kept and returned until a newer
+    one arrives, as long as it was received less than TIMEOUT ago (on the local monotonic
+    clock): a change-driven Xbox360Writer only publishes on change and sends heartbeats while
+    idle.
+    """
+
     TIMEOUT = 1.0
 
     def __init__(
         self,
         topic_name: AnyStr = "controller",
         data_type: CYCLONE_MESSAGE_TYPE = Xbox360POD,
-        qos: Qos = QOS,
+        qos: Optional[Qos] = None,
         rate_hz: int = 50,
         suppress_warnings: bool = False,
+        compact: bool = COMPACT_CONTROLLER_MESSAGES,
     ):
-        super(Xbox360Reader, self).__init__(
-            topic_name, data_type, qos, callback=None, rate_hz=rate_hz
-        )
+        """
+        Args:
+            topic_name (AnyStr): The controller topic.
+            data_type (CYCLONE_MESSAGE_TYPE): Xbox360POD or Xbox360CompactPOD.
+            qos (Optional[Qos]): Quality of Service for topic and reader; the topic's
+                profile in config/qos.yaml if None.
+            rate_hz (int): The default wait in get_state() is one period at this rate.
+            suppress_warnings (bool): Do not log missing or late data.
+            compact (bool): Subscribe to the compact format on "<topic_name>_compact".
+        """
+        if compact:
+            topic_name, data_type = f"{topic_name}_compact", Xbox360CompactPOD
+        super(Xbox360Reader, self).__init__(topic_name, data_type, qos, rate_hz=rate_hz)
         self.suppress_warnings = suppress_warnings
         self.e_stop: bool = False
         self.rate_hz: int = rate_hz
+        self.last_state: Optional[Xbox360POD] = None
+        self.fresh: bool = False  # whether get_state() returned a newly received sample
+
+    @property
+    def lost_messages(self) -> int:
+        """Gaps in the compact format's sequence numbers."""
+        return self.lost
 
     @property
     def state(self):
-        t0 = time.time()
-        xbox360pod_list: List[Xbox360POD] = []
-        while time.time() < t0 + 1 / self.rate_hz:
-            xbox360pod_list: List[Xbox360POD] = self()
-            if len(xbox360pod_list) > 0:
-                break
-
-        if len(xbox360pod_list) == 0:  # If no data, return None
+        return self.get_state()
+
+    def get_state(self, timeout: Optional[float] = None) -> Optional[Xbox360POD]:
+        """
+        Blocks until a controller sample arrives or the timeout expires.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait in seconds. Defaults to one period
+                at rate_hz.
+
+        Returns:
+            Optional[Xbox360POD]: The controller state, or None if no (recent) data arrived.
+                Compact messages are converted to Xbox360POD. If nothing new arrived, the
+                last state is returned and `fresh` is False.
+        """
+        if timeout is None:
+            timeout = 1 / self.rate_hz
+        self.fresh = self.wait(timeout)
+
+        if self.fresh:
+            xbox360pod = self.latest()
+            if isinstance(xbox360pod, Xbox360CompactPOD):
+                xbox360pod = xbox360pod.to_pod()
+            self.last_state = xbox360pod
+        elif self.last_state is None:  # If no data, return None
             if not self.suppress_warnings:
-                logger.warn("Ik heb geen data ontvangen.")
+                logger.warning("Ik heb geen data ontvangen.")
             return None
-        xbox360pod = xbox360pod_list[0]
+        else:
+            xbox360pod = self.last_state
 
         # If timeout exceeded, robot should go idle -> return None
-        if xbox360pod.timestamp + self.TIMEOUT < time.time():
+        if not self.is_fresh(self.TIMEOUT):
             self.e_stop = True
             if not self.suppress_warnings:
-                logger.warn(
-                    f"Het duurt te lang. Laatste bericht: "
-                    f"{time.time() - xbox360pod.timestamp:.0f} seconden geleden."
+                logger.warning(
+                    f"Het duurt te lang. Laatste bericht: {self.age():.0f} seconden geleden."
                 )
             return None
         self.e_stop = False
@@ -1,112 +1,203 @@
+import argparse
 import time
-from typing import AnyStr, Tuple
+from typing import AnyStr, Optional, Union
 from cyclonedds.qos import Qos
-from pygame.joystick import JoystickType
 
-from src.cyclone.defaults import QOS
+from src.config import COMPACT_CONTROLLER_MESSAGES, JOYSTICK_BACKEND
+from src.cyclone.clock_sync import clock_sync
 from src.cyclone.writer import Writer
+from src.idl.xbox360_compact_pod import AXES, BUTTONS, Xbox360CompactPOD
 from src.idl.xbox360_pod import Xbox360POD
+from src.nodes.controller.xbox360.joystick_backend import JoystickBackend, make_backend
+from src.nodes.controller.xbox360.xbox360_reader import Xbox360Reader
 from src.utils.default_types import CYCLONE_MESSAGE_TYPE
-import pygame
-
 from src.utils.logger import get_logger
-from src.utils.tools import pyout
+from src.utils.tracing import Hop, Tracer
 
 logger = get_logger()
-pygame.init()
 
 
 class Xbox360Writer(Writer):
+    """
+    Publishes the state of an Xbox 360 controller.
+
+    By default the state is published every tick at rate_hz. In change-driven mode the writer
+    instead blocks on controller events and publishes as soon as an axis moves more than
+    `deadband` or a button or the D-pad changes; while the controller is untouched it only
+    sends a heartbeat (heartbeat=True) at heartbeat_hz, often enough for the reader's TIMEOUT
+    failsafe.
+
+    Input comes from a JoystickBackend: "evdev" reads the Linux input device directly, "pygame"
+    goes through SDL. Both block on input events, so change-driven mode reacts immediately.
+    """
+
     RATE_HZ = 50  # We chose the same rate as the ESC protocol
+    HEARTBEAT_HZ = 5
+    MAX_RATE_HZ = (
+        250  # change-driven mode: bursts of motion events are coalesced to this rate
+    )
 
     def __init__(
         self,
         topic_name: AnyStr = "controller",
         data_type: CYCLONE_MESSAGE_TYPE = Xbox360POD,
-        qos: Qos = QOS,
+        qos: Optional[Qos] = None,
         controller_number: int = 0,
         rate_hz: int = RATE_HZ,
+        compact: bool = COMPACT_CONTROLLER_MESSAGES,
+        change_driven: bool = False,
+        deadband: float = 0.01,
+        heartbeat_hz: float = HEARTBEAT_HZ,
+        backend: Union[str, JoystickBackend] = JOYSTICK_BACKEND,
     ):
+        """
+        Args:
+            topic_name (AnyStr): The controller topic.
+            data_type (CYCLONE_MESSAGE_TYPE): The message type (Xbox360POD).
+            qos (Optional[Qos]): Quality of Service for topic and writer; the topic's
+                profile in config/qos.yaml if None.
+            controller_number (int): Which of the connected controllers to use.
+            rate_hz (int): The publish rate when not change-driven.
+            compact (bool): Publish Xbox360CompactPOD on "<topic_name>_compact".
+            change_driven (bool): Publish on change plus heartbeats instead of every tick.
+            deadband (float): Smallest axis movement that counts as a change.
+            heartbeat_hz (float): Heartbeat rate in change-driven mode.
+            backend (Union[str, JoystickBackend]): "evdev", "pygame", "scripted", or a backend
+                object (e.g. an EvdevBackend reading a recorded event stream).
+        """
+        if 1 / heartbeat_hz >= Xbox360Reader.TIMEOUT:
+            raise ValueError(
+                f"A heartbeat of {heartbeat_hz} Hz trips the {Xbox360Reader.TIMEOUT} s "
+                f"reader timeout."
+            )
+        self.change_driven = change_driven
+        self.deadband = deadband
+        self.heartbeat_hz = heartbeat_hz
+        self.__last_published: Optional[Xbox360POD] = None
+        self.__last_publish_time = float("-inf")
+
+        # The compact format goes on its own topic: a DDS topic has a single type.
+        self.compact = compact
+        if compact:
+            topic_name, data_type = f"{topic_name}_compact", Xbox360CompactPOD
         super().__init__(topic_name, data_type, qos, rate_hz)
+        clock_sync.start()
+        self.sequence = 0
         self.controller_number = controller_number
-        self.joystick: JoystickType = self.__init_controller(controller_number)
+        if isinstance(backend, str):
+            backend = make_backend(backend, controller_number)
+        self.joystick: JoystickBackend = backend
+        self.tracer = Tracer("xbox360_writer")
         self.__run()
 
-    def __init_controller(
-        self, controller_number: int, suppress_log: bool = False
-    ) -> JoystickType:
-        pygame.joystick.init()
-
-        # Get count of joysticks
-        joystick_count = pygame.joystick.get_count()
-        if joystick_count <= controller_number:
-            if not suppress_log:
-                logger.exception(
-                    f"Ik kan controller {controller_number} niet vinden. "
-                    f"Er zijn {joystick_count} controllers aangesloten."
-                )
-            raise RuntimeError(
-                f"Controller {controller_number} is invalid. "
-                f"Only {joystick_count} joysticks are detected."
-            )
-        else:
-            joystick = pygame.joystick.Joystick(controller_number)
-            joystick.init()
-            if not suppress_log:
-                logger.info(
-                    f"Controller {controller_number} ({joystick.get_name()}) "
-                    f"connected."
-                )
-        return joystick
-
     def __run(self):
+        connected = True
         while True:
             try:
-                for event in pygame.event.get():
-                    if event.type == pygame.JOYDEVICEREMOVED:
-                        pygame.joystick.quit()
-
-                D_pad: Tuple[int, int] = self.joystick.get_hat(0)
-                joystick_state: Xbox360POD = Xbox360POD(
-                    timestamp=time.time(),
-                    axis_left_stick_x=self.joystick.get_axis(0),
-                    axis_left_stick_y=self.joystick.get_axis(1),
-                    axis_right_stick_x=self.joystick.get_axis(3),
-                    axis_right_stick_y=self.joystick.get_axis(4),
-                    axis_left_trigger=self.joystick.get_axis(2),
-                    axis_right_trigger=self.joystick.get_axis(5),
-                    button_A=self.joystick.get_button(0),
-                    button_B=self.joystick.get_button(1),
-                    button_X=self.joystick.get_button(2),
-                    button_Y=self.joystick.get_button(3),
-                    button_left_bumper=self.joystick.get_button(4),
-                    button_right_bumper=self.joystick.get_button(5),
-                    button_back=self.joystick.get_button(6),
-                    button_start=self.joystick.get_button(7),
-                    button_left_stick=self.joystick.get_button(9),
-                    button_right_stick=self.joystick.get_button(8),
-                    hat_D_pad_x=D_pad[0],
-                    hat_D_pad_y=D_pad[1],
-                )
-                self.publish(joystick_state)
-            except pygame.error as e:
-                error_message = e.args[0]
-                if (
-                    error_message == "Joystick not initialized"
-                    or error_message == "joystick system not initialized"
-                ):
-                    logger.warn("Controller niet verbonden!")
-                    try:
-                        self.joystick = self.__init_controller(
-                            self.controller_number, suppress_log=True
-                        )
-                    except RuntimeError:
-                        pass
+                self.__wait_for_input()
+                joystick_state = self.joystick.read()
+                if joystick_state is None:
+                    if connected:
+                        logger.warning("Controller niet verbonden!")
+                    connected = False
+                else:
+                    connected = True
+                    if self.change_driven:
+                        joystick_state.heartbeat = not self.__changed(joystick_state)
+                    if not joystick_state.heartbeat or self.__heartbeat_due():
+                        self.__publish_state(joystick_state)
             except Exception as e:
                 logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
 
-            self.sleep()
+            if not self.change_driven:
+                self.sleep()
+
+    def __publish_state(self, joystick_state: Xbox360POD):
+        self.__last_published = joystick_state
+        self.__last_publish_time = time.monotonic()
+        joystick_state = self.tracer.stamp(joystick_state, Hop.XBOX360_WRITER)
+        if self.compact:
+            joystick_state = Xbox360CompactPOD.from_pod(joystick_state, self.sequence)
+        self.sequence += 1
+        self.publish(joystick_state)
+
+    def __wait_for_input(self):
+        """
+        Lets the backend process pending input. In change-driven mode, blocks until input
+        arrives or a heartbeat is due.
+        """
+        if not self.change_driven:
+            self.joystick.wait(0)
+            return
+        since_publish = time.monotonic() - self.__last_publish_time
+        if since_publish < 1 / self.MAX_RATE_HZ:
+            time.sleep(1 / self.MAX_RATE_HZ - since_publish)
+        if self.joystick.connected:
+            timeout = (
+                self.__last_publish_time + 1 / self.heartbeat_hz - time.monotonic()
+            )
+        else:
+            timeout = (
+                1 / self.heartbeat_hz
+            )  # nothing to publish, only wait for a replug
+        self.joystick.wait(max(0.0, timeout))
+
+    def __changed(self, joystick_state: Xbox360POD) -> bool:
+        """True if the state differs from the last published one by more than the deadband."""
+        last = self.__last_published
+        if last is None:
+            return True
+        for name in AXES:
+            if abs(getattr(joystick_state, name) - getattr(last, name)) > self.deadband:
+                return True
+        for name in BUTTONS + ("hat_D_pad_x", "hat_D_pad_y"):
+            if getattr(joystick_state, name) != getattr(last, name):
+                return True
+        return False
+
+    def __heartbeat_due(self) -> bool:
+        return time.monotonic() >= self.__last_publish_time + 1 / self.heartbeat_hz
 
 
 if __name__ == "__main__":
-    writer = Xbox360Writer()
+    parser = argparse.ArgumentParser(
+        description="Publish the Xbox 360 controller state."
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        default=COMPACT_CONTROLLER_MESSAGES,
+        help="Publish Xbox360CompactPOD on controller_compact.",
+    )
+    parser.add_argument(
+        "--change-driven",
+        action="store_true",
+        help="Publish on change, with heartbeats while idle, instead of every tick.",
+    )
+    parser.add_argument(
+        "--deadband",
+        type=float,
+        default=0.01,
+        help="Smallest axis movement that counts as a change.",
+    )
+    parser.add_argument(
+        "--heartbeat-hz",
+        type=float,
+        default=Xbox360Writer.HEARTBEAT_HZ,
+        help="Heartbeat rate in change-driven mode.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["evdev", "pygame", "scripted"],
+        default=JOYSTICK_BACKEND,
+        help="Read the controller from Linux input events or through pygame, or play a "
+        "scripted scenario without a controller.",
+    )
+    args = parser.parse_args()
+    writer = Xbox360Writer(
+        compact=args.compact,
+        change_driven=args.change_driven,
+        deadband=args.deadband,
+        heartbeat_hz=args.heartbeat_hz,
+        backend=args.backend,
+    )
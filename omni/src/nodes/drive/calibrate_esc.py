@@ -0,0 +1,237 @@
+"""
+Calibrates the rpm -> pulse width conversion of ESCController: steps every motor through a
+range of pulse widths, records the wheel speed at each step, fits a monotonic response per
+motor and writes the tables to config/esc_calibration.yaml, which ESCController loads at
+startup.
+
+Speed sources:
+    --simulate       simulated motors (src.simulation.esc_motor), to try it off the robot;
+                     requires --output, so the real calibration is never replaced by a
+                     simulated one
+    --measurements   a CSV file with columns motor,pulsewidth_us,speed_rps, e.g. a previous
+                     capture (see --raw) or a tachometer log
+    (default)        on the robot: the ESCs are driven through pigpio and the wheel speed at
+                     every step is typed in from a tachometer reading
+
+Usage:
+    python src/nodes/drive/calibrate_esc.py --simulate --output simulated.yaml --raw sim.csv
+    python src/nodes/drive/calibrate_esc.py --measurements tachometer_log.csv
+"""
+
+import argparse
+import csv
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src import config
+from src.config import MAX_RPS
+from src.nodes.drive.esc_calibration import (
+    PULSEWIDTH_MAX,
+    PULSEWIDTH_MIN,
+    PULSEWIDTH_STATIONARY,
+    ESCCalibration,
+    fit_motor,
+)
+from src.utils.clock import clock
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# (motor, pulse width) -> measured speed in rounds per second
+SpeedSource = Callable[[int, float], float]
+Measurements = List[Tuple[List[float], List[float]]]
+
+ROUND_TRIP_TOLERANCE = 0.01  # fraction of MAX_RPS
+
+
+def schedule(step_us: float, repeats: int) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: Pulse widths from PULSEWIDTH_MIN to PULSEWIDTH_MAX and back, `repeats`
+            times, so that hysteresis averages out.
+    """
+    up = np.arange(PULSEWIDTH_MIN, PULSEWIDTH_MAX + step_us / 2, step_us)
+    return np.tile(np.concatenate([up, up[::-1]]), repeats)
+
+
+def capture(
+    source: SpeedSource, motors: Sequence[int], pulsewidths: np.ndarray
+) -> Measurements:
+    """
+    Args:
+        source (SpeedSource): Measures the speed of a motor at a pulse width.
+        motors (Sequence[int]): The motors to calibrate.
+        pulsewidths (np.ndarray): The steps, see schedule().
+
+    Returns:
+        Measurements: Per motor, the pulse widths and measured speeds.
+    """
+    measurements: Measurements = []
+    for motor in motors:
+        speeds = [source(motor, float(pulsewidth)) for pulsewidth in pulsewidths]
+        measurements.append((pulsewidths.tolist(), speeds))
+        logger.info(f"Motor {motor}: {len(speeds)} metingen.")
+    return measurements
+
+
+def simulated_source(seed: int = 0) -> SpeedSource:
+    """
+    Returns:
+        SpeedSource: Simulated motors that differ in neutral point, dead band and gain.
+    """
+    from src.simulation.esc_motor import SimulatedESCMotor
+
+    rng = np.random.default_rng(seed)
+    motors: Dict[int, SimulatedESCMotor] = {}
+
+    def source(motor: int, pulsewidth: float) -> float:
+        if motor not in motors:
+            motors[motor] = SimulatedESCMotor(
+                neutral_us=1500 + rng.uniform(-15, 15),
+                dead_band_us=rng.uniform(25, 50),
+                gain=rng.uniform(0.85, 1.0),
+                seed=seed + motor,
+            )
+        return motors[motor].measure(pulsewidth)
+
+    return source
+
+
+def robot_source(settle_s: float) -> SpeedSource:
+    """
+    Returns:
+        SpeedSource: Drives the ESC of the motor through pigpio and asks for the tachometer
+            reading once the wheel has settled.
+    """
+    from src.nodes.drive.pulsewidth_output import PulsewidthOutput, connect_pigpio
+
+    pi = connect_pigpio()
+    if not pi.connected:
+        raise RuntimeError("pigpio not connected")
+    output = PulsewidthOutput(pi, config.ESC_GPIO)
+    pulsewidths = np.full(len(config.ESC_GPIO), float(PULSEWIDTH_STATIONARY))
+    output.write(pulsewidths, force=True)
+    clock.sleep(2)  # arm
+
+    def source(motor: int, pulsewidth: float) -> float:
+        pulsewidths[:] = PULSEWIDTH_STATIONARY
+        pulsewidths[motor] = pulsewidth
+        output.write(pulsewidths)
+        clock.sleep(settle_s)
+        value = input(f"Motor {motor} @ {pulsewidth:.0f} us, toerental [rps]: ")
+        output.write(np.full(len(config.ESC_GPIO), float(PULSEWIDTH_STATIONARY)))
+        return float(value)
+
+    return source
+
+
+def read_measurements(path: str, motors: Sequence[int]) -> Measurements:
+    """
+    Args:
+        path (str): CSV file with columns motor,pulsewidth_us,speed_rps.
+        motors (Sequence[int]): The motors to read, in this order.
+
+    Returns:
+        Measurements: Per motor, the pulse widths and measured speeds.
+    """
+    rows: Dict[int, Tuple[List[float], List[float]]] = {m: ([], []) for m in motors}
+    with open(path, "r", newline="") as file:
+        for row in csv.DictReader(file):
+            motor = int(row["motor"])
+            if motor in rows:
+                rows[motor][0].append(float(row["pulsewidth_us"]))
+                rows[motor][1].append(float(row["speed_rps"]))
+    return [rows[m] for m in motors]
+
+
+def write_measurements(path: str, motors: Sequence[int], measurements: Measurements):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["motor", "pulsewidth_us", "speed_rps"])
+        for motor, (pulsewidths, speeds) in zip(motors, measurements):
+            writer.writerows((motor, p, s) for p, s in zip(pulsewidths, speeds))
+
+
+def report(calibration: ESCCalibration):
+    """
+    Prints the pulse width per commanded speed, next to the nominal 1500 + 500 * speed, and
+    checks that the tables invert each other.
+    """
+    motors = len(calibration.pulsewidths)
+    header = " ".join(f"{f'motor {m}':>8}" for m in range(motors))
+    print(f"{'speed':>7} {'nominal':>8} {header}")
+    for speed in np.linspace(-1, 1, 9):
+        pulsewidths = calibration.to_pulsewidth(np.full(motors, speed))
+        print(
+            f"{speed:7.2f} {PULSEWIDTH_STATIONARY + 500 * speed:8.0f} "
+            + " ".join(f"{p:8.0f}" for p in pulsewidths)
+        )
+    print(f"(speed as a fraction of MAX_RPS = {MAX_RPS:.2f} rps)")
+
+    # Commanded speeds outside the dead band must come back as the same speed.
+    error = calibration.round_trip_error()
+    print(f"Round trip speed -> pulse width -> speed: max error {error:.4f}")
+    if error > ROUND_TRIP_TOLERANCE:
+        logger.warning(
+            f"Kalibratie niet consistent: afwijking {error:.4f} na heen en terug."
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the ESC response.")
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument(
+        "--simulate", action="store_true", help="Measure simulated motors."
+    )
+    source_group.add_argument(
+        "--measurements", default=None, help="Fit measurements from this CSV file."
+    )
+    parser.add_argument(
+        "--motors",
+        type=int,
+        nargs="+",
+        default=list(range(len(config.ESC_GPIO))),
+        help="The motors to calibrate.",
+    )
+    parser.add_argument("--step-us", type=float, default=20.0, help="Pulse width step.")
+    parser.add_argument("--repeats", type=int, default=1, help="Sweeps up and down.")
+    parser.add_argument(
+        "--settle-s", type=float, default=1.0, help="Wait per step on the robot."
+    )
+    parser.add_argument("--raw", default=None, help="Also write the measurements here.")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Where to write the tables; config/esc_calibration.yaml by default.",
+    )
+    args = parser.parse_args()
+    default_path = ESCCalibration.default_path().resolve()
+    if args.simulate and (
+        args.output is None or Path(args.output).resolve() == default_path
+    ):
+        # ESCController would drive the real motors with the tables of simulated ones.
+        parser.error(
+            "--simulate requires --output other than config/esc_calibration.yaml"
+        )
+
+    if args.measurements:
+        measurements = read_measurements(args.measurements, args.motors)
+    else:
+        source = simulated_source() if args.simulate else robot_source(args.settle_s)
+        measurements = capture(
+            source, args.motors, schedule(args.step_us, args.repeats)
+        )
+    if args.raw:
+        write_measurements(args.raw, args.motors, measurements)
+
+    # Motors that were not calibrated now keep their current table.
+    current = ESCCalibration.load(args.output, motors=len(config.ESC_GPIO))
+    pulsewidths, speeds = list(current.pulsewidths), list(current.speeds)
+    for motor, (motor_pulsewidths, motor_speeds) in zip(args.motors, measurements):
+        pulsewidths[motor], speeds[motor] = fit_motor(motor_pulsewidths, motor_speeds)
+    calibration = ESCCalibration(pulsewidths, speeds)
+    calibration.save(args.output)
+    report(calibration)
+    print(f"Written to {args.output or ESCCalibration.default_path()}")
@@ -1,29 +1,19 @@
-import time
-from typing import Optional, Tuple, Union, List, AnyStr
+from typing import Optional, Tuple, AnyStr
 
-import numpy as np
 from cyclonedds.qos import Qos
 
-from src.config import (
-    MAX_LINEAR_VELOCITY,
-    MAX_ANGULAR_VELOCITY,
-    MOTOR1_ANGLE,
-    MOTOR0_ANGLE,
-    MOTOR2_ANGLE,
-    WHEEL_RADIUS,
-    CHASSIS_RADIUS,
-    MAX_RPS,
-    INVERTED,
-    MOTOR0_ANGLE_INVERTED,
-    MOTOR2_ANGLE_INVERTED,
-)
-from src.cyclone.defaults import QOS
+from src.config import MAX_LINEAR_VELOCITY, MAX_ANGULAR_VELOCITY
+from src.cyclone.clock_sync import clock_sync
+from src.cyclone.watchdog import watchdog
 from src.cyclone.writer import Writer
 from src.idl.drive_control_pod import DriveControlPOD
 from src.idl.xbox360_pod import Xbox360POD
+from src.kinematics.kiwi_drive import KiwiDriveKinematics
 from src.nodes.controller.xbox360.xbox360_reader import Xbox360Reader
+from src.utils.clock import clock
 from src.utils.default_types import CYCLONE_MESSAGE_TYPE
 from src.utils.logger import get_logger
+from src.utils.tracing import Hop, Tracer
 
 logger = get_logger()
 
@@ -41,7 +31,7 @@ class DriveController(Writer):
         self,
         topic_name: AnyStr = "drive_controller",
         data_type: CYCLONE_MESSAGE_TYPE = DriveControlPOD,
-        qos: Qos = QOS,
+        qos: Optional[Qos] = None,
         rate_hz: int = 50,
     ):
         """
@@ -53,24 +43,22 @@ class DriveController(Writer):
             The DDS topic name for the motor control messages.
         data_type : CYCLONE_MESSAGE_TYPE
             The data type for the DDS messages (DriveControlPOD).
-        qos : Qos
-            The Quality of Service (QoS) settings for the DDS communication.
+        qos : Optional[Qos]
+            The Quality of Service (QoS) settings for the DDS communication; the topic's
+            profile in config/qos.yaml if None.
         rate_hz : int
             The frequency at which to publish motor control messages.
         """
         super().__init__(topic_name, data_type, qos, rate_hz)
+        clock_sync.start()
         self.controller = Xbox360Reader()
         self.controller_state: Optional[Xbox360POD] = None
 
-        self.R_motor0_body = self.__init_rotation_matrix(
-            MOTOR0_ANGLE if not INVERTED else MOTOR0_ANGLE_INVERTED
-        )
-        self.R_motor1_body = self.__init_rotation_matrix(MOTOR1_ANGLE)
-        self.R_motor2_body = self.__init_rotation_matrix(
-            MOTOR2_ANGLE if not INVERTED else MOTOR2_ANGLE_INVERTED
-        )
+        self.kinematics = KiwiDriveKinematics()
+        self.tracer = Tracer("drive_controller")
+        watchdog.watch(self.controller, Xbox360Reader.TIMEOUT, self.__stop)
 
-        time.sleep(1)
+        clock.sleep(1)
         self.__run()
 
     def __run(self):
@@ -81,7 +69,10 @@ class DriveController(Writer):
         """
         while True:
             try:
-                new_controller_state = self.controller.state
+                # Wakes as soon as a controller sample arrives, at the latest when the
+                # period is over (so the e-stop path still publishes at rate_hz).
+                self.wait_for(self.controller)
+                new_controller_state = self.controller.get_state(timeout=0.0)
                 self.controller_state = (
                     new_controller_state if new_controller_state is not None else None
                 )
@@ -90,36 +81,44 @@ class DriveController(Writer):
                     esc0, esc1, esc2 = 0.0, 0.0, 0.0
                 else:
                     dx, dy, d_omega = self.__get_desired_velocities_from_controller()
-
-                    (
-                        rps0_unnormalized,
-                        rps1_unnormalized,
-                        rps2_unnormalized,
-                    ) = self.__compute_motor_speeds_rps(dx, dy, d_omega)
-
-                    (
-                        rps0_normalized,
-                        rps1_normalized,
-                        rps2_normalized,
-                    ) = self.__normalize_motor_speeds(
-                        rps0_unnormalized, rps1_unnormalized, rps2_unnormalized
+                    esc0, esc1, esc2 = self.kinematics.wheel_speeds(dx, dy, d_omega)
+
+                # Only a newly received joystick sample is traced, with its origin
+                # timestamp, so latency is measured end to end. An e-stop or a repeat of the
+                # last state has no new sample to trace back to.
+                if self.controller.fresh and self.controller_state is not None:
+                    received = self.tracer.stamp(
+                        self.controller_state,
+                        Hop.DRIVE_CONTROLLER_RX,
+                        topic=self.controller.topic_name,
                     )
-
-                    esc0 = rps0_normalized / MAX_RPS
-                    esc1 = rps1_normalized / MAX_RPS
-                    esc2 = rps2_normalized / MAX_RPS
+                    timestamp, trace = received.timestamp, received.trace
+                else:
+                    timestamp, trace = clock.time(), []
 
                 motor_control_message = DriveControlPOD(
-                    timestamp=time.time(),
+                    timestamp=timestamp,
                     esc0=esc0,
                     esc1=esc1,
                     esc2=esc2,
+                    trace=trace,
+                )
+                self.publish(
+                    self.tracer.stamp(motor_control_message, Hop.DRIVE_CONTROLLER_TX)
                 )
-                self.publish(motor_control_message)
             except Exception as e:
                 logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
             self.sleep()
 
+    def __stop(self):
+        """
+        Called by the watchdog when the controller goes silent: publishes a standstill right
+        away instead of on the next tick.
+        """
+        self.publish(
+            DriveControlPOD(timestamp=clock.time(), esc0=0.0, esc1=0.0, esc2=0.0)
+        )
+
     def __get_desired_velocities_from_controller(self) -> Tuple[float, float, float]:
         """
         Extracts the desired linear and angular velocities from the Xbox 360 controller input.
@@ -138,126 +137,6 @@ class DriveController(Writer):
 
         return d_x, d_y, d_omega
 
-    def __compute_motor_speeds_rps(
-        self, dx: float, dy: float, d_omega: float
-    ) -> Tuple[float, float, float]:
-        """
-        Computes the unnormalized motor speeds in rounds per second (RPS) for each motor
-        based on the desired linear and angular velocities.
-
-        Parameters:
-        -----------
-        dx : float
-            The desired linear velocity in the x-direction (m/s).
-        dy : float
-            The desired linear velocity in the y-direction (m/s).
-        d_omega : float
-            The desired angular velocity (rad/s).
-
-        Returns:
-        --------
-        Tuple[float, float, float]
-            The unnormalized motor speeds (RPS) for motor 0, motor 1, and motor 2.
-        """
-        rps0_linear = self.__compute_linear_motor_rps(dx, dy, self.R_motor0_body)
-        rps1_linear = self.__compute_linear_motor_rps(dx, dy, self.R_motor1_body)
-        rps2_linear = self.__compute_linear_motor_rps(dx, dy, self.R_motor2_body)
-        rps_angular = self.__compute_angular_motor_velocity(d_omega)
-
-        rps0_unnormalized = rps0_linear + rps_angular
-        rps1_unnormalized = rps1_linear + rps_angular
-        rps2_unnormalized = rps2_linear + rps_angular
-
-        return rps0_unnormalized, rps1_unnormalized, rps2_unnormalized
-
-    def __compute_linear_motor_rps(self, dx: float, dy: float, R: np.ndarray) -> float:
-        """
-        Computes the linear component of the motor speed in rounds per second (RPS).
-
-        Parameters:
-        -----------
-        dx : float
-            The desired linear velocity in the x-direction (m/s).
-        dy : float
-            The desired linear velocity in the y-direction (m/s).
-        R : np.ndarray
-            The rotation matrix that transforms vectors from the body frame to the motor frame.
-
-        Returns:
-        --------
-        float
-            The linear speed of the motor in rounds per second (RPS).
-        """
-        V_body = np.array([dx, dy])
-        v_motor = (R.T @ V_body)[0]  # m/s
-        omega_motor = v_motor / WHEEL_RADIUS  # rad/s
-        rps_motor = omega_motor / (2 * np.pi)  # rounds per second
-        return rps_motor
-
-    def __compute_angular_motor_velocity(self, d_omega: float) -> float:
-        """
-        Computes the angular component of the motor speed in rounds per second (RPS).
-
-        Parameters:
-        -----------
-        d_omega : float
-            The desired angular velocity (rad/s).
-
-        Returns:
-        --------
-        float
-            The angular speed of the motor in rounds per second (RPS).
-        """
-        v_motor = d_omega * CHASSIS_RADIUS  # m/s
-        omega_motor = v_motor / WHEEL_RADIUS  # rad/s
-        return omega_motor / (2 * np.pi)  # rounds per second
-
-    def __init_rotation_matrix(self, angle_degrees: Union[float, int]) -> np.ndarray:
-        """
-        Initializes the 2x2 rotation matrix for converting vectors from the body frame
-        to a motor's frame, based on the motor's angle with respect to the x-axis of the body frame.
-
-        Parameters:
-        -----------
-        angle_degrees : Union[float, int]
-            The angle between the motor's axis and the x-axis of the body frame, in degrees.
-
-        Returns:
-        --------
-        np.ndarray
-            The 2x2 rotation matrix corresponding to the given angle.
-        """
-        theta = np.deg2rad(angle_degrees)
-        R = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
-        return R
-
-    def __normalize_motor_speeds(self, *args: float) -> Tuple[float, ...]:
-        """
-        Normalizes the motor speeds so that the maximum speed does not exceed the defined limit (MAX_RPS).
-        If any motor speed exceeds MAX_RPS, all motor speeds are scaled down proportionally.
-
-        Parameters:
-        -----------
-        *args : float
-            Variable number of motor speeds (in rounds per second).
-
-        Returns:
-        --------
-        Tuple[float, ...]
-            The normalized motor speeds.
-        """
-        unnormalized_speeds = np.array(args)
-
-        max_desired_speed = np.max(np.absolute(unnormalized_speeds))
-
-        if max_desired_speed > MAX_RPS:
-            reduction_factor = MAX_RPS / max_desired_speed
-            normalized_speeds = unnormalized_speeds * reduction_factor
-        else:
-            normalized_speeds = unnormalized_speeds
-
-        return tuple(normalized_speeds.tolist())
-
 
 if __name__ == "__main__":
     node = DriveController()
@@ -1,141 +1,201 @@
 import argparse
-import time
+from typing import Optional, Sequence, Union
 
 import numpy as np
-import pigpio
 
 from src import config
 from src.config import GLOBAL_TIMEOUT, MAX_ESC_PULSEWIDTH_DELTA
+from src.cyclone.clock_sync import clock_sync
 from src.cyclone.cycloneddsnode import CycloneDDSNode
-from src.cyclone.reader import Reader
-from src.idl.base_types.float_pod import FloatPOD
+from src.cyclone.latest_value_reader import LatestValueReader
+from src.cyclone.watchdog import watchdog
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
+from src.nodes.drive.pulsewidth_output import PulsewidthOutput, connect_pigpio
+from src.utils.clock import clock
 from src.utils.logger import get_logger
-from src.utils.tools import pyout
+from src.utils.tracing import Hop, Tracer
 
 logger = get_logger()
 
 
 class ElectornicSpeedController(CycloneDDSNode):
     """
-    Manages the ESC for a specific motor by controlling the pulse width based on commands received
-    via DDS. It ensures smooth transitions in pulse width to prevent triggering the ESC's failsafe.
+    Manages the ESCs for one or more motors by controlling the pulse width based on commands
+    received via DDS. It ensures smooth transitions in pulse width to prevent triggering the
+    ESC's failsafe.
+
+    All channels are handled from a single process and a single loop: they are armed together,
+    share one vectorized slew-rate limiter, and are written in the same tick, so the motors are
+    updated at the same moment. The commands of all channels arrive together, as one
+    PulsewidthArrayPOD on "ESC_pulsewidths", from which every process picks its own channels;
+    if they stop, the watchdog stops the motors.
     """
 
     PULSEWIDTH_STATIONARY = 1500  # Neutral pulse width when the motor is stationary.
 
-    def __init__(self, motor_nr: int):
+    def __init__(
+        self,
+        motor_nr: Union[int, Sequence[int], None] = None,
+        simulate: bool = False,
+        quantization_us: float = 1.0,
+    ):
         """
-        Initializes the ESC controller for the specified motor.
+        Initializes the ESC controller for the specified motor(s).
 
         Args:
-            motor_nr (int): The motor number to control.
+            motor_nr (Union[int, Sequence[int], None]): The motor number, or numbers, to
+                control. None controls every channel in config.ESC_GPIO.
+            simulate (bool): Use the simulated pigpio backend instead of real GPIO.
+            quantization_us (float): Pulse width changes smaller than this are not written.
         """
         super().__init__()
-        self.__motor_nr = motor_nr
-        self.__gpio_nr = config.ESC_GPIO[motor_nr]
-        self.__arm_esc()
-
-        # Create a DDS reader for receiving pulse width commands.
-        self.__input = Reader(
-            topic_name=f"ESC{self.__motor_nr}_pulsewidth", data_type=FloatPOD
+        if motor_nr is None:
+            motor_nr = range(len(config.ESC_GPIO))
+        elif isinstance(motor_nr, int):
+            motor_nr = [motor_nr]
+        self.__motor_nrs = list(motor_nr)
+        self.__gpio_nrs = [config.ESC_GPIO[nr] for nr in self.__motor_nrs]
+        self.__arm_escs(simulate, quantization_us)
+
+        # One DDS reader for the pulse width commands of all channels.
+        self.__input = LatestValueReader(
+            topic_name="ESC_pulsewidths", data_type=PulsewidthArrayPOD
         )
-        self.__current_pulsewidth = self.PULSEWIDTH_STATIONARY
-        self.__target_pulsewidth = self.PULSEWIDTH_STATIONARY
-        self.__timestamp_last_input_recieved = time.time()
-
+        n = len(self.__motor_nrs)
+        self.__current_pulsewidth = np.full(n, float(self.PULSEWIDTH_STATIONARY))
+        self.__target_pulsewidth = np.full(n, float(self.PULSEWIDTH_STATIONARY))
+        self.tracer = Tracer("esc")
+        # Every channel is stopped if no command is received within the timeout.
+        watchdog.watch(self.__input, GLOBAL_TIMEOUT, self.__stop)
+
+        clock_sync.start()
         self.__run()
 
     def __run(self):
         """
         The main control loop that continuously checks for new pulse width commands and
-        updates the ESC.
+        updates the ESCs.
         """
-        timestamp_last_control_loop = time.time()
+        timestamp_last_control_loop = clock.monotonic()
         while True:
-            try:
-                # Get the latest pulse width command from the DDS topic.
-                pod = self.__input()[-1]
-                self.__timestamp_last_input_recieved = pod.timestamp
-                self.__target_pulsewidth = self.__clip_pulsewidth(pod.float_)
-            except IndexError:
-                pass  # Handle cases where no command is received.
-
-            # Implement an emergency stop if no command is received within the timeout period.
-            if self.__timestamp_last_input_recieved + GLOBAL_TIMEOUT < time.time():
-                self.__target_pulsewidth = self.PULSEWIDTH_STATIONARY
-
-            # Gradually update the pulse width to avoid triggering the ESC failsafe.
-            self.__update_pulsewidth(time.time() - timestamp_last_control_loop)
-            self.__set_pulsewidth(self.__current_pulsewidth)
-            timestamp_last_control_loop = time.time()
+            self.wait_for(self.__input)
+            received = None
+            if self.__input.update():
+                # The latest pulse width command from the DDS topic.
+                received = self.tracer.stamp(
+                    self.__input.latest(), Hop.ESC_RX, topic=self.__input.topic_name
+                )
+                self.__set_targets(received.pulsewidths)
+
+            # Gradually update the pulse widths to avoid triggering the ESC failsafe.
+            self.__update_pulsewidth(clock.monotonic() - timestamp_last_control_loop)
+            self.output.write(self.__current_pulsewidth)
+            if received is not None:
+                self.tracer.stamp(received, Hop.GPIO_WRITE, topic="gpio")
+            timestamp_last_control_loop = clock.monotonic()
             self.sleep()
 
-    def __arm_esc(self):
+    def __arm_escs(self, simulate: bool, quantization_us: float):
         """
-        Arms the ESC by sending a neutral pulse width signal and verifying the connection to pigpio.
+        Arms all ESCs together by sending a neutral pulse width signal and verifying the
+        connection to pigpio.
+
+        Args:
+            simulate (bool): Use the simulated pigpio backend.
+            quantization_us (float): Resolution of the pulse width change detection.
         """
-        self.pi = pigpio.pi()
+        self.pi = connect_pigpio(simulate)
         if not self.pi.connected:
             logger.exception(
-                f"Motor {self.__motor_nr} (GPIO {self.__gpio_nr}): pigpio not connected"
+                f"Motor {self.__motor_nrs} (GPIO {self.__gpio_nrs}): pigpio not connected"
             )
             raise RuntimeError("pigpio not connected")
-        self.__set_pulsewidth(1500)
-        time.sleep(2)
-        logger.info(f"Motor {self.__motor_nr} ({self.__gpio_nr}) armed.")
+        self.output = PulsewidthOutput(self.pi, self.__gpio_nrs, quantization_us)
+        self.output.write(
+            np.full(len(self.__gpio_nrs), float(self.PULSEWIDTH_STATIONARY)), force=True
+        )
+        clock.sleep(2)
+        for motor_nr, gpio_nr in zip(self.__motor_nrs, self.__gpio_nrs):
+            logger.info(f"Motor {motor_nr} ({gpio_nr}) armed.")
+
+    def __set_targets(self, pulsewidths: Sequence[float]):
+        """
+        Picks the channels of this process out of a command for all channels.
+
+        Args:
+            pulsewidths (Sequence[float]): The requested pulse width per channel, indexed by
+                motor number.
+        """
+        if len(pulsewidths) < len(config.ESC_GPIO):
+            logger.warning(
+                f"Motor {self.__motor_nrs}: {len(pulsewidths)} pulsewidths received, "
+                f"{len(config.ESC_GPIO)} expected"
+            )
+        for ii, motor_nr in enumerate(self.__motor_nrs):
+            if motor_nr < len(pulsewidths):
+                self.__target_pulsewidth[ii] = self.__clip_pulsewidth(
+                    pulsewidths[motor_nr], ii
+                )
+
+    def __stop(self):
+        """
+        Emergency stop, called by the watchdog when the commands stop. The pulse widths still
+        ramp down at the slew rate.
+        """
+        self.__target_pulsewidth[:] = self.PULSEWIDTH_STATIONARY
 
-    def __clip_pulsewidth(self, pw: float):
+    def __clip_pulsewidth(self, pw: float, channel: Optional[int] = None):
         """
         Clips the pulse width to ensure it remains within the valid range (1001-1999 microseconds).
 
         Args:
             pw (float): The requested pulse width.
+            channel (Optional[int]): Index of the channel, used for logging.
 
         Returns:
             float: The clipped pulse width within the valid range.
         """
         if not (1000 <= pw <= 2000):
-            logger.warn(
-                f"Motor {self.__motor_nr} ({self.__gpio_nr}): Requested pulsewidth "
+            ii = 0 if channel is None else channel
+            logger.warning(
+                f"Motor {self.__motor_nrs[ii]} ({self.__gpio_nrs[ii]}): Requested pulsewidth "
                 f"({pw}) not in range (1000, 2000)"
             )
-            pw = np.clip(pw, 1001, 1999)
+            pw = min(max(pw, 1001), 1999)
         return pw
 
-    def __set_pulsewidth(self, pw: float):
-        """
-        Sets the pulse width for the ESC after clipping it to the valid range.
-
-        Args:
-            pw (float): The pulse width to set.
-        """
-        pw = self.__clip_pulsewidth(pw)
-        self.pi.set_servo_pulsewidth(self.__gpio_nr, pw)
-
     def __update_pulsewidth(self, delta_time: float):
         """
-        Gradually adjusts the current pulse width towards the target to avoid
+        Gradually adjusts the current pulse widths towards the targets to avoid
         triggering the ESC failsafe.
 
         Args:
             delta_time (float): The time elapsed since the last control loop iteration.
         """
-        if self.__current_pulsewidth < self.__target_pulsewidth:
-            self.__current_pulsewidth = min(
-                self.__target_pulsewidth,
-                self.__current_pulsewidth + MAX_ESC_PULSEWIDTH_DELTA * delta_time,
-            )
-        elif self.__current_pulsewidth > self.__target_pulsewidth:
-            self.__current_pulsewidth = max(
-                self.__target_pulsewidth,
-                self.__current_pulsewidth - MAX_ESC_PULSEWIDTH_DELTA * delta_time,
-            )
+        max_step = MAX_ESC_PULSEWIDTH_DELTA * delta_time
+        self.__current_pulsewidth += np.clip(
+            self.__target_pulsewidth - self.__current_pulsewidth, -max_step, max_step
+        )
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the Electronic Speed Controller.")
     parser.add_argument(
-        "motor_nr", type=int, nargs="?", default=0, help="The motor number."
+        "motor_nr",
+        type=int,
+        nargs="*",
+        help="The motor number(s). Controls all channels in config.ESC_GPIO if omitted.",
+    )
+    parser.add_argument(
+        "--simulate", action="store_true", help="Use a simulated pigpio backend."
+    )
+    parser.add_argument(
+        "--quantization-us",
+        type=float,
+        default=1.0,
+        help="Pulse width changes smaller than this are not written.",
     )
     args = parser.parse_args()
-    esc = ElectornicSpeedController(args.motor_nr)
+    esc = ElectornicSpeedController(
+        args.motor_nr or None, args.simulate, args.quantization_us
+    )
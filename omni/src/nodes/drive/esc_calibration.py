@@ -0,0 +1,282 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import MAX_RPS
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+PULSEWIDTH_MIN = 1000  # us
+PULSEWIDTH_MAX = 2000  # us
+PULSEWIDTH_STATIONARY = 1500  # us
+
+
+def isotonic_regression(
+    y: np.ndarray, weights: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Pool-adjacent-violators: the non-decreasing sequence closest to `y` in weighted least
+    squares.
+
+    Args:
+        y (np.ndarray): Values, ordered by their x.
+        weights (Optional[np.ndarray]): Weight per value; 1 if None.
+
+    Returns:
+        np.ndarray: The fitted values.
+    """
+    weights = np.ones(len(y)) if weights is None else np.asarray(weights, dtype=float)
+    # Blocks of pooled values: [mean, weight, length]
+    blocks: List[List[float]] = []
+    for value, weight in zip(np.asarray(y, dtype=float), weights):
+        blocks.append([value, weight, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            mean, weight, length = blocks.pop()
+            previous = blocks[-1]
+            total = previous[1] + weight
+            previous[0] = (previous[0] * previous[1] + mean * weight) / total
+            previous[1] = total
+            previous[2] += length
+    return np.concatenate([np.full(length, mean) for mean, _, length in blocks])
+
+
+def fit_motor(
+    pulsewidths: Sequence[float], speeds: Sequence[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fits a monotonic pulse width -> speed response to the measurements of one motor.
+    Repeated pulse widths are averaged; a motor whose speed falls with the pulse width (wired
+    in reverse) is fitted as non-increasing.
+
+    Args:
+        pulsewidths (Sequence[float]): Commanded pulse widths in us.
+        speeds (Sequence[float]): Measured wheel speeds in rounds per second.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Increasing pulse widths and the fitted speeds.
+    """
+    pulsewidths = np.asarray(pulsewidths, dtype=float)
+    speeds = np.asarray(speeds, dtype=float)
+    unique, inverse, counts = np.unique(
+        pulsewidths, return_inverse=True, return_counts=True
+    )
+    if len(unique) < 2:
+        raise ValueError("At least two different pulse widths are needed.")
+    means = np.bincount(inverse, weights=speeds) / counts
+    sign = 1.0 if np.corrcoef(unique, means)[0, 1] >= 0 else -1.0
+    return unique, sign * isotonic_regression(sign * means, counts)
+
+
+class ESCCalibration:
+    """
+    Maps normalized wheel speed commands (fraction of MAX_RPS, as produced by the kinematics)
+    to ESC pulse widths and back, per motor, following a measured monotonic response instead
+    of the nominal 1500 + 500 * speed.
+
+    Both directions are resampled once, at construction, onto uniform grids shared by all
+    motors, so a conversion of every channel is one vectorized linear interpolation: an index
+    computation and two gathers, without searching or fitting per tick. Speeds beyond what a
+    motor reaches map to its end pulse widths. In a dead band (a range of pulse widths with the
+    same speed) the inverse picks the middle for that speed only: zero speed is the centre of
+    the dead band, and any other speed jumps to the edge of the dead band on its side and
+    beyond, so the motor turns at the commanded speed (see round_trip_error()). Speeds within
+    one grid step (2 / (GRID - 1)) of a dead band are interpolated across it.
+    """
+
+    GRID = 1025  # samples per grid
+
+    def __init__(self, pulsewidths: Sequence[np.ndarray], speeds: Sequence[np.ndarray]):
+        """
+        Args:
+            pulsewidths (Sequence[np.ndarray]): Per motor, increasing pulse widths in us.
+            speeds (Sequence[np.ndarray]): Per motor, the monotonic wheel speed in rounds per
+                second at those pulse widths.
+        """
+        self.pulsewidths = [np.asarray(p, dtype=float) for p in pulsewidths]
+        self.speeds = [np.asarray(s, dtype=float) for s in speeds]
+        self.__rows = np.arange(len(self.pulsewidths))
+
+        # Forward: pulse width -> speed as a fraction of MAX_RPS
+        self.__pulsewidth_grid = (PULSEWIDTH_MIN, PULSEWIDTH_MAX)
+        grid = np.linspace(PULSEWIDTH_MIN, PULSEWIDTH_MAX, self.GRID)
+        self.__speed_table = np.stack(
+            [
+                np.interp(grid, p, s) / MAX_RPS
+                for p, s in zip(self.pulsewidths, self.speeds)
+            ]
+        )
+
+        # Inverse: speed as a fraction of MAX_RPS -> pulse width
+        self.__speed_grid = (-1.0, 1.0)
+        grid = np.linspace(-1.0, 1.0, self.GRID) * MAX_RPS
+        self.__pulsewidth_table = np.stack(
+            [
+                np.interp(grid, *self.__invertible(p, s))
+                for p, s in zip(self.pulsewidths, self.speeds)
+            ]
+        )
+
+    @classmethod
+    def linear(cls, motors: int = 3) -> "ESCCalibration":
+        """
+        Returns:
+            ESCCalibration: The nominal response, 1500 + 500 * speed, for every motor.
+        """
+        pulsewidths = np.array([PULSEWIDTH_MIN, PULSEWIDTH_MAX], dtype=float)
+        speeds = (pulsewidths - PULSEWIDTH_STATIONARY) / 500 * MAX_RPS
+        return cls([pulsewidths] * motors, [speeds] * motors)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None, motors: int = 3) -> "ESCCalibration":
+        """
+        Loads the tables written by save(); the linear response if there is no file.
+
+        Args:
+            path (Optional[Path]): The table file; config/esc_calibration.yaml if None.
+            motors (int): Number of motors, for the linear fallback.
+
+        Returns:
+            ESCCalibration: The calibration.
+        """
+        import yaml
+
+        path = Path(path or cls.default_path())
+        if not path.exists():
+            logger.info(f"Geen ESC-kalibratie in {path}, lineaire respons aangenomen.")
+            return cls.linear(motors)
+        with open(path, "r") as file:
+            config = yaml.safe_load(file)
+        motors = config["motors"]
+        return cls(
+            [m["pulsewidth_us"] for m in motors], [m["speed_rps"] for m in motors]
+        )
+
+    def save(self, path: Optional[Path] = None):
+        """
+        Args:
+            path (Optional[Path]): The table file; config/esc_calibration.yaml if None.
+        """
+        import yaml
+
+        config: Dict = {
+            "motors": [
+                {"pulsewidth_us": p.tolist(), "speed_rps": s.tolist()}
+                for p, s in zip(self.pulsewidths, self.speeds)
+            ]
+        }
+        with open(path or self.default_path(), "w") as file:
+            file.write("# Written by src/nodes/drive/calibrate_esc.py\n")
+            yaml.safe_dump(config, file, default_flow_style=None, sort_keys=False)
+
+    def to_pulsewidth(
+        self, speeds: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Args:
+            speeds (np.ndarray): Speed per motor as a fraction of MAX_RPS.
+            out (Optional[np.ndarray]): Optional float array to write the result into.
+
+        Returns:
+            np.ndarray: Pulse width per motor in us.
+        """
+        return self.__lookup(self.__pulsewidth_table, self.__speed_grid, speeds, out)
+
+    def to_speed(
+        self, pulsewidths: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Args:
+            pulsewidths (np.ndarray): Pulse width per motor in us.
+            out (Optional[np.ndarray]): Optional float array to write the result into.
+
+        Returns:
+            np.ndarray: Speed per motor as a fraction of MAX_RPS.
+        """
+        return self.__lookup(
+            self.__speed_table, self.__pulsewidth_grid, pulsewidths, out
+        )
+
+    def __lookup(
+        self,
+        table: np.ndarray,
+        grid: Tuple[float, float],
+        values: np.ndarray,
+        out: Optional[np.ndarray],
+    ) -> np.ndarray:
+        """Linear interpolation of every row of `table` at its own value, in one pass."""
+        low, high = grid
+        x = (np.asarray(values, dtype=float) - low) * ((self.GRID - 1) / (high - low))
+        np.clip(x, 0, self.GRID - 1, out=x)
+        index = np.minimum(x.astype(np.intp), self.GRID - 2)
+        x -= index
+        left = table[self.__rows, index]
+        return np.add(left, x * (table[self.__rows, index + 1] - left), out=out)
+
+    @staticmethod
+    def __invertible(
+        pulsewidths: np.ndarray, speeds: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the response as strictly increasing speeds and their pulse widths, for
+        np.interp. A run of pulse widths with the same speed (a plateau) keeps that exact speed
+        at its middle pulse width, and the speeds just above and below it at the edges facing
+        the neighbouring points, so that any other speed lands outside the plateau.
+        """
+        order = np.argsort(speeds, kind="stable")
+        sorted_speeds, sorted_pulsewidths = speeds[order], pulsewidths[order]
+        unique, start = np.unique(sorted_speeds, return_index=True)
+        end = np.append(start[1:], len(order))
+        x: List[float] = []
+        y: List[float] = []
+        for k, (speed, a, b) in enumerate(zip(unique, start, end)):
+            low, high = sorted_pulsewidths[a:b].min(), sorted_pulsewidths[a:b].max()
+            if low == high:
+                x.append(speed)
+                y.append(low)
+                continue
+            if k > 0:  # the edge towards the next lower speed
+                below = np.nextafter(speed, -np.inf)
+                if below > x[-1]:
+                    x.append(below)
+                    y.append(low if sorted_pulsewidths[a - 1] < low else high)
+            x.append(speed)
+            y.append((low + high) / 2)
+            if k < len(unique) - 1:  # the edge towards the next higher speed
+                x.append(np.nextafter(speed, np.inf))
+                y.append(high if sorted_pulsewidths[b] > high else low)
+        return np.array(x), np.array(y)
+
+    def round_trip_error(self) -> float:
+        """
+        Checks the inverse against the forward response: speeds outside the plateaus must
+        come back from to_speed(to_pulsewidth(speed)).
+
+        Returns:
+            float: The largest difference, as a fraction of MAX_RPS, over speeds every motor
+                reaches that lie more than one grid step off a plateau.
+        """
+        step = 2.0 / (self.GRID - 1)
+        low = max(s.min() for s in self.speeds) / MAX_RPS
+        high = min(s.max() for s in self.speeds) / MAX_RPS
+        speeds = np.linspace(low, high, self.GRID)
+        for motor_speeds in self.speeds:
+            values, counts = np.unique(motor_speeds / MAX_RPS, return_counts=True)
+            for plateau in values[counts > 1]:
+                speeds = speeds[np.abs(speeds - plateau) > step]
+        if not len(speeds):
+            return 0.0
+        motors = len(self.speeds)
+        errors = [
+            np.abs(self.to_speed(self.to_pulsewidth(np.full(motors, s))) - s).max()
+            for s in speeds
+        ]
+        return float(max(errors))
+
+    @staticmethod
+    def default_path() -> Path:
+        base_dir = Path(__file__).parent
+        while not base_dir.name == "src":
+            base_dir = base_dir.parent
+        return base_dir.parent / "config" / "esc_calibration.yaml"
@@ -1,58 +1,76 @@
+import numpy as np
+
+from src.cyclone.clock_sync import clock_sync
 from src.cyclone.cycloneddsnode import CycloneDDSNode
-from src.cyclone.reader import Reader
+from src.cyclone.latest_value_reader import LatestValueReader
 from src.cyclone.writer import Writer
-from src.idl.base_types.float_pod import FloatPOD
 from src.idl.drive_control_pod import DriveControlPOD
-from src.nodes.controller.xbox360.xbox360_reader import Xbox360Reader
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
+from src.nodes.drive.esc_calibration import ESCCalibration
 from src.utils.logger import get_logger
-from src.utils.tools import pyout
+from src.utils.tracing import Hop, Tracer
 
 logger = get_logger()
 
 
 class ESCController(CycloneDDSNode):
     """
-    For now, we simply assume a linear relationship between rpm and esc-pulsewidth
+    Converts wheel speed commands to ESC pulse widths with the measured response of every motor
+    (see src/nodes/drive/calibrate_esc.py); without a calibration file, the nominal linear
+    relationship between rpm and esc-pulsewidth is assumed.
+
+    All channels are published together, as one PulsewidthArrayPOD on "ESC_pulsewidths";
+    src/nodes/drive/pulsewidth_bridge.py republishes them on the old per-channel topics.
     """
 
     def __init__(self):
         super().__init__()
 
-        self.drive_controller = Reader("drive_controller", DriveControlPOD)
+        self.drive_controller = LatestValueReader("drive_controller", DriveControlPOD)
+        self.calibration = ESCCalibration.load()
+        self.__speeds = np.zeros(3)
+        self.__pulsewidths = np.zeros(3)
 
-        self.esc0_writer = Writer("ESC0_pulsewidth", FloatPOD)
-        self.esc1_writer = Writer("ESC1_pulsewidth", FloatPOD)
-        self.esc2_writer = Writer("ESC2_pulsewidth", FloatPOD)
+        self.esc_writer = Writer("ESC_pulsewidths", PulsewidthArrayPOD)
+        self.__sequence = 0
+        self.tracer = Tracer("esc_controller")
 
+        clock_sync.start()
         self.__run()
 
     def __run(self):
         while True:
             try:
-                controller_state: DriveControlPOD = self.drive_controller()[-1]
-
-                esc0_pulsewidth = self.__convert_rpm2pulsewidth(controller_state.esc0)
-                esc1_pulsewidth = self.__convert_rpm2pulsewidth(controller_state.esc1)
-                esc2_pulsewidth = self.__convert_rpm2pulsewidth(controller_state.esc2)
-
-                self.esc0_writer.publish(
-                    FloatPOD(controller_state.timestamp, float_=esc0_pulsewidth)
-                )
-                self.esc1_writer.publish(
-                    FloatPOD(controller_state.timestamp, float_=esc1_pulsewidth)
-                )
-                self.esc2_writer.publish(
-                    FloatPOD(controller_state.timestamp, float_=esc2_pulsewidth)
-                )
-            except IndexError:
-                pass
+                self.wait_for(self.drive_controller)
+                if self.drive_controller.update():
+                    self.__publish(self.drive_controller.latest())
             except Exception as e:
                 logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
 
             self.sleep()
 
-    def __convert_rpm2pulsewidth(self, rpm: float):
-        return 1500 + 500 * rpm
+    def __publish(self, controller_state: DriveControlPOD):
+        controller_state = self.tracer.stamp(
+            controller_state, Hop.ESC_CONTROLLER_RX, topic="drive_controller"
+        )
+
+        self.__speeds[:] = (
+            controller_state.esc0,
+            controller_state.esc1,
+            controller_state.esc2,
+        )
+        self.calibration.to_pulsewidth(self.__speeds, out=self.__pulsewidths)
+
+        trace = self.tracer.stamp(controller_state, Hop.ESC_CONTROLLER_TX).trace
+        self.esc_writer.publish(
+            PulsewidthArrayPOD.from_values(
+                controller_state.timestamp,
+                self.__pulsewidths.tolist(),
+                self.__sequence,
+                trace,
+            )
+        )
+        self.__sequence = (self.__sequence + 1) % 2**32
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+import argparse
+
+import numpy as np
+
+from src import config
+from src.cyclone.cycloneddsnode import CycloneDDSNode
+from src.cyclone.latest_value_reader import LatestValueReader
+from src.cyclone.writer import Writer
+from src.idl.base_types.float_pod import FloatPOD
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+PULSEWIDTH_STATIONARY = 1500  # us, for channels of which nothing was received yet
+
+
+class PulsewidthBridge(CycloneDDSNode):
+    """
+    Connects the vector pulse width topic "ESC_pulsewidths" (PulsewidthArrayPOD) with the old
+    per-channel topics "ESC{n}_pulsewidth" (FloatPOD), for tools and nodes that still use those:
+
+    - split (default): every command on ESC_pulsewidths is republished on ESC0..ESC{n-1}, e.g.
+      for plots, recordings or an ESC process of the old version;
+    - merge: commands on the per-channel topics are combined into ESC_pulsewidths, e.g. for
+      src/main.py or another old publisher. Channels published in the same tick become one
+      message; a channel that was not published keeps its last value.
+
+    Do not run both directions on one domain: each would feed the other.
+    """
+
+    def __init__(self, merge: bool = False, rate_hz: int = 50):
+        """
+        Args:
+            merge (bool): Combine the per-channel topics instead of splitting the vector.
+            rate_hz (int): Loop rate, and at most the rate of merged messages.
+        """
+        super().__init__(rate_hz)
+        channels = range(len(config.ESC_GPIO))
+        if merge:
+            self.__inputs = [
+                LatestValueReader(f"ESC{nr}_pulsewidth", FloatPOD) for nr in channels
+            ]
+            self.__output = Writer("ESC_pulsewidths", PulsewidthArrayPOD)
+            self.__pulsewidths = np.full(len(channels), float(PULSEWIDTH_STATIONARY))
+            self.__sequence = 0
+            logger.info(
+                "Pulsbreedtes per kanaal worden samengevoegd op ESC_pulsewidths."
+            )
+            self.__run_merge()
+        else:
+            self.__input = LatestValueReader("ESC_pulsewidths", PulsewidthArrayPOD)
+            self.__outputs = [
+                Writer(f"ESC{nr}_pulsewidth", FloatPOD) for nr in channels
+            ]
+            logger.info("ESC_pulsewidths wordt gesplitst in pulsbreedtes per kanaal.")
+            self.__run_split()
+
+    def __run_split(self):
+        while True:
+            try:
+                self.wait_for(self.__input)
+                if self.__input.update():
+                    self.__split(self.__input.latest())
+            except Exception as e:
+                logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
+
+            self.sleep()
+
+    def __run_merge(self):
+        while True:
+            try:
+                # Old publishers send the channels in order, so the last one completes a tick;
+                # the other channels are then polled.
+                self.wait_for(self.__inputs[-1])
+                self.__merge()
+            except Exception as e:
+                logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
+
+            self.sleep()
+
+    def __split(self, pod: PulsewidthArrayPOD):
+        """
+        Args:
+            pod (PulsewidthArrayPOD): A command for all channels.
+        """
+        for writer, pulsewidth in zip(self.__outputs, pod.pulsewidths):
+            writer.publish(FloatPOD(pod.timestamp, pulsewidth, pod.trace))
+
+    def __merge(self):
+        """Publishes the latest value of every channel, if any channel received a new one."""
+        newest = None
+        for ii, reader in enumerate(self.__inputs):
+            if not reader.update():
+                continue
+            pod = reader.latest()
+            self.__pulsewidths[ii] = pod.float_
+            if newest is None or pod.timestamp > newest.timestamp:
+                newest = pod
+        if newest is None:
+            return
+        self.__output.publish(
+            PulsewidthArrayPOD.from_values(
+                newest.timestamp,
+                self.__pulsewidths.tolist(),
+                self.__sequence,
+                newest.trace,
+            )
+        )
+        self.__sequence = (self.__sequence + 1) % 2**32
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bridge ESC_pulsewidths and the per-channel ESC pulse width topics."
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Combine ESC{n}_pulsewidth into ESC_pulsewidths instead of splitting it.",
+    )
+    args = parser.parse_args()
+    PulsewidthBridge(args.merge)
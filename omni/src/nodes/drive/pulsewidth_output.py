@@ -0,0 +1,181 @@
+import time
+from array import array
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def connect_pigpio(simulate: bool = False, round_trip_us: float = 0.0):
+    """
+    Connects to the pigpio daemon, or to an in-memory simulation of it.
+
+    Args:
+        simulate (bool): Use src.nodes.drive.simulated_pigpio instead of the real daemon.
+        round_trip_us (float): Simulated round-trip latency per daemon command.
+
+    Returns:
+        pigpio.pi: A connected pi object (real or simulated).
+    """
+    if simulate:
+        from src.nodes.drive import simulated_pigpio
+
+        return simulated_pigpio.pi(round_trip_us=round_trip_us)
+
+    import pigpio
+
+    return pigpio.pi()
+
+
+class PulsewidthOutput:
+    """
+    Writes servo pulse widths for a fixed set of GPIO channels with as few pigpio daemon round
+    trips as possible.
+
+    - Pulse widths are quantized (pigpio resolves 1 us); channels whose quantized value did not
+      change since the last write are skipped.
+    - When several channels change in the same tick, they are written with a single stored
+      pigpio script ("servo p0 p1 servo p2 p3 ..."), i.e. one round trip instead of one per
+      channel. If scripts are unavailable, it falls back to set_servo_pulsewidth per channel.
+    - The duration of every write is recorded; see statistics().
+    """
+
+    MAX_CHANNELS_PER_SCRIPT = 5  # pigpio scripts accept at most 10 parameters
+    SCRIPT_READY_TIMEOUT = 1.0  # s
+
+    def __init__(
+        self,
+        pi,
+        gpio_nrs: Sequence[int],
+        quantization_us: float = 1.0,
+        batch: bool = True,
+        window: int = 1000,
+    ):
+        """
+        Args:
+            pi (pigpio.pi): A connected (real or simulated) pigpio object.
+            gpio_nrs (Sequence[int]): The GPIO of every channel.
+            quantization_us (float): Resolution of change detection in microseconds.
+            batch (bool): Group channel updates into stored-script calls.
+            window (int): Number of most recent writes kept for timing statistics.
+        """
+        self.pi = pi
+        self.gpio_nrs = list(gpio_nrs)
+        self.quantization_us = quantization_us
+        self.__last_written = np.full(len(self.gpio_nrs), -1.0)
+        self.__scripts: Dict[int, int] = {}
+        self.__batch = batch
+
+        self.__durations_ns = array("q", bytes(8 * window))
+        self.__window = window
+        self.writes = 0
+        self.skipped = 0
+        self.round_trips = 0
+
+    def write(self, pulsewidths: np.ndarray, force: bool = False) -> int:
+        """
+        Writes the pulse widths of all channels, skipping unchanged ones.
+
+        Args:
+            pulsewidths (np.ndarray): Pulse width per channel in microseconds.
+            force (bool): Write every channel, even if unchanged.
+
+        Returns:
+            int: The number of channels that were written.
+        """
+        quantized = np.round(np.asarray(pulsewidths) / self.quantization_us)
+        quantized *= self.quantization_us
+        changed = np.flatnonzero(
+            np.ones(len(self.gpio_nrs), bool)
+            if force
+            else quantized != self.__last_written
+        )
+        if len(changed) == 0:
+            self.skipped += 1
+            return 0
+
+        t0 = time.perf_counter_ns()
+        params: List[int] = []
+        for ii in changed.tolist():
+            params += [self.gpio_nrs[ii], int(quantized[ii])]
+        if not (self.__batch and len(changed) > 1 and self.__write_scripted(params)):
+            for gpio_nr, pulsewidth in zip(params[::2], params[1::2]):
+                self.pi.set_servo_pulsewidth(gpio_nr, pulsewidth)
+                self.round_trips += 1
+        self.__durations_ns[self.writes % self.__window] = time.perf_counter_ns() - t0
+
+        self.__last_written[changed] = quantized[changed]
+        self.writes += 1
+        return len(changed)
+
+    def statistics(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Write/skip/round-trip counts and write duration percentiles (us).
+        """
+        n = min(self.writes, self.__window)
+        stats = {
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "round_trips": self.round_trips,
+        }
+        if n:
+            durations = sorted(self.__durations_ns[:n])
+            stats.update(
+                {
+                    "write_p50_us": durations[n // 2] / 1e3,
+                    "write_p99_us": durations[min(n - 1, int(0.99 * n))] / 1e3,
+                    "write_max_us": durations[-1] / 1e3,
+                }
+            )
+        return stats
+
+    def close(self):
+        """Deletes the stored scripts from the daemon."""
+        for script_id in self.__scripts.values():
+            try:
+                self.pi.delete_script(script_id)
+            except Exception:
+                pass
+        self.__scripts = {}
+
+    def __write_scripted(self, params: List[int]) -> bool:
+        """
+        Writes (gpio, pulsewidth) pairs with stored scripts, one round trip per script call.
+
+        Returns:
+            bool: False if scripts are not available, in which case nothing was written.
+        """
+        step = 2 * self.MAX_CHANNELS_PER_SCRIPT
+        try:
+            chunks = [params[ii : ii + step] for ii in range(0, len(params), step)]
+            script_ids = [self.__script(len(chunk) // 2) for chunk in chunks]
+            for script_id, chunk in zip(script_ids, chunks):
+                if self.pi.run_script(script_id, chunk) < 0:
+                    raise RuntimeError(f"run_script({script_id}) failed")
+                self.round_trips += 1
+            return True
+        except Exception as e:
+            logger.warning(
+                f"Batched pulse width write failed, writing per channel: {e}"
+            )
+            self.__batch = False
+            return False
+
+    def __script(self, nr_of_channels: int) -> int:
+        """Returns the id of a stored script setting `nr_of_channels` servos, storing it once."""
+        if nr_of_channels not in self.__scripts:
+            text = " ".join(
+                f"servo p{2 * ii} p{2 * ii + 1}" for ii in range(nr_of_channels)
+            )
+            script_id = self.pi.store_script(text.encode())
+            t_end = time.monotonic() + self.SCRIPT_READY_TIMEOUT
+            while self.pi.script_status(script_id)[0] != 1:  # PI_SCRIPT_HALTED
+                if time.monotonic() > t_end:
+                    raise RuntimeError("pigpio script did not become ready")
+                time.sleep(0.001)
+            self.__scripts[nr_of_channels] = script_id
+        return self.__scripts[nr_of_channels]
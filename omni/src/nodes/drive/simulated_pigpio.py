@@ -0,0 +1,96 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+PI_SCRIPT_HALTED = 1
+PI_SCRIPT_RUNNING = 2
+
+# Servo pulse width per GPIO. Like the real daemon's state, it is shared by every connected
+# pi, so a simulation can observe what the ESC node writes.
+pulsewidths: Dict[int, int] = {}
+
+
+class error(Exception):
+    """Mirrors pigpio.error, raised for invalid arguments."""
+
+
+class pi:
+    """
+    A stand-in for pigpio.pi that keeps servo pulse widths in memory, so the ESC nodes can run
+    and be benchmarked on a machine without GPIO hardware or a pigpio daemon.
+
+    Only the calls used by this repository are implemented: servo pulse widths and stored
+    scripts consisting of "servo <gpio> <pulsewidth>" commands. Every call costs one simulated
+    daemon round trip of `round_trip_us`, spent busy-waiting like a blocking socket call.
+    """
+
+    def __init__(self, round_trip_us: float = 0.0):
+        """
+        Args:
+            round_trip_us (float): Simulated latency of one command to the daemon.
+        """
+        self.connected = True
+        self.round_trip_us = round_trip_us
+        self.round_trips = 0
+        self.pulsewidths = pulsewidths
+        self.__scripts: Dict[int, List[Tuple[str, str]]] = {}
+
+    def set_servo_pulsewidth(self, user_gpio: int, pulsewidth: float) -> int:
+        self.__round_trip()
+        self.__set_servo(user_gpio, int(pulsewidth))
+        return 0
+
+    def get_servo_pulsewidth(self, user_gpio: int) -> int:
+        self.__round_trip()
+        return self.pulsewidths.get(user_gpio, 0)
+
+    def store_script(self, script: Union[bytes, str]) -> int:
+        self.__round_trip()
+        if isinstance(script, bytes):
+            script = script.decode()
+        tokens = script.split()
+        if len(tokens) % 3 or any(t.lower() != "servo" for t in tokens[::3]):
+            raise error("simulated pigpio only supports 'servo <gpio> <pw>' scripts")
+        script_id = len(self.__scripts)
+        self.__scripts[script_id] = [
+            (tokens[ii + 1], tokens[ii + 2]) for ii in range(0, len(tokens), 3)
+        ]
+        return script_id
+
+    def script_status(self, script_id: int) -> Tuple[int, Tuple]:
+        self.__round_trip()
+        if script_id not in self.__scripts:
+            return -48, ()  # PI_BAD_SCRIPT_ID
+        return PI_SCRIPT_HALTED, tuple([0] * 10)
+
+    def run_script(self, script_id: int, params: Optional[Sequence[int]] = None) -> int:
+        self.__round_trip()
+        params = list(params or [])
+        for gpio, pulsewidth in self.__scripts[script_id]:
+            self.__set_servo(
+                self.__argument(gpio, params), self.__argument(pulsewidth, params)
+            )
+        return 0
+
+    def delete_script(self, script_id: int) -> int:
+        self.__round_trip()
+        self.__scripts.pop(script_id, None)
+        return 0
+
+    def stop(self):
+        self.connected = False
+
+    def __set_servo(self, user_gpio: int, pulsewidth: int):
+        if pulsewidth != 0 and not (500 <= pulsewidth <= 2500):
+            raise error(f"bad servo pulsewidth {pulsewidth}")
+        self.pulsewidths[user_gpio] = pulsewidth
+
+    @staticmethod
+    def __argument(token: str, params: List[int]) -> int:
+        return params[int(token[1:])] if token.startswith("p") else int(token)
+
+    def __round_trip(self):
+        self.round_trips += 1
+        if self.round_trip_us > 0:
+            t_end = time.perf_counter() + self.round_trip_us / 1e6
+            while time.perf_counter() < t_end:
+                pass
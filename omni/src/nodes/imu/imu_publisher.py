@@ -1,106 +1,145 @@
-import board
-import busio
-import adafruit_bno055
+import argparse
 import time
+from typing import AnyStr, Optional, Tuple
 
-from dataclasses import dataclass, field
-from cyclonedds.domain import DomainParticipant
-from cyclonedds.pub import DataWriter
-from cyclonedds.topic import Topic
-from cyclonedds.core import Qos, Policy
-from cyclonedds.idl import IdlStruct
-from cyclonedds.util import duration
+from cyclonedds.qos import Qos
 
-from utils.logger import Logger
+from src.config import IMU_BATCH_SIZE, IMU_RATE_HZ
+from src.cyclone.clock_sync import clock_sync
+from src.cyclone.writer import Writer
+from src.idl.imu_pod import FIELDS, IMUBatchPOD, IMUPOD
+from src.utils.logger import get_logger
+from src.utils.ring_buffer import RingBuffer
 
+logger = get_logger()
 
-# Dataclass for IMU data
-@dataclass
-class IMUSample(IdlStruct, typename="IMUSample.Msg"):
+
+def connect_bno055(simulate: bool = False, read_us: float = 0.0):
     """
-    A dataclass that defines the structure for IMU data including quaternion components.
-
-    Attributes:
-        timestamp (float): The timestamp when the data is recorded.
-        quat_w (float): Quaternion component W.
-        quat_x (float): Quaternion component X.
-        quat_y (float): Quaternion component Y.
-        quat_z (float): Quaternion component Z.
-        accel_x (float): Accelerometer data along the X-axis.
-        accel_y (float): Accelerometer data along the Y-axis.
-        accel_z (float): Accelerometer data along the Z-axis.
+    Connects to the BNO055 on the I2C bus, or to a simulation of it.
+
+    Args:
+        simulate (bool): Use src.nodes.imu.simulated_bno055 instead of the sensor.
+        read_us (float): Simulated duration of one I2C read.
+
+    Returns:
+        adafruit_bno055.BNO055_I2C: A connected (real or simulated) sensor.
     """
+    if simulate:
+        from src.nodes.imu import simulated_bno055
+
+        return simulated_bno055.BNO055(read_us=read_us)
 
-    timestamp: float = field(metadata={"id": 0})
-    quat_w: float = field(default=0.0, metadata={"id": 1})
-    quat_x: float = field(default=0.0, metadata={"id": 2})
-    quat_y: float = field(default=0.0, metadata={"id": 3})
-    quat_z: float = field(default=0.0, metadata={"id": 4})
-    accel_x: float = field(default=0.0, metadata={"id": 5})
-    accel_y: float = field(default=0.0, metadata={"id": 6})
-    accel_z: float = field(default=0.0, metadata={"id": 7})
+    import adafruit_bno055
+    import board
+    import busio
 
+    return adafruit_bno055.BNO055_I2C(busio.I2C(board.SCL, board.SDA))
 
-class IMUPublisher:
+
+class IMUPublisher(Writer):
     """
-    A publisher class for IMU data that includes quaternion and accelerometer readings.
+    Reads the BNO055 orientation and linear acceleration at a fixed rate and publishes them.
+
+    The sensor fuses at 100 Hz, so reading it faster only returns the same values while
+    occupying the I2C bus and a CPU core. Samples go into a preallocated ring buffer; with
+    batch_size > 1, every batch_size samples are published together as one IMUBatchPOD on
+    "<topic>_batch", which costs one DDS write and one packet instead of batch_size.
     """
 
-    def __init__(self):
-        """Initialize the publisher object, setting up DDS participant, topic, and writer."""
-        self.participant = DomainParticipant()
-
-        qos = Qos(
-            Policy.Reliability.BestEffort,
-            Policy.Durability.Volatile,
-            Policy.Deadline(duration(milliseconds=10)),
-            Policy.History.KeepLast(1),
-            Policy.ResourceLimits(
-                max_samples=1, max_instances=1, max_samples_per_instance=1
-            ),
+    def __init__(
+        self,
+        topic_name: AnyStr = "imu",
+        qos: Optional[Qos] = None,
+        rate_hz: int = IMU_RATE_HZ,
+        batch_size: int = IMU_BATCH_SIZE,
+        simulate: bool = False,
+        history: Optional[int] = None,
+    ):
+        """
+        Args:
+            topic_name (AnyStr): The DDS topic for single samples.
+            qos (Optional[Qos]): The Quality of Service settings; the topic's profile in
+                config/qos.yaml if None.
+            rate_hz (int): The acquisition rate.
+            batch_size (int): Samples per message; 1 publishes every sample as an IMUPOD.
+            simulate (bool): Use the simulated BNO055 instead of the sensor.
+            history (Optional[int]): Samples kept in the ring buffer; one second if None.
+        """
+        if batch_size > 1:
+            topic_name, data_type = f"{topic_name}_batch", IMUBatchPOD
+        else:
+            data_type = IMUPOD
+        super().__init__(topic_name, data_type, qos, rate_hz)
+        clock_sync.start()
+        self.batch_size = batch_size
+        self.samples = RingBuffer(
+            max(history or rate_hz, batch_size), width=len(FIELDS)
         )
+        self.failed_reads = 0
+        self.sensor = connect_bno055(simulate)
+        logger.info("IMU gereed.")
 
-        self.topic = Topic(self.participant, "imu", IMUSample, qos=qos)
-        self.writer = DataWriter(self.participant, self.topic, qos=qos)
-        
-        self.i2c_bus = busio.I2C(board.SCL, board.SDA)
-        self.sensor = adafruit_bno055.BNO055_I2C(self.i2c_bus)
+        self.__run()
 
-    def publish_data(self):
-        """Continuously capture data from the IMU and publish it."""
+    def __run(self):
+        """
+        Main loop: one sensor read per period. A failed read is skipped, the loop keeps its
+        rate.
+        """
         while True:
+            try:
+                sample = self.__read_sample()
+                if sample is not None:
+                    self.samples.push(sample)
+                    if self.samples.count % self.batch_size == 0:
+                        self.__publish_samples()
+            except Exception as e:
+                logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
+            self.sleep()
+
+    def __read_sample(self) -> Optional[Tuple[float, ...]]:
+        """
+        Returns:
+            Optional[Tuple[float, ...]]: The sample in FIELDS order, or None if the sensor
+                did not return a complete sample.
+        """
+        try:
             quaternion = self.sensor.quaternion
             accel = self.sensor.linear_acceleration
-
-            if quaternion is None or accel is None:
-                continue  # Skip if the data is incomplete
-
-            imu_data = IMUSample(
-                timestamp=time.time(),
-                quat_w=quaternion[0],
-                quat_x=quaternion[1],
-                quat_y=quaternion[2],
-                quat_z=quaternion[3],
-                accel_x=accel[0],
-                accel_y=accel[1],
-                accel_z=accel[2],
+        except OSError as e:  # I2C errors
+            quaternion, accel = None, None
+            logger.warning(f"IMU uitlezen mislukt: {e}")
+        if quaternion is None or accel is None or None in quaternion or None in accel:
+            self.failed_reads += 1
+            return None
+        return (time.time(), *quaternion, *accel)
+
+    def __publish_samples(self):
+        if self.batch_size == 1:
+            self.publish(IMUPOD(*self.samples.latest(1)[0].tolist()))
+        else:
+            self.publish(
+                IMUBatchPOD.from_array(
+                    self.samples.latest(self.batch_size),
+                    sequence=self.samples.count - self.batch_size,
+                )
             )
 
-            try:
-                self.writer.write(imu_data)  # Publish the data
-            except Exception as e:
-                print(f"Failed to publish data: {e}", end="\r")
-
-
-def main():
-    """
-    Main function to create a publisher and start data publishing.
-    """
-    logger = Logger()
-    publisher = IMUPublisher()
-    logger.log("IMU: ready!")
-    publisher.publish_data()
-
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Publish BNO055 IMU samples.")
+    parser.add_argument("--rate-hz", type=int, default=IMU_RATE_HZ)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=IMU_BATCH_SIZE,
+        help="Samples per message; > 1 publishes IMUBatchPOD on imu_batch.",
+    )
+    parser.add_argument(
+        "--simulate", action="store_true", help="Use a simulated BNO055."
+    )
+    args = parser.parse_args()
+    node = IMUPublisher(
+        rate_hz=args.rate_hz, batch_size=args.batch_size, simulate=args.simulate
+    )
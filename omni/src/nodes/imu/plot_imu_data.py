@@ -1,68 +1,133 @@
-import numpy as np
+import argparse
+import threading
 
-from dds_utils.dds_subscriber import DDSSubscriber
-from imu.imu_publisher import IMUSample
 import cv2
+import numpy as np
 
-
-def quat_to_rot_matrix(quat):
-    """Convert a normalized quaternion into a rotation matrix."""
-    w, x, y, z = quat / np.linalg.norm(quat)  # Normalize the quaternion
-    return np.array(
-        [
-            [1 - 2 * y * y - 2 * z * z, 2 * x * y - 2 * z * w, 2 * x * z + 2 * y * w],
-            [2 * x * y + 2 * z * w, 1 - 2 * x * x - 2 * z * z, 2 * y * z - 2 * x * w],
-            [2 * x * z - 2 * y * w, 2 * y * z + 2 * x * w, 1 - 2 * x * x - 2 * y * y],
+from src.cyclone.cycloneddsnode import CycloneDDSNode
+from src.cyclone.reader import Reader
+from src.idl.imu_pod import FIELDS, IMUBatchPOD, IMUPOD
+from src.utils.logger import get_logger
+from src.utils.ring_buffer import RingBuffer
+
+logger = get_logger()
+
+AXIS_COLORS = ((0, 0, 255), (0, 255, 0), (255, 0, 0))  # BGR colors for x, y, z axes
+
+
+def quaternions_to_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """
+    Converts quaternions to rotation matrices, all at once.
+
+    Args:
+        quaternions (np.ndarray): (N, 4) quaternions (w, x, y, z); normalized here.
+
+    Returns:
+        np.ndarray: (N, 3, 3) rotation matrices.
+    """
+    q = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+    w, x, y, z = q.T
+    matrices = np.empty((len(q), 3, 3))
+    matrices[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    matrices[:, 0, 1] = 2 * (x * y - z * w)
+    matrices[:, 0, 2] = 2 * (x * z + y * w)
+    matrices[:, 1, 0] = 2 * (x * y + z * w)
+    matrices[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    matrices[:, 1, 2] = 2 * (y * z - x * w)
+    matrices[:, 2, 0] = 2 * (x * z - y * w)
+    matrices[:, 2, 1] = 2 * (y * z + x * w)
+    matrices[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return matrices
+
+
+class IMUVisualizer(CycloneDDSNode):
+    """
+    Shows the IMU orientation as the body axes seen from above, with the path of the x-axis
+    tip over the last `trail` samples.
+
+    Samples are received on the reader's dispatcher thread and only copied into a ring
+    buffer there. Rendering runs at its own fixed rate on the main thread and converts all
+    buffered quaternions in one vectorized step, so a slow frame never delays or drops
+    incoming samples, and a fast stream costs one frame per display period, not per sample.
+    Both single samples (imu) and batches (imu_batch) are accepted.
+    """
+
+    SIZE = 500  # px
+    SCALE = 100  # px per unit axis length
+
+    def __init__(self, rate_hz: int = 30, trail: int = 200):
+        """
+        Args:
+            rate_hz (int): The display rate.
+            trail (int): Number of most recent samples drawn as the trail.
+        """
+        super().__init__(rate_hz)
+        self.samples = RingBuffer(trail, width=len(FIELDS))
+        self.__lock = threading.Lock()
+        self.__frame = np.zeros((self.SIZE, self.SIZE, 3), dtype=np.uint8)
+        self.__origin = np.array([self.SIZE // 2, self.SIZE // 2])
+
+        self.readers = [
+            Reader("imu", IMUPOD, callback=self.__on_sample),
+            Reader("imu_batch", IMUBatchPOD, callback=self.__on_batch),
         ]
-    )
-
-
-def transform_axes(quat):
-    """Transforms the standard axes by the rotation matrix derived from quat."""
-    rot_matrix = quat_to_rot_matrix(quat)
-    axes = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
-    transformed_axes = rot_matrix @ axes.T  # Matrix multiplication
-    return transformed_axes.T  # Transpose back to original shape
-
-
-def draw_axes(img, origin, axes, accel, scale=100):
-    """Draws 3D axes on the image from the given origin."""
-    colors = [(0, 0, 255), (0, 255, 0), (255, 0, 0)]  # BGR colors for x, y, z axes
-    for i, (color, axis) in enumerate(zip(colors, axes)):
-        axis_length = scale + 50 * (accel[i] > 0.75) - 50 * (accel[i] < -0.75)
-        end_point = origin + (axis_length * axis[:2]).astype(int)
-        cv2.line(
-            img,
-            tuple(origin.astype(int)),
-            tuple(end_point.astype(int)),
-            color,
-            5,
-        )
-    return img
-
-
-imu = DDSSubscriber("imu", IMUSample)
-
-# Continuously display the result
-while True:
-    imu_sample = imu()
-    imu_quat = np.array(
-        [imu_sample.quat_w, imu_sample.quat_x, imu_sample.quat_y, imu_sample.quat_z]
-    )
-    transformed_axes = transform_axes(imu_quat)
-
-    # Reinitialize the image to black (to clear old axes)
-    image = np.zeros((500, 500, 3), dtype=np.uint8)
-    origin = np.array([250, 250])  # Center of the image
-
-    accel = (imu_sample.accel_x, imu_sample.accel_y, imu_sample.accel_z)
-
-    image = draw_axes(image, origin, transformed_axes, accel)
-
-    image = image.transpose(1, 0, 2)
-
-    cv2.imshow("3D Axes", image)
-    if cv2.waitKey(10) == ord("q"):
-        break
-
-cv2.destroyAllWindows()
+        self.__run()
+
+    def __on_sample(self, pod: IMUPOD):
+        with self.__lock:
+            self.samples.push([getattr(pod, name) for name in FIELDS])
+
+    def __on_batch(self, pod: IMUBatchPOD):
+        rows = pod.to_array()
+        with self.__lock:
+            for row in rows:
+                self.samples.push(row)
+
+    def __run(self):
+        """Renders a frame per period until 'q' is pressed."""
+        rendered_count = -1
+        while True:
+            with self.__lock:
+                count = self.samples.count
+                samples = self.samples.latest()
+            if count != rendered_count and len(samples):
+                self.__render(samples)
+                rendered_count = count
+            cv2.imshow("IMU", self.__frame)
+            if cv2.waitKey(1) == ord("q"):
+                break
+            self.sleep()
+        cv2.destroyAllWindows()
+
+    def __render(self, samples: np.ndarray):
+        """
+        Draws the newest orientation and the trail into the preallocated frame.
+
+        Args:
+            samples (np.ndarray): Buffered samples, oldest first, columns in FIELDS order.
+        """
+        matrices = quaternions_to_matrices(samples[:, 1:5])
+        accel = samples[-1, 5:8]
+
+        self.__frame[:] = 0
+        # Screen coordinates are (y, x): looking down on the robot with x pointing down.
+        trail = self.__origin + self.SCALE * matrices[:, 1::-1, 0]
+        cv2.polylines(self.__frame, [trail.astype(np.int32)], False, (0, 0, 128), 1)
+        for ii, color in enumerate(AXIS_COLORS):
+            length = self.SCALE + 50 * (accel[ii] > 0.75) - 50 * (accel[ii] < -0.75)
+            end_point = self.__origin + length * matrices[-1, 1::-1, ii]
+            cv2.line(
+                self.__frame,
+                tuple(self.__origin.tolist()),
+                tuple(end_point.astype(int).tolist()),
+                color,
+                5,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the IMU orientation.")
+    parser.add_argument("--rate-hz", type=int, default=30, help="Display rate.")
+    parser.add_argument("--trail", type=int, default=200, help="Samples in the trail.")
+    args = parser.parse_args()
+    IMUVisualizer(args.rate_hz, args.trail)
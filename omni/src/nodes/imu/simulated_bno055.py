@@ -0,0 +1,61 @@
+import math
+import random
+import time
+from typing import Tuple
+
+
+class BNO055:
+    """
+    A stand-in for adafruit_bno055.BNO055_I2C, so the IMU node can run on a machine without
+    the sensor. The robot turns slowly around its vertical axis while rocking a few degrees,
+    and the linear acceleration follows the turning motion plus sensor noise.
+
+    Only the properties used by this repository are implemented. Every property read costs
+    one simulated I2C transaction of `read_us`, spent busy-waiting like the blocking bus call.
+    """
+
+    YAW_RATE = 0.5  # rad/s
+    ROCK_AMPLITUDE = 0.05  # rad
+    ROCK_FREQUENCY = 0.7  # Hz
+    ACCEL_NOISE = 0.02  # m/s^2
+
+    def __init__(self, read_us: float = 0.0, seed: int = 0):
+        """
+        Args:
+            read_us (float): Simulated duration of one I2C read.
+            seed (int): Seed of the sensor noise.
+        """
+        self.read_us = read_us
+        self.reads = 0
+        self.__t0 = time.monotonic()
+        self.__random = random.Random(seed)
+
+    @property
+    def quaternion(self) -> Tuple[float, float, float, float]:
+        """The orientation as a unit quaternion (w, x, y, z)."""
+        t = self.__read()
+        yaw = self.YAW_RATE * t
+        roll = self.ROCK_AMPLITUDE * math.sin(2 * math.pi * self.ROCK_FREQUENCY * t)
+        cy, sy = math.cos(yaw / 2), math.sin(yaw / 2)
+        cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+        return cy * cr, cy * sr, sy * sr, sy * cr
+
+    @property
+    def linear_acceleration(self) -> Tuple[float, float, float]:
+        """The acceleration without gravity in m/s^2 (x, y, z)."""
+        t = self.__read()
+        noise = self.__random.gauss
+        return (
+            0.3 * math.sin(self.YAW_RATE * t) + noise(0, self.ACCEL_NOISE),
+            0.3 * math.cos(self.YAW_RATE * t) + noise(0, self.ACCEL_NOISE),
+            noise(0, self.ACCEL_NOISE),
+        )
+
+    def __read(self) -> float:
+        """Spends one simulated bus transaction and returns the simulation time."""
+        self.reads += 1
+        if self.read_us:
+            t_end = time.perf_counter() + self.read_us / 1e6
+            while time.perf_counter() < t_end:
+                pass
+        return time.monotonic() - self.__t0
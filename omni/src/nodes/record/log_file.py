@@ -0,0 +1,282 @@
+"""
+File layout (all integers little endian):
+
+    header      MAGIC (8 bytes), version (u32), reserved (u32)
+    records     t_ns (i64), topic_id (u16), length (u32), payload (length bytes)
+                ...
+    index       (t_ns (i64), offset (u64)) * index_count
+    topics      JSON: [{"id", "name", "type"}, ...]
+    footer      index_offset, index_count, topics_offset, topics_length (u64 each), FOOTER_MAGIC
+
+Payloads are the CDR serialization of the sample. A record with topic_id TOPIC_DECLARATION
+declares a topic (JSON payload) before its first sample, so a file that was never closed
+(no footer, e.g. after a crash or power loss) can still be read by scanning the records.
+The file is grown in CHUNK_SIZE steps and written through a memory map; the unused tail of
+the last chunk is zero, which ends the scan, and is cut off on close.
+"""
+
+import bisect
+import importlib
+import json
+import mmap
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from cyclonedds.idl import IdlStruct, IdlUnion
+
+MAGIC = b"OMNILOG\x00"
+FOOTER_MAGIC = b"OMNIIDX\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<qHI")
+INDEX_ENTRY = struct.Struct("<qQ")
+FOOTER = struct.Struct("<QQQQ8s")
+
+TOPIC_DECLARATION = 0xFFFF
+
+MessageType = Union[Type[IdlStruct], Type[IdlUnion]]
+
+
+def type_path(data_type: MessageType) -> str:
+    """Returns "module:Class" for an IDL type, as stored in the topic table."""
+    return f"{data_type.__module__}:{data_type.__qualname__}"
+
+
+def resolve_type(path: str) -> MessageType:
+    """Imports the IDL type at "module:Class"."""
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class LogWriter:
+    """
+    Appends serialized samples to a log file. Not thread safe: the recorder calls it from a
+    single writer thread.
+    """
+
+    CHUNK_SIZE = 4 * 1024 * 1024  # bytes
+    INDEX_INTERVAL_NS = 100_000_000  # one index entry per 100 ms of recording
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The file to create (overwritten if it exists).
+        """
+        self.path = path
+        self.__file = open(path, "w+b")
+        self.__size = 0
+        self.__mm: Optional[mmap.mmap] = None
+        self.__grow(HEADER.size)
+        HEADER.pack_into(self.__mm, 0, MAGIC, VERSION, 0)
+        self.__offset = HEADER.size
+
+        self.__topics: Dict[str, int] = {}
+        self.__topic_table: List[Dict[str, Union[int, str]]] = []
+        self.__index: List[Tuple[int, int]] = []
+        self.__next_index_ns: Optional[int] = None
+        self.records = 0
+
+    def write(self, t_ns: int, topic_name: str, msg: Union[IdlStruct, IdlUnion]):
+        """
+        Appends a sample.
+
+        Args:
+            t_ns (int): Reception time in nanoseconds (time.time_ns()).
+            topic_name (str): The topic the sample was received on.
+            msg (Union[IdlStruct, IdlUnion]): The sample.
+        """
+        topic_id = self.__topics.get(topic_name)
+        if topic_id is None:
+            topic_id = self.__declare(t_ns, topic_name, type(msg))
+        if self.__next_index_ns is None or t_ns >= self.__next_index_ns:
+            self.__index.append((t_ns, self.__offset))
+            self.__next_index_ns = t_ns + self.INDEX_INTERVAL_NS
+        self.__append(t_ns, topic_id, msg.serialize())
+        self.records += 1
+
+    def flush(self):
+        """Flushes written records to disk."""
+        if self.__mm is not None:
+            self.__mm.flush()
+
+    def close(self):
+        """Writes the index, topic table and footer and truncates the file to its size."""
+        if self.__mm is None:
+            return
+        index_offset = self.__offset
+        index = b"".join(
+            INDEX_ENTRY.pack(t_ns, offset) for t_ns, offset in self.__index
+        )
+        topics = json.dumps(self.__topic_table).encode()
+        footer = FOOTER.pack(
+            index_offset,
+            len(self.__index),
+            index_offset + len(index),
+            len(topics),
+            FOOTER_MAGIC,
+        )
+        end = self.__offset + len(index) + len(topics) + len(footer)
+        self.__grow(end)
+        self.__mm[self.__offset : end] = index + topics + footer
+        self.__mm.flush()
+        self.__mm.close()
+        self.__mm = None
+        self.__file.truncate(end)
+        self.__file.close()
+
+    def __declare(self, t_ns: int, topic_name: str, data_type: MessageType) -> int:
+        topic_id = len(self.__topic_table)
+        entry = {"id": topic_id, "name": topic_name, "type": type_path(data_type)}
+        self.__topic_table.append(entry)
+        self.__topics[topic_name] = topic_id
+        self.__append(t_ns, TOPIC_DECLARATION, json.dumps(entry).encode())
+        return topic_id
+
+    def __append(self, t_ns: int, topic_id: int, payload: bytes):
+        end = self.__offset + RECORD.size + len(payload)
+        if end > self.__size:
+            self.__grow(end)
+        RECORD.pack_into(self.__mm, self.__offset, t_ns, topic_id, len(payload))
+        self.__mm[self.__offset + RECORD.size : end] = payload
+        self.__offset = end
+
+    def __grow(self, minimum_size: int):
+        """Extends the file by whole chunks until it holds `minimum_size` bytes and remaps it."""
+        size = max(self.__size, HEADER.size)
+        while size < minimum_size:
+            size += self.CHUNK_SIZE
+        if size == self.__size:
+            return
+        if self.__mm is not None:
+            self.__mm.close()
+        self.__file.truncate(size)
+        self.__mm = mmap.mmap(self.__file.fileno(), size)
+        self.__size = size
+
+
+class LogReader:
+    """
+    Reads a log file through a read-only memory map. Samples are deserialized on demand, so
+    iterating over one topic of a large log only decodes that topic.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The log file.
+        """
+        self.path = path
+        self.__file = open(path, "rb")
+        self.__mm = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _ = HEADER.unpack_from(self.__mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a log file")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported log version {version}")
+
+        self.topics: Dict[int, Dict[str, Union[int, str]]] = {}
+        self.__index_times: List[int] = []
+        self.__index_offsets: List[int] = []
+        self.__types: Dict[int, MessageType] = {}
+        self.complete = self.__read_footer()
+        if not self.complete:
+            self.__scan()
+
+    @property
+    def start_ns(self) -> Optional[int]:
+        return self.__index_times[0] if self.__index_times else None
+
+    def topic_names(self) -> List[str]:
+        return [entry["name"] for entry in self.topics.values()]
+
+    def records(
+        self, topics: Optional[Sequence[str]] = None, start_ns: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, Union[IdlStruct, IdlUnion]]]:
+        """
+        Iterates over the recorded samples in recording order.
+
+        Args:
+            topics (Optional[Sequence[str]]): Only yield these topics. None yields all.
+            start_ns (Optional[int]): Skip samples received before this time; the time
+                index is used to seek close to it.
+
+        Yields:
+            Tuple[int, str, Union[IdlStruct, IdlUnion]]: (t_ns, topic name, sample).
+        """
+        wanted = None
+        if topics is not None:
+            wanted = {tid for tid, e in self.topics.items() if e["name"] in topics}
+        offset = HEADER.size
+        if start_ns is not None and self.__index_times:
+            ii = bisect.bisect_right(self.__index_times, start_ns) - 1
+            offset = self.__index_offsets[max(ii, 0)]
+        for t_ns, topic_id, payload_offset, length in self.__iterate(offset):
+            if topic_id == TOPIC_DECLARATION:
+                continue
+            if wanted is not None and topic_id not in wanted:
+                continue
+            if start_ns is not None and t_ns < start_ns:
+                continue
+            payload = self.__mm[payload_offset : payload_offset + length]
+            yield t_ns, self.topics[topic_id]["name"], self.__type(
+                topic_id
+            ).deserialize(payload)
+
+    def close(self):
+        self.__mm.close()
+        self.__file.close()
+
+    def __type(self, topic_id: int) -> MessageType:
+        if topic_id not in self.__types:
+            self.__types[topic_id] = resolve_type(self.topics[topic_id]["type"])
+        return self.__types[topic_id]
+
+    def __read_footer(self) -> bool:
+        """Loads the index and topic table from the footer. Returns False if there is none."""
+        self.__end = len(self.__mm)
+        if self.__end < HEADER.size + FOOTER.size:
+            return False
+        index_offset, index_count, topics_offset, topics_length, magic = (
+            FOOTER.unpack_from(self.__mm, self.__end - FOOTER.size)
+        )
+        if magic != FOOTER_MAGIC:
+            return False
+        for ii in range(index_count):
+            t_ns, offset = INDEX_ENTRY.unpack_from(
+                self.__mm, index_offset + ii * INDEX_ENTRY.size
+            )
+            self.__index_times.append(t_ns)
+            self.__index_offsets.append(offset)
+        for entry in json.loads(
+            self.__mm[topics_offset : topics_offset + topics_length]
+        ):
+            self.topics[entry["id"]] = entry
+        self.__end = index_offset
+        return True
+
+    def __scan(self):
+        """Rebuilds the topic table and a time index from the records of an unclosed file."""
+        next_index_ns = None
+        record_offset = HEADER.size
+        for t_ns, topic_id, payload_offset, length in self.__iterate(HEADER.size):
+            if topic_id == TOPIC_DECLARATION:
+                entry = json.loads(self.__mm[payload_offset : payload_offset + length])
+                self.topics[entry["id"]] = entry
+            elif next_index_ns is None or t_ns >= next_index_ns:
+                self.__index_times.append(t_ns)
+                self.__index_offsets.append(record_offset)
+                next_index_ns = t_ns + LogWriter.INDEX_INTERVAL_NS
+            record_offset = payload_offset + length
+
+    def __iterate(self, offset: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Yields (t_ns, topic_id, payload offset, payload length) from `offset` on."""
+        while offset + RECORD.size <= self.__end:
+            t_ns, topic_id, length = RECORD.unpack_from(self.__mm, offset)
+            if t_ns == 0 and length == 0:
+                return  # zeroed tail of a preallocated chunk
+            payload_offset = offset + RECORD.size
+            if payload_offset + length > self.__end:
+                return  # record cut off by a crash
+            yield t_ns, topic_id, payload_offset, length
+            offset = payload_offset + length
@@ -0,0 +1,117 @@
+import argparse
+import time
+from typing import Dict, Optional, Sequence
+
+from cyclonedds.idl import IdlStruct
+
+from src.cyclone.clock_sync import clock_sync
+from src.cyclone.cycloneddsnode import CycloneDDSNode
+from src.cyclone.writer import Writer
+from src.nodes.record.log_file import LogReader, resolve_type
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class Player(CycloneDDSNode):
+    """
+    Publishes the samples of a log file (see src.nodes.record.log_file) on their original
+    topics, preserving the recorded timing scaled by `speed`, or as fast as possible.
+
+    Timestamps in the samples are shifted by the difference between publish time and
+    recording time, so downstream timeouts (Xbox360Reader.TIMEOUT, GLOBAL_TIMEOUT) and latency
+    tracing behave as they did live.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: float = 1.0,
+        topics: Optional[Sequence[str]] = None,
+        loop: bool = False,
+        retime: bool = True,
+    ):
+        """
+        Args:
+            path (str): The log file to play.
+            speed (float): Playback speed relative to real time; 0 plays as fast as possible.
+            topics (Optional[Sequence[str]]): Only play these topics. None plays all.
+            loop (bool): Start over at the end of the log.
+            retime (bool): Shift sample timestamps to the time of publishing.
+        """
+        super().__init__()
+        self.log = LogReader(path)
+        if not self.log.complete:
+            logger.warning(f"{path} is niet netjes afgesloten, index wordt hersteld.")
+        self.speed = speed
+        self.retime = retime
+        names = self.log.topic_names() if topics is None else list(topics)
+        self.writers: Dict[str, Writer] = {}
+        for entry in self.log.topics.values():
+            if entry["name"] in names:
+                self.writers[entry["name"]] = Writer(
+                    entry["name"], resolve_type(entry["type"])
+                )
+        self.published = 0
+        if retime:
+            clock_sync.start()  # retimed stamps name our clock
+
+        while True:
+            self.play()
+            if not loop:
+                break
+        self.log.close()
+
+    def play(self):
+        """Plays the log once."""
+        t0_wall_ns = time.monotonic_ns()
+        t0_log_ns = None
+        t_start = time.monotonic()
+        for t_ns, name, sample in self.log.records(topics=list(self.writers)):
+            if t0_log_ns is None:
+                t0_log_ns = t_ns
+            if self.speed > 0:
+                delay_ns = (
+                    t0_wall_ns + (t_ns - t0_log_ns) / self.speed - time.monotonic_ns()
+                )
+                if delay_ns > 0:
+                    time.sleep(delay_ns / 1e9)
+            if self.retime:
+                self.__shift(sample, time.time() - t_ns / 1e9)
+            self.writers[name].publish(sample)
+            self.published += 1
+        logger.info(
+            f"{self.published} berichten afgespeeld in {time.monotonic() - t_start:.1f} s."
+        )
+
+    @staticmethod
+    def __shift(sample: IdlStruct, offset: float):
+        """
+        Shifts the origin timestamp and trace stamps of a sample by `offset` seconds. The
+        shifted stamps are times on our clock, so they are marked as such.
+        """
+        if hasattr(sample, "timestamp"):
+            sample.timestamp += offset
+        for stamp in getattr(sample, "trace", ()):
+            stamp.timestamp += offset
+            stamp.clock = clock_sync.clock_id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a log file back onto DDS.")
+    parser.add_argument("path", help="The log file to play.")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Playback speed, e.g. 1 for real time, 4 for 4x; 0 plays as fast as possible.",
+    )
+    parser.add_argument("--topics", nargs="+", default=None, help="Topics to play.")
+    parser.add_argument("--loop", action="store_true", help="Repeat the log forever.")
+    parser.add_argument(
+        "--no-retime",
+        action="store_true",
+        help="Publish the recorded timestamps instead of shifting them to now.",
+    )
+    args = parser.parse_args()
+    Player(args.path, args.speed, args.topics, args.loop, not args.no_retime)
@@ -0,0 +1,157 @@
+import argparse
+import fnmatch
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from src.cyclone.cycloneddsnode import CycloneDDSNode
+from src.cyclone.reader import Reader
+from src.idl.base_types.float_pod import FloatPOD
+from src.idl.drive_control_pod import DriveControlPOD
+from src.idl.imu_pod import IMUBatchPOD, IMUPOD
+from src.idl.pulsewidth_array_pod import PulsewidthArrayPOD
+from src.idl.xbox360_compact_pod import Xbox360CompactPOD
+from src.idl.xbox360_pod import Xbox360POD
+from src.nodes.record.log_file import LogWriter, MessageType, resolve_type
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Topics that can be recorded by name (or by pattern, e.g. "ESC*_pulsewidth"). Other topics
+# are given as "name=module:Class".
+KNOWN_TOPICS: Dict[str, MessageType] = {
+    "controller": Xbox360POD,
+    "controller_compact": Xbox360CompactPOD,
+    "drive_controller": DriveControlPOD,
+    "ESC_pulsewidths": PulsewidthArrayPOD,
+    "ESC0_pulsewidth": FloatPOD,
+    "ESC1_pulsewidth": FloatPOD,
+    "ESC2_pulsewidth": FloatPOD,
+    "imu": IMUPOD,
+    "imu_batch": IMUBatchPOD,
+}
+
+
+def resolve_topics(specs: Sequence[str]) -> Dict[str, MessageType]:
+    """
+    Args:
+        specs (Sequence[str]): Topic names, fnmatch patterns over KNOWN_TOPICS, or
+            "name=module:Class".
+
+    Returns:
+        Dict[str, MessageType]: The topics to record and their types.
+    """
+    topics: Dict[str, MessageType] = {}
+    for spec in specs:
+        if "=" in spec:
+            name, path = spec.split("=", 1)
+            topics[name] = resolve_type(path)
+            continue
+        matches = fnmatch.filter(KNOWN_TOPICS, spec)
+        if not matches:
+            raise ValueError(f"Unknown topic {spec!r}; use name=module:Class")
+        for name in matches:
+            topics[name] = KNOWN_TOPICS[name]
+    return topics
+
+
+class Recorder(CycloneDDSNode):
+    """
+    Records DDS topics to a log file (see src.nodes.record.log_file).
+
+    Recording stays off the control path: the recorder is just another subscriber, and its
+    reader callbacks only put (time, topic, sample) on a queue. Serialization and writing to
+    the memory-mapped file happen on a separate writer thread.
+    """
+
+    FLUSH_INTERVAL = 1.0  # s
+
+    def __init__(
+        self,
+        path: str,
+        topics: Optional[Sequence[str]] = None,
+        duration: Optional[float] = None,
+    ):
+        """
+        Args:
+            path (str): The log file to write.
+            topics (Optional[Sequence[str]]): Topics to record, see resolve_topics(). None
+                records all KNOWN_TOPICS.
+            duration (Optional[float]): Stop after this many seconds. None records until
+                interrupted.
+        """
+        super().__init__(rate_hz=1)
+        self.log = LogWriter(path)
+        self.__queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.__stopped = threading.Event()
+        self.__writer_thread = threading.Thread(
+            target=self.__write_loop, name="recorder_writer", daemon=True
+        )
+        self.__writer_thread.start()
+
+        self.readers: List[Reader] = []
+        for name, data_type in resolve_topics(topics or list(KNOWN_TOPICS)).items():
+            self.readers.append(
+                Reader(
+                    name,
+                    data_type,
+                    callback=lambda sample, name=name: self.__queue.put(
+                        (time.time_ns(), name, sample)
+                    ),
+                )
+            )
+            logger.info(f"Opname van {name} gestart.")
+
+        self.__run(duration)
+
+    def __run(self, duration: Optional[float]):
+        t_end = None if duration is None else time.monotonic() + duration
+        try:
+            while t_end is None or time.monotonic() < t_end:
+                self.sleep()
+                logger.debug(f"{self.log.records} berichten opgenomen.")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the readers, writes the remaining samples and closes the log file."""
+        for reader in self.readers:
+            reader.close()
+        self.__stopped.set()
+        self.__writer_thread.join()
+        self.log.close()
+        logger.info(f"{self.log.records} berichten opgeslagen in {self.log.path}.")
+
+    def __write_loop(self):
+        next_flush = time.monotonic() + self.FLUSH_INTERVAL
+        while not (self.__stopped.is_set() and self.__queue.empty()):
+            try:
+                t_ns, name, sample = self.__queue.get(timeout=0.1)
+                self.log.write(t_ns, name, sample)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                logger.exception(f"Er is een onverwachte fout opgetreden: {e}")
+            if time.monotonic() > next_flush:
+                self.log.flush()
+                next_flush = time.monotonic() + self.FLUSH_INTERVAL
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record DDS topics to a log file.")
+    parser.add_argument("path", help="The log file to write.")
+    parser.add_argument(
+        "--topics",
+        nargs="+",
+        default=None,
+        help='Topics or patterns, e.g. controller "ESC*_pulsewidth" '
+        "imu=module:Class. Records all known topics if omitted.",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=None, help="Stop after this many seconds."
+    )
+    args = parser.parse_args()
+    Recorder(args.path, args.topics, args.duration)
@@ -0,0 +1,67 @@
+from typing import Optional
+
+import numpy as np
+
+from src.config import MAX_RPS
+
+
+class SimulatedESCMotor:
+    """
+    A wheel driven by a hobby ESC, as seen by a tachometer: no response within a dead band
+    around the neutral pulse width (which is a few us off 1500), a curved response beyond it
+    that saturates below 1000/2000 us, a motor-specific gain and measurement noise. Stands in
+    for the robot when calibrating off it, see src/nodes/drive/calibrate_esc.py.
+    """
+
+    def __init__(
+        self,
+        neutral_us: float = 1500.0,
+        dead_band_us: float = 40.0,
+        saturation_us: float = 430.0,
+        exponent: float = 1.4,
+        gain: float = 1.0,
+        noise_rps: float = 0.05,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            neutral_us (float): Centre of the dead band.
+            dead_band_us (float): Half width of the dead band.
+            saturation_us (float): Distance from neutral beyond which the speed is maximal.
+            exponent (float): Curvature of the response between dead band and saturation.
+            gain (float): Maximum speed as a fraction of MAX_RPS.
+            noise_rps (float): Standard deviation of a measurement.
+            seed (Optional[int]): Seed of the measurement noise.
+        """
+        self.neutral_us = neutral_us
+        self.dead_band_us = dead_band_us
+        self.saturation_us = saturation_us
+        self.exponent = exponent
+        self.gain = gain
+        self.noise_rps = noise_rps
+        self.__rng = np.random.default_rng(seed)
+
+    def speed(self, pulsewidth: float) -> float:
+        """
+        Args:
+            pulsewidth (float): The commanded pulse width in us.
+
+        Returns:
+            float: The true steady-state wheel speed in rounds per second.
+        """
+        offset = pulsewidth - self.neutral_us
+        active = (abs(offset) - self.dead_band_us) / (
+            self.saturation_us - self.dead_band_us
+        )
+        active = min(max(active, 0.0), 1.0)
+        return float(np.sign(offset)) * self.gain * MAX_RPS * active**self.exponent
+
+    def measure(self, pulsewidth: float) -> float:
+        """
+        Args:
+            pulsewidth (float): The commanded pulse width in us.
+
+        Returns:
+            float: A noisy tachometer reading of the wheel speed in rounds per second.
+        """
+        return self.speed(pulsewidth) + self.__rng.normal(0.0, self.noise_rps)
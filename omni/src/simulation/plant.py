@@ -0,0 +1,71 @@
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+
+from src.config import MAX_ESC_PULSEWIDTH_DELTA
+from src.kinematics.kiwi_drive import KiwiDriveKinematics
+from src.nodes.drive.esc_calibration import ESCCalibration
+
+PULSEWIDTH_PER_SPEED = 500  # us per unit wheel speed, nominally
+
+
+class KiwiDrivePlant:
+    """
+    The robot as seen from the ESC outputs, built from the parameters in src.config.
+
+    A pulse width sets a wheel speed target (as a fraction of MAX_RPS) following the ESC
+    calibration, i.e. the motors respond as measured, which ESCController compensates for;
+    the wheel follows it no faster than the ESC slew limit (MAX_ESC_PULSEWIDTH_DELTA). The
+    wheel speeds are turned into a body velocity with the forward kinematics of
+    KiwiDriveKinematics and integrated into a pose in the world frame.
+    """
+
+    def __init__(
+        self,
+        kinematics: Optional[KiwiDriveKinematics] = None,
+        calibration: Optional[ESCCalibration] = None,
+    ):
+        """
+        Args:
+            kinematics (Optional[KiwiDriveKinematics]): Defaults to the configured robot.
+            calibration (Optional[ESCCalibration]): The motor response; the one
+                ESCController loads if None.
+        """
+        self.kinematics = kinematics or KiwiDriveKinematics()
+        self.calibration = calibration or ESCCalibration.load()
+        self.wheel_speeds = np.zeros(3)  # fraction of MAX_RPS
+        self.body_velocity = np.zeros(
+            3
+        )  # dx, dy (m/s), d_omega (rad/s) in the body frame
+        self.pose = np.zeros(3)  # x, y (m), heading (rad) in the world frame
+        self.distance = 0.0  # m travelled
+        self.max_speed = 0.0  # m/s
+
+    def step(self, pulsewidths: Sequence[float], dt: float):
+        """
+        Advances the robot by `dt` seconds.
+
+        Args:
+            pulsewidths (Sequence[float]): Pulse width per wheel in us; 0 (not armed) stops
+                the wheel.
+            dt (float): The time step in seconds.
+        """
+        pulsewidths = np.asarray(pulsewidths, dtype=float)
+        target = np.where(pulsewidths > 0, self.calibration.to_speed(pulsewidths), 0.0)
+        max_step = MAX_ESC_PULSEWIDTH_DELTA / PULSEWIDTH_PER_SPEED * dt
+        self.wheel_speeds += np.clip(target - self.wheel_speeds, -max_step, max_step)
+
+        dx, dy, d_omega = self.kinematics.body_velocity(*self.wheel_speeds.tolist())
+        self.body_velocity[:] = dx, dy, d_omega
+        heading = self.pose[2] + d_omega * dt / 2  # midpoint of the step
+        cos, sin = math.cos(heading), math.sin(heading)
+        self.pose += (
+            (cos * dx - sin * dy) * dt,
+            (sin * dx + cos * dy) * dt,
+            d_omega * dt,
+        )
+
+        speed = math.hypot(dx, dy)
+        self.distance += speed * dt
+        self.max_speed = max(self.max_speed, speed)
@@ -0,0 +1,61 @@
+import math
+from typing import Optional
+
+from src.idl.xbox360_pod import Xbox360POD
+from src.nodes.controller.xbox360.joystick_backend import JoystickBackend
+from src.utils.clock import clock
+
+
+class ScriptedJoystick(JoystickBackend):
+    """
+    A controller that plays a fixed driving scenario, as a JoystickBackend for Xbox360Writer.
+    The sticks follow a function of (possibly simulated) time, so every run sends the same
+    inputs: drive forward, strafe, turn on the spot, drive a circle, and stand still, SEGMENT
+    seconds each, repeated.
+    """
+
+    SEGMENT = 4.0  # s
+
+    connected = True
+
+    def __init__(self):
+        self.__t0 = clock.monotonic()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return True  # the sticks move continuously
+
+    def read(self) -> Optional[Xbox360POD]:
+        t = clock.monotonic() - self.__t0
+        segment = int(t // self.SEGMENT) % 5
+        phase = 2 * math.pi * (t % self.SEGMENT) / self.SEGMENT
+        left_x, left_y, right_x = 0.0, 0.0, 0.0
+        if segment == 0:  # forward, speeding up and slowing down
+            left_y = -math.sin(phase / 2)
+        elif segment == 1:  # strafe left and right
+            left_x = math.sin(phase)
+        elif segment == 2:  # turn on the spot
+            right_x = math.sin(phase)
+        elif segment == 3:  # circle
+            left_x, left_y = 0.7 * math.sin(phase), -0.7 * math.cos(phase)
+            right_x = 0.3
+        return Xbox360POD(
+            timestamp=clock.time(),
+            axis_left_stick_x=left_x,
+            axis_left_stick_y=left_y,
+            axis_right_stick_x=right_x,
+            axis_right_stick_y=0.0,
+            axis_left_trigger=-1.0,
+            axis_right_trigger=-1.0,
+            button_A=0,
+            button_B=0,
+            button_X=0,
+            button_Y=0,
+            button_left_bumper=0,
+            button_right_bumper=0,
+            button_back=0,
+            button_start=0,
+            button_left_stick=0,
+            button_right_stick=0,
+            hat_D_pad_x=0,
+            hat_D_pad_y=0,
+        )
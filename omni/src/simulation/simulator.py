@@ -0,0 +1,169 @@
+"""
+Runs the drive pipeline without hardware: Xbox360Writer -> DriveController -> ESCController
+-> ElectornicSpeedController, composed in one process on the intra-process bus.
+
+- The controller is a ScriptedJoystick backend of the real Xbox360Writer.
+- The ESC node uses the simulated pigpio daemon.
+- A KiwiDrivePlant turns the GPIO pulse widths into robot motion.
+
+By default the graph runs on simulated time (src.utils.clock) as fast as the CPU allows;
+--realtime runs it on the system clock instead. Afterwards the throughput (simulated
+seconds per wall-clock second and messages per second), the latencies traced by every node
+(in simulated time, i.e. only the delay added by waiting for loop ticks, when not in
+real time) and the CPU time of every node thread are reported.
+
+Usage:
+    python src/simulation/simulator.py --duration 60
+    python src/simulation/simulator.py --duration 10 --realtime --json simulation.json
+"""
+
+import argparse
+import json
+import time
+from typing import Dict
+
+from src import config
+from src.cyclone.composition import Composition
+from src.cyclone.cycloneddsnode import CycloneDDSNode
+from src.nodes.controller.xbox360.xbox360_writer import Xbox360Writer
+from src.nodes.drive import simulated_pigpio
+from src.nodes.drive.drive_controller import DriveController
+from src.nodes.drive.esc import ElectornicSpeedController
+from src.nodes.drive.esc_controller import ESCController
+from src.simulation.plant import KiwiDrivePlant
+from src.simulation.scripted_joystick import ScriptedJoystick
+from src.utils.clock import clock
+from src.utils.logger import get_logger
+from src.utils.tracing import Tracer
+
+logger = get_logger()
+
+
+class KiwiDriveSimulator(CycloneDDSNode):
+    """
+    Steps the plant at rate_hz with the pulse widths on the simulated GPIOs, for `duration`
+    seconds of (simulated) time. Runs on the calling thread; returns when done.
+    """
+
+    def __init__(self, duration: float, rate_hz: int = 200):
+        """
+        Args:
+            duration (float): Length of the run in seconds.
+            rate_hz (int): The physics rate.
+        """
+        clock.register()
+        super().__init__(rate_hz)
+        self.duration = duration
+        self.dt = 1 / rate_hz
+        self.plant = KiwiDrivePlant()
+        self.steps = 0
+        self.__run()
+
+    def __run(self):
+        t_end = clock.monotonic() + self.duration
+        while clock.monotonic() < t_end:
+            pulsewidths = [
+                simulated_pigpio.pulsewidths.get(gpio, 0) for gpio in config.ESC_GPIO
+            ]
+            self.plant.step(pulsewidths, self.dt)
+            self.steps += 1
+            self.sleep()
+
+
+def thread_cpu_time(thread) -> float:
+    """
+    Returns:
+        float: CPU seconds used by `thread` so far (Linux).
+    """
+    return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+
+
+def run(duration: float, realtime: bool = False, rate_hz: int = 200) -> Dict:
+    """
+    Runs the pipeline and the plant.
+
+    Args:
+        duration (float): Length of the run in (simulated) seconds.
+        realtime (bool): Run on the system clock instead of as fast as possible.
+        rate_hz (int): The physics rate.
+
+    Returns:
+        Dict: The report, see the module docstring.
+    """
+    if not realtime:
+        clock.simulate(threads=5)  # the four nodes below and the simulator
+    composition = Composition()
+    threads = {
+        "xbox360_writer": composition.add(Xbox360Writer, backend=ScriptedJoystick()),
+        "drive_controller": composition.add(DriveController),
+        "esc_controller": composition.add(ESCController),
+        "esc": composition.add(ElectornicSpeedController, simulate=True),
+    }
+    t0 = time.perf_counter()
+    composition.start()
+    simulator = KiwiDriveSimulator(duration, rate_hz)
+    # The simulator thread stays registered, so simulated time stands still from here on.
+    wall_time = time.perf_counter() - t0
+
+    tracers = {tracer.node_name: tracer.summary() for tracer in list(Tracer.instances)}
+    messages = {
+        hop: summary["count"]
+        for tracer in tracers.values()
+        for hop, summary in tracer["hops"].items()
+    }
+    return {
+        "simulated_s": duration,
+        "wall_s": wall_time,
+        "real_time_factor": duration / wall_time,
+        "messages_per_s": {hop: n / wall_time for hop, n in messages.items()},
+        "cpu_s": {name: thread_cpu_time(thread) for name, thread in threads.items()},
+        "latency": tracers,
+        "robot": {
+            "pose": simulator.plant.pose.tolist(),
+            "distance_m": simulator.plant.distance,
+            "max_speed_mps": simulator.plant.max_speed,
+            "steps": simulator.steps,
+        },
+    }
+
+
+def print_report(report: Dict):
+    print(
+        f"{report['simulated_s']:.1f} s simulated in {report['wall_s']:.2f} s "
+        f"({report['real_time_factor']:.1f}x real time)"
+    )
+    print("CPU per node:")
+    for name, cpu_s in report["cpu_s"].items():
+        print(f"    {name:<18} {cpu_s:7.3f} s ({100 * cpu_s / report['wall_s']:5.1f}%)")
+    print("Hops (messages per wall-clock second, latency p50/p99 in ms):")
+    for tracer in report["latency"].values():
+        for hop, summary in tracer["hops"].items():
+            if summary["count"]:
+                print(
+                    f"    {hop:<42} {report['messages_per_s'][hop]:8.0f}/s "
+                    f"{summary['p50_us'] / 1e3:6.1f} {summary['p99_us'] / 1e3:6.1f}"
+                )
+    robot = report["robot"]
+    print(
+        f"Robot: {robot['distance_m']:.2f} m travelled, max {robot['max_speed_mps']:.2f} m/s, "
+        f"pose {[round(v, 3) for v in robot['pose']]}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the drive pipeline.")
+    parser.add_argument(
+        "--duration", type=float, default=60.0, help="Seconds to simulate."
+    )
+    parser.add_argument(
+        "--realtime", action="store_true", help="Run on the system clock."
+    )
+    parser.add_argument("--rate-hz", type=int, default=200, help="Physics rate.")
+    parser.add_argument("--json", default=None, help="Also write the report here.")
+    args = parser.parse_args()
+
+    report = run(args.duration, args.realtime, args.rate_hz)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+class Clock:
+    """
+    The time source of the nodes. By default time(), monotonic_ns() and sleep() are those of
+    the time module.
+
+    After simulate(), they follow a simulated clock instead, which jumps to the next wake-up
+    as soon as every participating thread is waiting: a node graph then runs as fast as the
+    CPU allows, while every node still sees its loop run at its configured rate and its
+    timeouts expire on schedule. A thread participates once it has called register() or
+    waited on the clock; Readers wait on the clock (see wait()) for intra-process samples.
+    """
+
+    def __init__(self):
+        self.simulated = False
+        self.__condition = threading.Condition()
+        self.__now_ns = 0
+        self.__epoch = 0.0
+        self.__expected = 0
+        self.__registered = 0
+        self.__threads: Set[int] = set()
+        self.__waiting: Dict[int, Tuple[float, Optional[Callable[[], bool]]]] = {}
+
+    def simulate(self, threads: int, start: Optional[float] = None):
+        """
+        Switches to simulated time. Must be called before any node is created.
+
+        Args:
+            threads (int): Number of threads that will call register(); time stands still
+                until all of them have.
+            start (Optional[float]): Simulated wall-clock time at the start; now if None.
+        """
+        self.simulated = True
+        self.__expected = threads
+        self.__now_ns = time.monotonic_ns()
+        self.__epoch = (time.time() if start is None else start) - self.__now_ns / 1e9
+
+    def time(self) -> float:
+        """Seconds since the epoch, like time.time()."""
+        if not self.simulated:
+            return time.time()
+        return self.__epoch + self.__now_ns / 1e9
+
+    def monotonic(self) -> float:
+        """Seconds on a clock that never goes back, like time.monotonic()."""
+        if not self.simulated:
+            return time.monotonic()
+        return self.__now_ns / 1e9
+
+    def monotonic_ns(self) -> int:
+        """Like time.monotonic_ns()."""
+        if not self.simulated:
+            return time.monotonic_ns()
+        return self.__now_ns
+
+    def sleep(self, seconds: float):
+        """Like time.sleep()."""
+        if not self.simulated:
+            time.sleep(seconds)
+        else:
+            self.wait(None, seconds)
+
+    def wait(
+        self, predicate: Optional[Callable[[], bool]], timeout: Optional[float]
+    ) -> bool:
+        """
+        Simulated time only: blocks until `predicate` is true or `timeout` simulated seconds
+        have passed. Whoever makes the predicate true must call notify().
+
+        Args:
+            predicate (Optional[Callable[[], bool]]): Condition to wait for; None sleeps.
+            timeout (Optional[float]): Maximum simulated time to wait; None waits forever.
+
+        Returns:
+            bool: The value of the predicate.
+        """
+        ident = threading.get_ident()
+        with self.__condition:
+            self.__threads.add(ident)
+            deadline = (
+                math.inf
+                if timeout is None
+                else self.__now_ns + max(0, int(timeout * 1e9))
+            )
+            try:
+                while True:
+                    if predicate is not None and predicate():
+                        return True
+                    if self.__now_ns >= deadline:
+                        return False
+                    self.__waiting[ident] = (deadline, predicate)
+                    if not self.__advance():
+                        self.__condition.wait()
+            finally:
+                self.__waiting.pop(ident, None)
+
+    def notify(self):
+        """Wakes threads in wait() to re-check their predicate."""
+        if self.simulated:
+            with self.__condition:
+                self.__condition.notify_all()
+
+    def register(self):
+        """Makes the calling thread a participant: time waits for it, see simulate()."""
+        if self.simulated:
+            with self.__condition:
+                self.__threads.add(threading.get_ident())
+                self.__registered += 1
+
+    def unregister(self):
+        """Removes the calling thread, e.g. before it exits, so time no longer waits for it."""
+        if self.simulated:
+            with self.__condition:
+                self.__threads.discard(threading.get_ident())
+                self.__advance()
+
+    def __advance(self) -> bool:
+        """
+        Moves time to the earliest deadline if every participant is waiting and none of them
+        can continue at the current time. Called with the condition held.
+
+        Returns:
+            bool: True if time moved.
+        """
+        if self.__registered < self.__expected or len(self.__waiting) < len(
+            self.__threads
+        ):
+            return False
+        next_ns = math.inf
+        for deadline, predicate in self.__waiting.values():
+            if deadline <= self.__now_ns or (predicate is not None and predicate()):
+                return False  # woken, but has not run yet
+            next_ns = min(next_ns, deadline)
+        if next_ns == math.inf:
+            return False
+        self.__now_ns = int(next_ns)
+        self.__condition.notify_all()
+        return True
+
+
+# Process-wide clock used by the nodes.
+clock = Clock()
@@ -0,0 +1,96 @@
+from array import array
+from typing import Dict
+
+
+class LatencyHistogram:
+    """
+    An HDR-style histogram of latencies in microseconds: values below 2^sub_bucket_bits are
+    counted exactly, larger values fall in logarithmic buckets that are each split into
+    2^(sub_bucket_bits - 1) linear sub-buckets, giving a constant relative precision
+    (about 3% with the default 5 bits) from 1 us up to max_value_us. Recording is O(1) and
+    does not allocate.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 5, max_value_us: int = 60_000_000):
+        """
+        Args:
+            sub_bucket_bits (int): Precision; relative error is about 2^-(sub_bucket_bits - 1).
+            max_value_us (int): Largest value tracked; larger values are clamped to it.
+        """
+        self.__bits = sub_bucket_bits
+        self.__half = 1 << (sub_bucket_bits - 1)
+        self.__max_value = max_value_us
+        self.__counts = array("q", bytes(8 * (self.__index(max_value_us) + 1)))
+
+        self.count = 0
+        self.negative = 0  # values < 0, e.g. from clock offsets between hosts
+        self.min = None
+        self.max = None
+        self.__sum = 0
+
+    def record(self, value_us: float):
+        """
+        Args:
+            value_us (float): A latency in microseconds.
+        """
+        value = int(value_us)
+        if value < 0:
+            self.negative += 1
+            value = 0
+        value = min(value, self.__max_value)
+        self.__counts[self.__index(value)] += 1
+        self.count += 1
+        self.__sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """
+        Args:
+            p (float): Percentile in [0, 100].
+
+        Returns:
+            float: The latency (us) below which p percent of the recorded values fall.
+        """
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(round(p / 100 * self.count)))
+        cumulative = 0
+        for index, count in enumerate(self.__counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(self.__value(index), self.max)
+        return float(self.max)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Count, mean, min, max and p50/p90/p99/p99.9 in microseconds.
+        """
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "negative": self.negative,
+            "mean_us": self.__sum / self.count,
+            "min_us": self.min,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "p999_us": self.percentile(99.9),
+            "max_us": self.max,
+        }
+
+    def __index(self, value: int) -> int:
+        if value < 2 * self.__half:
+            return value
+        exponent = value.bit_length() - self.__bits
+        return exponent * self.__half + (value >> exponent)
+
+    def __value(self, index: int) -> float:
+        """Returns the midpoint of the bucket at `index`."""
+        if index < 2 * self.__half:
+            return float(index)
+        exponent = index // self.__half - 1
+        mantissa = index - exponent * self.__half
+        return (mantissa << exponent) + ((1 << exponent) - 1) / 2
@@ -1,40 +1,226 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 from pathlib import Path
-from time import time
+from time import monotonic, time
+from typing import Callable, Dict, List, Optional, Tuple
 
-import yaml
+_lock = threading.Lock()
+_configuring: Optional[threading.Thread] = None
+_listener: Optional[logging.handlers.QueueListener] = None
 
-import logging
-import os
+
+class RepeatFilter(logging.Filter):
+    """
+    Lets through at most one of a series of identical records (same call site, level and
+    message) per `interval` seconds, so a warning logged every tick costs a dictionary lookup
+    instead of a formatted line. Different messages from the same line are all let through.
+
+    The number of records dropped is appended to the next identical record once the interval
+    is over. If none follows, the last dropped record is emitted with the count when the
+    interval expires, through `emit`, and any remaining counts are written by flush() at exit.
+    """
+
+    MAX_KEYS = 1024  # expired series are forgotten beyond this many
+
+    def __init__(self, interval: float = 1.0):
+        """
+        Args:
+            interval (float): Minimum time in seconds between identical records.
+        """
+        super().__init__()
+        self.interval = interval
+        # Writes a record past the filter; set by the handler the filter is attached to.
+        self.emit: Optional[Callable[[logging.LogRecord], None]] = None
+        self.__lock = threading.Lock()
+        self.__last: Dict[Tuple[str, int, int, str], float] = {}
+        # key -> (records dropped, the last of them)
+        self.__suppressed: Dict[
+            Tuple[str, int, int, str], Tuple[int, logging.LogRecord]
+        ] = {}
+        self.__timer: Optional[threading.Timer] = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno, record.levelno, record.getMessage())
+        now = monotonic()
+        with self.__lock:
+            last = self.__last.get(key)
+            if last is not None and now - last < self.interval:
+                count = self.__suppressed.get(key, (0, record))[0]
+                self.__suppressed[key] = (count + 1, record)
+                self.__schedule(last + self.interval - now)
+                return False
+            if len(self.__last) >= self.MAX_KEYS:
+                self.__forget(now)
+            self.__last[key] = now
+            count, _ = self.__suppressed.pop(key, (0, record))
+        if count:
+            self.__annotate(record, f"last message repeated {count} times")
+        return True
+
+    def flush(self, expired_only: bool = False):
+        """
+        Emits the last dropped record of every series with its count.
+
+        Args:
+            expired_only (bool): Only the series whose interval is over.
+        """
+        now = monotonic()
+        with self.__lock:
+            self.__timer = None
+            flushed = []
+            for key, (count, record) in list(self.__suppressed.items()):
+                if expired_only and now - self.__last[key] < self.interval:
+                    continue
+                del self.__suppressed[key]
+                self.__last[key] = now
+                flushed.append((count, record))
+            if self.__suppressed:
+                self.__schedule(self.interval)
+        for count, record in flushed:
+            self.__annotate(record, f"repeated {count} times")
+            if self.emit is not None:
+                self.emit(record)
+
+    def __schedule(self, delay: float):
+        """Starts the timer that flushes expired series, unless it is running."""
+        if self.__timer is None:
+            self.__timer = threading.Timer(max(delay, 0.0), self.flush, (True,))
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __forget(self, now: float):
+        """Drops the series that are over and have nothing to flush."""
+        for key, last in list(self.__last.items()):
+            if now - last >= self.interval and key not in self.__suppressed:
+                del self.__last[key]
+
+    @staticmethod
+    def __annotate(record: logging.LogRecord, note: str):
+        record.msg = f"{record.getMessage()} ({note})"
+        record.args = None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on the queue unformatted: formatting (including tracebacks) happens on the
+    listener thread instead of in the caller's control loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
-def get_logger():
+def _base_dir() -> Path:
     base_dir = Path(__file__).resolve()
     while not base_dir.name == "src":
         base_dir = base_dir.parent
-    base_dir = base_dir.parent
+    return base_dir.parent
 
-    config_path = base_dir / "config" / "logging.yaml"
-    with open(config_path, "r") as file:
-        config = yaml.safe_load(file)
 
-    basename = os.path.basename(sys.argv[0]).replace(".py", "")
-    log_filename = f"{int(time()) - 1719520335}_{basename}_{os.getpid()}.log"
+def _install():
+    """
+    Installs the queue handler on the root logger, once per process, and loads the
+    configuration on a background thread: nodes call get_logger() at import time, and the
+    config file (and yaml) should not delay their first published sample. Records logged in
+    the meantime wait in the queue.
+    """
+    global _configuring
+    log_queue = queue.SimpleQueue()
+    repeat_filter = RepeatFilter()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(repeat_filter)
+    repeat_filter.emit = queue_handler.emit
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(logging.DEBUG)  # until the configured level is known
+
+    _configuring = threading.Thread(
+        target=_configure, args=(log_queue, repeat_filter), name="logging", daemon=True
+    )
+    _configuring.start()
+    atexit.register(_stop, repeat_filter)
+
+
+FALLBACK_FORMAT = "%(asctime)s - %(module)s - ln%(lineno)s - %(levelname)s: %(message)s"
+
+
+def _configure(log_queue: queue.SimpleQueue, repeat_filter: RepeatFilter):
+    """
+    Loads config/logging.yaml and starts the QueueListener that writes the records. This runs
+    on a background thread, where an exception would go unnoticed and leave the records in
+    the queue: if the configuration cannot be loaded, the error is written to stderr and the
+    records go to stderr with a default format.
+    """
+    global _listener
+    try:
+        handlers, level = _load_config(repeat_filter)
+    except Exception as e:
+        print(
+            f"Logconfiguratie niet geladen ({type(e).__name__}: {e}), "
+            f"standaardinstellingen gebruikt.",
+            file=sys.stderr,
+        )
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(FALLBACK_FORMAT))
+        handlers, level = [handler], logging.DEBUG
+    for handler in handlers:
+        handler.setLevel(level)  # for records queued before the root level was set
+    logging.getLogger().setLevel(level)
 
-    logger = logging.getLogger(basename)
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _load_config(repeat_filter: RepeatFilter) -> Tuple[List[logging.Handler], int]:
+    """
+    Returns:
+        Tuple[List[logging.Handler], int]: The configured handlers, with their formatter,
+            and the log level.
+    """
+    import yaml
+
+    base_dir = _base_dir()
+    with open(base_dir / "config" / "logging.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    level = logging.getLevelName(config["level"])
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level {config['level']!r}")
+    repeat_filter.interval = config.get("repeat_interval", repeat_filter.interval)
 
-    handlers = [logging.StreamHandler()]
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
     if config["file_logging"]:
+        basename = os.path.basename(sys.argv[0]).replace(".py", "")
+        log_filename = f"{int(time()) - 1719520335}_{basename}_{os.getpid()}.log"
+        (base_dir / "logs").mkdir(exist_ok=True)
         handlers.append(logging.FileHandler(base_dir / "logs" / log_filename))
+    formatter = logging.Formatter(config["format"])
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers, level
 
-    # Configure the basic logging settings
-    logging.basicConfig(
-        level=eval(f"logging.{config['level']}"),
-        format=config["format"],
-        handlers=handlers,
-    )
 
-    logger.setLevel(eval(f"logging.{config['level']}"))
+def _stop(repeat_filter: RepeatFilter):
+    """Writes the remaining records, and the counts of dropped ones, at exit."""
+    repeat_filter.flush()
+    _configuring.join()
+    if _listener is not None:
+        _listener.stop()
 
-    return logger
+
+def get_logger() -> logging.Logger:
+    """
+    Returns the logger of this process, named after the script that was started. Logging is
+    set up on the first call only.
+    """
+    with _lock:
+        if _configuring is None:
+            _install()
+    basename = os.path.basename(sys.argv[0]).replace(".py", "")
+    return logging.getLogger(basename)
@@ -0,0 +1,48 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    The most recent `capacity` rows of a fixed-width table, kept in one preallocated numpy
+    array. Pushing a row copies it into place, so acquisition loops do not allocate, and the
+    newest rows are read back in chronological order as a single array.
+    """
+
+    def __init__(self, capacity: int, width: int):
+        """
+        Args:
+            capacity (int): Number of rows kept; older rows are overwritten.
+            width (int): Number of columns per row.
+        """
+        self.capacity = capacity
+        self.__data = np.zeros((capacity, width))
+        self.count = 0  # rows pushed in total
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def push(self, row: Sequence[float]):
+        """
+        Args:
+            row (Sequence[float]): The values of the new row.
+        """
+        self.__data[self.count % self.capacity] = row
+        self.count += 1
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Args:
+            n (Optional[int]): Number of rows; all rows kept if None.
+
+        Returns:
+            np.ndarray: A copy of the newest `n` rows, oldest first.
+        """
+        n = len(self) if n is None else min(n, len(self))
+        start = (self.count - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.__data[start : start + n].copy()
+        return np.concatenate(
+            (self.__data[start:], self.__data[: start + n - self.capacity])
+        )
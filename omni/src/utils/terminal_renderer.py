@@ -0,0 +1,206 @@
+import sys
+import time
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.histogram import LatencyHistogram
+from src.utils.tools import bcolors
+
+RESET = "\033[0m"
+
+
+class Template:
+    """
+    A text screen with named fields, parsed once. Every occurrence of a field name in the
+    text marks where that field is drawn; the text itself is the static part of the screen.
+    """
+
+    def __init__(self, text: str, fields: Sequence[str]):
+        """
+        Args:
+            text (str): The screen, fields included.
+            fields (Sequence[str]): The field names to look for in `text`.
+        """
+        self.lines = text.split("\n")
+        self.rows = len(self.lines)
+        self.cols = max(len(line) for line in self.lines)
+        self.positions: Dict[str, List[Tuple[int, int]]] = {}
+        for name in fields:
+            self.positions[name] = [
+                (row, col)
+                for row, line in enumerate(self.lines)
+                for col in self.__find_all(line, name)
+            ]
+            if not self.positions[name]:
+                raise ValueError(f"Field {name!r} does not occur in the template")
+
+    @staticmethod
+    def __find_all(line: str, name: str) -> List[int]:
+        cols = []
+        col = line.find(name)
+        while col >= 0:
+            cols.append(col)
+            col = line.find(name, col + len(name))
+        return cols
+
+
+class TerminalRenderer:
+    """
+    Draws a fixed-size text screen on an ANSI terminal and sends only what changed.
+
+    Drawing goes to a back buffer of characters and colors. flush() compares it with the
+    frame that is on the terminal, and writes the changed runs of cells with cursor-addressing
+    escape sequences, all in one write call. A controller display that changes a few cells per
+    tick then costs tens of bytes per frame instead of the whole screen, which matters over
+    SSH. Frame time and bytes written are tracked, see statistics().
+    """
+
+    def __init__(self, rows: int, cols: int, stream: Optional[BinaryIO] = None):
+        """
+        Args:
+            rows (int): Screen height; the screen starts at the top left of the terminal.
+            cols (int): Screen width.
+            stream (Optional[BinaryIO]): Where to write; stdout if None.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self.__chars = [[" "] * cols for _ in range(rows)]
+        self.__colors: List[List[Optional[str]]] = [[None] * cols for _ in range(rows)]
+        self.__shown_chars: List[Optional[List[str]]] = [None] * rows
+        self.__shown_colors: List[Optional[List[Optional[str]]]] = [None] * rows
+        self.__clear = True
+
+        self.frames = 0
+        self.bytes_written = 0
+        self.frame_time = LatencyHistogram()
+
+    def blit(self, lines: Sequence[str], color: Optional[str] = None):
+        """
+        Overwrites the whole back buffer with `lines`, padded with spaces.
+
+        Args:
+            lines (Sequence[str]): One string per row.
+            color (Optional[str]): A color name from src.utils.tools.bcolors.
+        """
+        code = bcolors[color] if color else None
+        for row in range(self.rows):
+            line = lines[row] if row < len(lines) else ""
+            chars = self.__chars[row]
+            chars[:] = line[: self.cols].ljust(self.cols)
+            self.__colors[row][:] = [code] * self.cols
+
+    def draw(self, row: int, col: int, text: str, color: Optional[str] = None):
+        """
+        Writes `text` into the back buffer, clipped at the right edge.
+
+        Args:
+            row (int): Row, 0 at the top.
+            col (int): Column, 0 at the left.
+            text (str): The characters to draw.
+            color (Optional[str]): A color name from src.utils.tools.bcolors.
+        """
+        text = text[: self.cols - col]
+        self.__chars[row][col : col + len(text)] = text
+        self.__colors[row][col : col + len(text)] = [
+            bcolors[color] if color else None
+        ] * len(text)
+
+    def invalidate(self):
+        """Makes the next flush() clear the terminal and redraw every cell."""
+        self.__clear = True
+
+    def flush(self) -> int:
+        """
+        Sends the differences between the back buffer and the terminal in one write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        t0 = time.perf_counter_ns()
+        out: List[str] = []
+        if self.__clear:
+            out.append("\033[2J")
+            self.__shown_chars = [None] * self.rows
+            self.__shown_colors = [None] * self.rows
+            self.__clear = False
+
+        for row in range(self.rows):
+            chars, colors = self.__chars[row], self.__colors[row]
+            shown_chars, shown_colors = (
+                self.__shown_chars[row],
+                self.__shown_colors[row],
+            )
+            if chars == shown_chars and colors == shown_colors:
+                continue
+            self.__diff_row(out, row, chars, colors, shown_chars, shown_colors)
+            self.__shown_chars[row] = chars[:]
+            self.__shown_colors[row] = colors[:]
+
+        written = 0
+        if out:
+            out.append(f"\033[{self.rows + 1};1H")  # park the cursor below the screen
+            data = "".join(out).encode()
+            self.stream.write(data)
+            self.stream.flush()
+            written = len(data)
+        self.frames += 1
+        self.bytes_written += written
+        self.frame_time.record((time.perf_counter_ns() - t0) / 1e3)
+        return written
+
+    def statistics(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Frames, bytes written (total and per frame) and frame time
+                percentiles in us.
+        """
+        stats = {
+            "frames": self.frames,
+            "bytes_written": self.bytes_written,
+            "bytes_per_frame": self.bytes_written / max(self.frames, 1),
+        }
+        if self.frames:
+            stats.update(
+                {
+                    "frame_p50_us": self.frame_time.percentile(50),
+                    "frame_p99_us": self.frame_time.percentile(99),
+                    "frame_max_us": self.frame_time.max,
+                }
+            )
+        return stats
+
+    @staticmethod
+    def __diff_row(
+        out: List[str],
+        row: int,
+        chars: List[str],
+        colors: List[Optional[str]],
+        shown_chars: Optional[List[str]],
+        shown_colors: Optional[List[Optional[str]]],
+    ):
+        """Appends the escape sequences that turn the shown row into `chars`/`colors`."""
+        cols = len(chars)
+        col = 0
+        while col < cols:
+            if (
+                shown_chars is not None
+                and chars[col] == shown_chars[col]
+                and colors[col] == shown_colors[col]
+            ):
+                col += 1
+                continue
+            # A run of changed cells: move there once, change color only where it changes.
+            out.append(f"\033[{row + 1};{col + 1}H")
+            color = None
+            while col < cols and (
+                shown_chars is None
+                or chars[col] != shown_chars[col]
+                or colors[col] != shown_colors[col]
+            ):
+                if colors[col] != color:
+                    out.append(colors[col] or RESET)
+                    color = colors[col]
+                out.append(chars[col])
+                col += 1
+            if color is not None:
+                out.append(RESET)
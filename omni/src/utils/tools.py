@@ -1,15 +1,9 @@
-import inspect
-import linecache
 import os
 from pathlib import Path
-import random
-import socket
-import subprocess
-import traceback
-from multiprocessing import current_process
 from typing import Union
-import numpy as np
-from tqdm import tqdm
+
+# Heavy modules (numpy, tqdm, inspect, subprocess, ...) are imported inside the functions
+# that use them: nodes import this module for one helper and should not pay for the rest.
 
 bcolors = {
     "PINK": "\033[95m",
@@ -71,6 +65,8 @@ class UGENT:
 
 
 def bash(cmd):
+    import subprocess
+
     process = subprocess.Popen(cmd.split(), stdout=subprocess.PIPE)
     output, error = process.communicate()
     return output, error
@@ -83,6 +79,10 @@ def set_seed(seed):
     :param seed:
     :return:
     """
+    import random
+
+    import numpy as np
+
     random.seed(seed)
     np.random.seed(seed)
 
@@ -118,6 +118,11 @@ def pyout(*message, color="PINK"):
     Print message preceded by traceback, and now including the argument names.
     :param message: The message(s) to print.
     """
+    import inspect
+    import linecache
+    import traceback
+
+    from tqdm import tqdm
 
     frame = inspect.currentframe().f_back
     line = linecache.getline(frame.f_code.co_filename, frame.f_lineno).strip()
@@ -173,6 +178,9 @@ pseudo_random_state = 49
 
 
 def pynotify(*message):
+    import subprocess
+    import traceback
+
     message = " ".join(str(m) for m in message)
     trace = traceback.extract_stack()[-2]
 
@@ -219,6 +227,11 @@ def listdir(path: str):
 
 def pbar(iterable, desc="", leave=False, total=None, disable=False):
     # return iterable
+    import socket
+    from multiprocessing import current_process
+
+    from tqdm import tqdm
+
     host = socket.gethostname()
 
     if host in ("AM", "kat", "gorilla"):
@@ -234,10 +247,15 @@ def pbar(iterable, desc="", leave=False, total=None, disable=False):
 
 
 def degree_string(angle: float):
+    import numpy as np
+
     return f"{np.rad2deg(angle):.0f}"
 
 
 def prog():
+    import inspect
+    import linecache
+
     # Get the caller's frame
     caller_frame = inspect.currentframe().f_back
     # Get the filename and line number of the caller
@@ -0,0 +1,134 @@
+import dataclasses
+import json
+import weakref
+from enum import IntEnum
+from typing import Dict, Optional, Union
+
+from cyclonedds.idl import IdlStruct
+
+from src.cyclone.clock_sync import clock_sync
+from src.cyclone.writer import Writer
+from src.idl.base_types.str_pod import StrPOD
+from src.idl.base_types.trace_stamp_pod import TraceStampPOD
+from src.utils.clock import clock
+from src.utils.histogram import LatencyHistogram
+
+
+class Hop(IntEnum):
+    """The points in the drive pipeline where a message is stamped, in pipeline order."""
+
+    XBOX360_WRITER = 0
+    DRIVE_CONTROLLER_RX = 1
+    DRIVE_CONTROLLER_TX = 2
+    ESC_CONTROLLER_RX = 3
+    ESC_CONTROLLER_TX = 4
+    ESC_RX = 5
+    GPIO_WRITE = 6
+
+
+class Tracer:
+    """
+    Stamps messages as they pass through a node and keeps latency histograms of what it sees:
+
+    - per hop: the time since the previous stamp in the message's trace, e.g.
+      "DRIVE_CONTROLLER_TX->ESC_CONTROLLER_RX" is the DDS transport time between the two nodes;
+    - per topic: the end-to-end latency since the origin timestamp (msg.timestamp), i.e. since
+      the joystick was sampled.
+
+    Every DIAGNOSTICS_INTERVAL seconds the histogram summaries are published as JSON on the
+    "diagnostics" topic. Stamps are wall-clock times (clock.time()) of the process that took
+    them, and name its clock; times from other processes are mapped to the local clock with
+    the offsets measured by src.cyclone.clock_sync before latencies are computed, so hops
+    between hosts are right however their clocks are set or drift. The origin timestamp is on
+    the clock of the first stamp. In a simulation (see src.utils.clock) latencies are in
+    simulated time.
+    """
+
+    DIAGNOSTICS_TOPIC = "diagnostics"
+    DIAGNOSTICS_INTERVAL = 5.0  # s
+    instances: "weakref.WeakSet[Tracer]" = (
+        weakref.WeakSet()
+    )  # every tracer in the process
+
+    def __init__(self, node_name: str, publish: bool = True):
+        """
+        Args:
+            node_name (str): Name of the node, included in the diagnostics messages.
+            publish (bool): Publish the summaries on the diagnostics topic.
+        """
+        self.node_name = node_name
+        self.hops: Dict[str, LatencyHistogram] = {}
+        self.end_to_end: Dict[str, LatencyHistogram] = {}
+        self.__publish = publish
+        self.__writer = None
+        self.__next_publish = clock.monotonic() + self.DIAGNOSTICS_INTERVAL
+        Tracer.instances.add(self)
+
+    def stamp(self, msg: IdlStruct, hop: Hop, topic: Optional[str] = None) -> IdlStruct:
+        """
+        Returns a copy of the message with a stamp for `hop` appended to its trace, and
+        records its latencies. The message itself is left as it is: with intra-process
+        delivery a received sample is shared with every other subscriber (see
+        src.cyclone.intra_process), so callers continue with the returned copy.
+
+        Args:
+            msg (IdlStruct): A message with `timestamp` and `trace` fields.
+            hop (Hop): The hop that is passed now.
+            topic (Optional[str]): If given, the end-to-end latency since msg.timestamp is
+                recorded under this name.
+
+        Returns:
+            IdlStruct: The stamped copy.
+        """
+        now = clock.time()
+        if msg.trace:
+            previous = msg.trace[-1]
+            sent = clock_sync.to_local(previous.timestamp, previous.clock)
+            self.__histogram(
+                self.hops, f"{self.__name(previous.hop)}->{Hop(hop).name}"
+            ).record((now - sent) * 1e6)
+        if topic is not None:
+            origin_clock = msg.trace[0].clock if msg.trace else clock_sync.clock_id
+            origin = clock_sync.to_local(msg.timestamp, origin_clock)
+            self.__histogram(self.end_to_end, topic).record((now - origin) * 1e6)
+        stamp = TraceStampPOD(hop=int(hop), timestamp=now, clock=clock_sync.clock_id)
+        msg = dataclasses.replace(msg, trace=msg.trace + [stamp])
+
+        if self.__publish and clock.monotonic() > self.__next_publish:
+            self.publish_diagnostics()
+        return msg
+
+    def summary(self) -> Dict[str, Union[str, Dict]]:
+        """
+        Returns:
+            Dict[str, Union[str, Dict]]: The histogram summaries of this node.
+        """
+        return {
+            "node": self.node_name,
+            "hops": {name: h.summary() for name, h in self.hops.items()},
+            "end_to_end": {name: h.summary() for name, h in self.end_to_end.items()},
+        }
+
+    def publish_diagnostics(self):
+        """Publishes summary() as JSON on the diagnostics topic."""
+        self.__next_publish = clock.monotonic() + self.DIAGNOSTICS_INTERVAL
+        if self.__writer is None:
+            self.__writer = Writer(self.DIAGNOSTICS_TOPIC, StrPOD)
+        self.__writer.publish(
+            StrPOD(timestamp=clock.time(), msg=json.dumps(self.summary()))
+        )
+
+    @staticmethod
+    def __histogram(
+        histograms: Dict[str, LatencyHistogram], name: str
+    ) -> LatencyHistogram:
+        if name not in histograms:
+            histograms[name] = LatencyHistogram()
+        return histograms[name]
+
+    @staticmethod
+    def __name(hop: int) -> str:
+        try:
+            return Hop(hop).name
+        except ValueError:
+            return str(hop)